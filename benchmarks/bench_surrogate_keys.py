@@ -0,0 +1,92 @@
+"""
+Compare les layouts de clés de substitution (uuid / integer / hash) :
+taille du fichier DuckDB et temps de la jointure v_matches_flat.
+
+Usage (depuis la racine du projet) :
+    python benchmarks/bench_surrogate_keys.py --scale 50 --repeat 20
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+
+ETL_DIR = Path(__file__).resolve().parents[1] / "etl"
+sys.path.insert(0, str(ETL_DIR))
+
+import db_creation  # noqa: E402
+import etl_create_view  # noqa: E402
+import etl_inserter_2014  # noqa: E402
+
+JOIN_QUERY = "SELECT COUNT(*), SUM(home_goals + away_goals), COUNT(DISTINCT home_team) FROM v_matches_flat"
+
+
+def load_merged():
+    """DataFrame fusionné réel (les chemins des éditions sont relatifs à etl/)"""
+    cwd = os.getcwd()
+    os.chdir(ETL_DIR)
+    try:
+        import main
+        return main.merge_data()
+    finally:
+        os.chdir(cwd)
+
+
+def scale_matches(df, scale):
+    """Duplique les matchs en décalant la date d'une seconde par copie"""
+    copies = []
+    for k in range(scale):
+        copy = df.copy()
+        copy["Datetime"] = copy["Datetime"] + pd.Timedelta(seconds=k)
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def measure(df, key_type, repeat, workdir):
+    db_path = os.path.join(workdir, f"{key_type}.duckdb")
+    db_creation.create_db_schema(db_path=db_path, key_type=key_type)
+
+    start = time.perf_counter()
+    etl_inserter_2014.load_matches(df, db_path=db_path)
+    load_seconds = time.perf_counter() - start
+    etl_create_view.create_view(db_path=db_path)
+
+    con = duckdb.connect(db_path)
+    con.execute("CHECKPOINT")
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        con.execute(JOIN_QUERY).fetchall()
+        timings.append(time.perf_counter() - start)
+    con.close()
+
+    return {
+        "key_type": key_type,
+        "rows": len(df),
+        "db_bytes": os.path.getsize(db_path),
+        "load_seconds": round(load_seconds, 4),
+        "join_median_ms": round(statistics.median(timings) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=20, help="nombre de copies des matchs réels")
+    parser.add_argument("--repeat", type=int, default=20, help="exécutions de la requête de jointure")
+    args = parser.parse_args()
+
+    df = scale_matches(load_merged(), args.scale)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [measure(df, key_type, args.repeat, workdir) for key_type in db_creation.KEY_TYPES]
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
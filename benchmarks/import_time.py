@@ -0,0 +1,110 @@
+"""
+Temps d'import à froid des modules du pipeline (python -X importtime).
+
+Chaque module est importé dans un interpréteur neuf, N fois : le rapport donne
+la médiane du temps cumulé, le temps propre par paquet racine (pandas,
+duckdb, modules etl...) et vérifie deux budgets :
+- le temps cumulé de chaque module ne dépasse pas --budget-ms ;
+- aucun module de FORBIDDEN (référentiels chargés à la demande) n'est importé.
+
+Usage (depuis la racine du projet) :
+    python benchmarks/import_time.py --repeat 5 --budget-ms 1500 --output import_time.json
+Code de sortie 1 si un budget est dépassé.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ETL_DIR = BENCH_DIR.parent / "etl"
+
+DEFAULT_MODULES = "main,etl_2014,etl_2018,etl_2022,etl_clean_1930_2010"
+# Médiane mesurée pour main : ~0,55 s, dont ~0,45 s pour pandas lui-même
+DEFAULT_BUDGET_MS = 1500
+# Ne doivent être chargés qu'au premier usage, jamais par un import
+FORBIDDEN = ("geonamescache",)
+
+
+def parse_importtime(stderr):
+    """
+    Lignes "import time: self [us] | cumulative | package" -> liste de
+    (paquet, profondeur, self_us, cumulative_us), dans l'ordre de sortie.
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # ligne d'en-tête
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(parts[0]), int(parts[1])))
+    return entries
+
+
+def measure(module, cwd=ETL_DIR):
+    """Un import à froid : (cumulé du module en µs, self µs par paquet racine, modules chargés)"""
+    code = f"import sys, {module}; print('\\n'.join(sys.modules))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    )
+    entries = parse_importtime(proc.stderr)
+    total = next(cum for name, depth, _, cum in entries if name == module and depth == 0)
+    by_package = defaultdict(int)
+    for name, _, self_us, _ in entries:
+        by_package[name.split(".")[0]] += self_us
+    loaded = set(proc.stdout.split())
+    return total, dict(by_package), loaded
+
+
+def run(modules, repeat=5, budget_ms=DEFAULT_BUDGET_MS, forbidden=FORBIDDEN):
+    report = {"budget_ms": budget_ms, "forbidden": list(forbidden), "modules": {}, "ok": True}
+    for module in modules:
+        totals, packages, loaded = [], defaultdict(list), set()
+        for _ in range(repeat):
+            total, by_package, loaded = measure(module)
+            totals.append(total)
+            for package, self_us in by_package.items():
+                packages[package].append(self_us)
+        median_ms = statistics.median(totals) / 1000
+        top = sorted(((p, statistics.median(v) / 1000) for p, v in packages.items()), key=lambda x: -x[1])[:10]
+        violations = []
+        if median_ms > budget_ms:
+            violations.append(f"{median_ms:.0f} ms > budget {budget_ms} ms")
+        violations += [f"{m} importé" for m in forbidden if m in loaded]
+        report["modules"][module] = {
+            "median_ms": round(median_ms, 1),
+            "runs_ms": [round(t / 1000, 1) for t in totals],
+            "top_packages_ms": {p: round(ms, 1) for p, ms in top},
+            "violations": violations,
+        }
+        report["ok"] = report["ok"] and not violations
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default=DEFAULT_MODULES, help="modules séparés par des virgules")
+    parser.add_argument("--repeat", type=int, default=5, help="imports à froid par module (médiane)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="temps cumulé max par module")
+    parser.add_argument("--output", default=None, help="rapport JSON")
+    args = parser.parse_args()
+
+    report = run(args.modules.split(","), repeat=args.repeat, budget_ms=args.budget_ms)
+    for module, result in report["modules"].items():
+        top = ", ".join(f"{p} {ms:.0f}" for p, ms in list(result["top_packages_ms"].items())[:4])
+        status = "OK" if not result["violations"] else "; ".join(result["violations"])
+        print(f"{module:<22} {result['median_ms']:>7.1f} ms  ({top})  {status}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    sys.exit(0 if report["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Benchmark de bout en bout du pipeline sur des sources synthétiques
+(voir synthetic.py) à plusieurs échelles.
+
+Chaque échelle tourne dans un process séparé : temps (perf_counter), pic
+mémoire Python (tracemalloc) et nombre de lignes sont relevés pour chaque
+étape (extraction de chaque édition, concat, schéma, load_matches,
+create_view), ainsi que le pic RSS du process. Si une échelle échoue
+(mémoire, timeout...), le rapport indique la dernière étape terminée.
+
+Usage (depuis la racine du projet) :
+    python benchmarks/run_benchmarks.py --scales 1,10,100 --output benchmarks/report.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ETL_DIR = BENCH_DIR.parent / "etl"
+sys.path.insert(0, str(ETL_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+DEFAULT_SCALES = "1,10,100,1000"
+DEFAULT_OUTPUT = BENCH_DIR / "report.json"
+
+
+# ============================================================
+# Process enfant : une échelle
+# ============================================================
+
+class StageRecorder:
+    """Mesure chaque étape et réécrit le résultat partiel après chacune"""
+
+    def __init__(self, result_path, trace_memory=True):
+        self.result_path = result_path
+        self.trace_memory = trace_memory
+        self.stages = []
+
+    def run(self, name, func, *args, **kwargs):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            if self.trace_memory:
+                tracemalloc.stop()
+        stage = {
+            "stage": name,
+            "seconds": round(elapsed, 4),
+            "python_peak_bytes": peak,
+            "rows": len(result) if hasattr(result, "shape") else None,
+        }
+        if isinstance(result, dict):
+            # Statistiques de load_matches (sans la liste des match_id)
+            stage["details"] = {k: v for k, v in result.items() if k != "match_ids"}
+        self.stages.append(stage)
+        self.dump()
+        return result
+
+    def dump(self, **extra):
+        with open(self.result_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages, **extra}, f, indent=2)
+
+
+def max_rss_bytes():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_scale(scale, workdir, result_path, trace_memory=True):
+    import synthetic
+    import db_creation
+    import etl_create_view
+    import etl_inserter_2014
+    import main
+
+    data_dir = os.path.join(workdir, "data")
+    db_path = os.path.join(workdir, "db.duckdb")
+    recorder = StageRecorder(result_path, trace_memory)
+
+    # Génération hors mesure mémoire : elle ne fait pas partie du pipeline
+    start = time.perf_counter()
+    input_bytes = synthetic.generate(data_dir, scale)
+    generate_seconds = round(time.perf_counter() - start, 4)
+    recorder.dump(input_bytes=input_bytes, generate_seconds=generate_seconds)
+
+    frames = [
+        recorder.run(f"extract:{name}", lambda f=func, a=args: f(*a))
+        for name, (func, args) in main.edition_tasks(data_dir).items()
+    ]
+    big_df = recorder.run("merge", main.concat_editions, frames)
+    recorder.run("schema", db_creation.create_db_schema, db_path=db_path, key_type=main.KEY_TYPE or None)
+    recorder.run("load_matches", etl_inserter_2014.load_matches, big_df, db_path=db_path)
+    recorder.run("create_view", etl_create_view.create_view, db_path=db_path)
+
+    recorder.dump(
+        input_bytes=input_bytes,
+        generate_seconds=generate_seconds,
+        db_bytes=os.path.getsize(db_path),
+        max_rss_bytes=max_rss_bytes(),
+    )
+
+
+# ============================================================
+# Process parent : orchestration et rapport
+# ============================================================
+
+def bench_scale(scale, timeout=None, trace_memory=True, keep_logs_dir=None):
+    """Lance une échelle dans un process enfant et renvoie son résultat (même partiel)"""
+    with tempfile.TemporaryDirectory(prefix=f"etl_bench_x{scale}_") as workdir:
+        result_path = os.path.join(workdir, "result.json")
+        log_path = os.path.join(workdir, "etl.log")
+        cmd = [sys.executable, __file__, "--child", str(scale), "--workdir", workdir, "--result", result_path]
+        if not trace_memory:
+            cmd.append("--no-tracemalloc")
+
+        start = time.perf_counter()
+        status, error = "ok", None
+        with open(log_path, "w", encoding="utf-8") as log:
+            # cwd = workdir : les logs des modules ETL ne polluent pas le dépôt
+            try:
+                proc = subprocess.run(cmd, cwd=workdir, stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+                if proc.returncode != 0:
+                    status, error = "failed", f"code retour {proc.returncode}"
+            except subprocess.TimeoutExpired:
+                status, error = "timeout", f"plus de {timeout}s"
+        elapsed = time.perf_counter() - start
+
+        result = {}
+        if os.path.exists(result_path):
+            with open(result_path, encoding="utf-8") as f:
+                result = json.load(f)
+        if status != "ok":
+            with open(log_path, encoding="utf-8", errors="replace") as f:
+                result["log_tail"] = f.read()[-2000:]
+        if keep_logs_dir is not None:
+            Path(keep_logs_dir).mkdir(parents=True, exist_ok=True)
+            os.replace(log_path, Path(keep_logs_dir) / f"x{scale}.log")
+
+    stages = result.get("stages", [])
+    return {
+        "scale": scale,
+        "status": status,
+        "error": error,
+        "last_completed_stage": stages[-1]["stage"] if stages else None,
+        "total_seconds": round(elapsed, 4),
+        **result,
+    }
+
+
+def environment():
+    import duckdb
+    import pandas as pd
+    return {
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "duckdb": duckdb.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="échelles séparées par des virgules")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="rapport JSON")
+    parser.add_argument("--timeout", type=float, default=None, help="secondes max par échelle")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="temps seuls (tracemalloc ralentit pandas)")
+    parser.add_argument("--logs", default=None, help="dossier où garder la sortie de chaque échelle")
+    # Interne : exécution d'une échelle dans le process enfant
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_scale(args.child, args.workdir, args.result, trace_memory=not args.no_tracemalloc)
+        return
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "tracemalloc": not args.no_tracemalloc,
+        "results": [],
+    }
+    for scale in scales:
+        print(f"⏱️  Échelle x{scale}...", flush=True)
+        result = bench_scale(scale, args.timeout, not args.no_tracemalloc, args.logs)
+        report["results"].append(result)
+        print(f"   {result['status']} en {result['total_seconds']:.1f}s "
+              f"(dernière étape : {result['last_completed_stage']})", flush=True)
+        # Rapport réécrit après chaque échelle : exploitable même si on interrompt
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Génère des sources synthétiques dans le format exact des fichiers de data/,
+à N fois leur taille (scale=1 : copie des fichiers fournis).
+
+Chaque copie k >= 1 reprend toutes les lignes réelles avec des équipes
+renommées "<équipe> S<k>", pour que les jointures entre fichiers d'une même
+édition (dates 1930-2010, paire 2022) restent résolubles.
+
+Usage (depuis la racine du projet) :
+    python benchmarks/synthetic.py --scale 10 --output /tmp/data_x10
+"""
+import argparse
+import copy
+import csv
+import io
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "etl"))
+
+from etl_teams import resolve_teams  # noqa: E402
+from etl_2022 import clean_team_name  # noqa: E402
+
+DATA_DIR = PROJECT_ROOT / "data"
+
+# Fichiers sources par édition (format, encodage, séparateur)
+SOURCES = {
+    "1930-2010": ["WorldCupMatches1930-2010.csv", "WorldCupMatches1930-2022-datetime.csv"],
+    "2014": ["WorldCupMatches2014.csv"],
+    "2018": ["data_2018.json"],
+    "2022": ["WorldCupMatches2022.csv", "WorldCupMatches2022-venue.csv", "stadium_city_mapping2022.csv"],
+}
+
+
+def suffix(k):
+    return f" S{k}"
+
+
+def _read_raw(path, **kwargs):
+    """Lecture sans inférence : les valeurs sont réécrites telles quelles"""
+    return pd.read_csv(path, dtype=str, keep_default_na=False, **kwargs)
+
+
+def _append(df, path, **kwargs):
+    df.to_csv(path, mode="a", header=False, index=False, **kwargs)
+
+
+def _repair_quoted_rows(df):
+    """
+    Quelques lignes du CSV datetime sont entièrement entre guillemets et
+    atterrissent dans "Key Id" : on les re-découpe pour les copies.
+    """
+    broken = df["Tournament Id"] == ""
+    for idx in df.index[broken]:
+        fields = next(csv.reader(io.StringIO(df.at[idx, "Key Id"])))
+        df.loc[idx, df.columns[:len(fields)]] = fields[:len(df.columns)]
+    return df
+
+
+def generate_1930_2010(src, out, scale):
+    matches_name, datetime_name = SOURCES["1930-2010"]
+    shutil.copy(src / matches_name, out / matches_name)
+    shutil.copy(src / datetime_name, out / datetime_name)
+    if scale == 1:
+        return
+
+    matches = _read_raw(src / matches_name)
+    datetimes = _repair_quoted_rows(_read_raw(src / datetime_name, encoding="latin1"))
+
+    # Noms déjà normalisés (+ correction Slovakia 2002) : les deux fichiers
+    # donnent la même équipe une fois suffixés
+    team1 = resolve_teams(matches["team1"])
+    team2 = resolve_teams(matches["team2"])
+    slovenia = (team2.str.lower() == "slovakia") & matches["edition"].str.contains("2002")
+    team2 = team2.mask(slovenia, "slovenia")
+    home = resolve_teams(datetimes["Home Team Name"])
+    away = resolve_teams(datetimes["Away Team Name"])
+
+    for k in range(1, scale):
+        _append(matches.assign(team1=team1 + suffix(k), team2=team2 + suffix(k)), out / matches_name)
+        _append(
+            datetimes.assign(**{"Home Team Name": home + suffix(k), "Away Team Name": away + suffix(k)}),
+            out / datetime_name, encoding="latin1",
+        )
+
+
+def generate_2014(src, out, scale):
+    name = SOURCES["2014"][0]
+    shutil.copy(src / name, out / name)
+    df = _read_raw(src / name, sep=";", encoding="iso-8859-1")
+    for k in range(1, scale):
+        _append(
+            df.assign(**{
+                "Home Team Name": df["Home Team Name"] + suffix(k),
+                "Away Team Name": df["Away Team Name"] + suffix(k),
+            }),
+            out / name, sep=";", encoding="iso-8859-1",
+        )
+
+
+def generate_2018(src, out, scale):
+    name = SOURCES["2018"][0]
+    with open(src / name, encoding="utf-8") as f:
+        data = json.load(f)
+
+    base_teams = list(data["teams"])
+    offset = max(t["id"] for t in base_teams)
+    for section in ("groups", "knockout"):
+        base = dict(data[section])
+        for k in range(1, scale):
+            for key, block in base.items():
+                block = copy.deepcopy(block)
+                for m in block["matches"]:
+                    m["home_team"] += k * offset
+                    m["away_team"] += k * offset
+                data[section][f"{key}_s{k}"] = block
+    for k in range(1, scale):
+        data["teams"].extend(
+            {**t, "id": t["id"] + k * offset, "name": t["name"] + suffix(k)} for t in base_teams
+        )
+
+    with open(out / name, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def generate_2022(src, out, scale):
+    matches_name, venue_name, mapping_name = SOURCES["2022"]
+    for name in SOURCES["2022"]:
+        shutil.copy(src / name, out / name)
+
+    matches = _read_raw(src / matches_name)
+    venues = _read_raw(src / venue_name)
+    # Noms mappés avant suffixe ("IR Iran" / "IRAN" -> "iran S<k>") pour la jointure
+    team1, team2 = matches["team1"].map(clean_team_name), matches["team2"].map(clean_team_name)
+    home, away = venues["home_team"].map(clean_team_name), venues["away_team"].map(clean_team_name)
+    for k in range(1, scale):
+        _append(matches.assign(team1=team1 + suffix(k), team2=team2 + suffix(k)), out / matches_name)
+        _append(venues.assign(home_team=home + suffix(k), away_team=away + suffix(k)), out / venue_name)
+
+
+GENERATORS = {
+    "1930-2010": generate_1930_2010,
+    "2014": generate_2014,
+    "2018": generate_2018,
+    "2022": generate_2022,
+}
+
+
+def generate(out_dir, scale, src_dir=DATA_DIR):
+    """Écrit toutes les sources à l'échelle demandée dans out_dir"""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    for generator in GENERATORS.values():
+        generator(Path(src_dir), out, scale)
+    return {name: os.path.getsize(out / name) for files in SOURCES.values() for name in files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--output", required=True, help="dossier de sortie (équivalent de data/)")
+    args = parser.parse_args()
+    print(json.dumps(generate(args.output, args.scale), indent=2))
+
+
+if __name__ == "__main__":
+    main()
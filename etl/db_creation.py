@@ -1,52 +1,140 @@
+import os
+
 import duckdb
-def create_db_schema():
-    con = duckdb.connect("./../db/db.duckdb")
-
-    schema_sql = """
-    CREATE TABLE Teams (
-        team_id UUID PRIMARY KEY,
-        team_name TEXT NOT NULL
-    );
-
-    CREATE TABLE MatchTime (
-        time_id UUID PRIMARY KEY,
-        date_ TIMESTAMP,
-        day_ INTEGER,
-        month_ INTEGER,
-        year_ INTEGER
-    );
-
-    CREATE TABLE Rounds (
-        round_id UUID PRIMARY KEY,
-        round_name TEXT NOT NULL
-    );
-
-    CREATE TABLE City (
-        city_id UUID PRIMARY KEY,
-        city_name TEXT NOT NULL
-    );
-
-    CREATE TABLE Matches (
-        match_id INTEGER PRIMARY KEY,
-        round_id UUID NOT NULL,
-        city_id UUID NOT NULL,
-        time_id UUID NOT NULL,
-        FOREIGN KEY (round_id) REFERENCES Rounds(round_id),
-        FOREIGN KEY (city_id) REFERENCES City(city_id),
-        FOREIGN KEY (time_id) REFERENCES MatchTime(time_id)
-    );
-
-    CREATE TABLE Plays (
-        match_id INTEGER,
-        team_id UUID,
-        position_ TEXT,
-        goal_nb INTEGER,
-        result_ TEXT,
-        PRIMARY KEY (match_id, team_id),
-        FOREIGN KEY (match_id) REFERENCES Matches(match_id),
-        FOREIGN KEY (team_id) REFERENCES Teams(team_id)
-    );
-    """
-
-    con.execute(schema_sql)
-    con.close()
+import etl_query
+
+# Type SQL des clés de substitution des dimensions (Teams, Rounds, City, MatchTime)
+# - uuid    : clés aléatoires uuid() (historique)
+# - integer : entiers denses 1..n attribués par le loader
+# - hash    : hash() DuckDB du membre, identique d'un chargement à l'autre
+KEY_TYPES = {
+    "uuid": "UUID",
+    "integer": "INTEGER",
+    "hash": "UBIGINT",
+}
+DEFAULT_KEY_TYPE = "uuid"
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS Teams (
+    team_id {key} PRIMARY KEY,
+    team_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS MatchTime (
+    time_id {key} PRIMARY KEY,
+    date_ TIMESTAMP,
+    day_ INTEGER,
+    month_ INTEGER,
+    year_ INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS Rounds (
+    round_id {key} PRIMARY KEY,
+    round_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS City (
+    city_id {key} PRIMARY KEY,
+    city_name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Matches (
+    match_id INTEGER PRIMARY KEY,
+    round_id {key} NOT NULL,
+    city_id {key} NOT NULL,
+    time_id {key} NOT NULL,
+    FOREIGN KEY (round_id) REFERENCES Rounds(round_id),
+    FOREIGN KEY (city_id) REFERENCES City(city_id),
+    FOREIGN KEY (time_id) REFERENCES MatchTime(time_id)
+);
+
+CREATE TABLE IF NOT EXISTS Plays (
+    match_id INTEGER,
+    team_id {key},
+    position_ TEXT,
+    goal_nb INTEGER,
+    result_ TEXT,
+    PRIMARY KEY (match_id, team_id),
+    FOREIGN KEY (match_id) REFERENCES Matches(match_id),
+    FOREIGN KEY (team_id) REFERENCES Teams(team_id)
+);
+"""
+
+# Tables du schéma, faits d'abord (ordre de suppression compatible avec les clés étrangères)
+SCHEMA_TABLES = ["Plays", "Matches", "MatchTime", "City", "Rounds", "Teams"]
+
+DROP_SCHEMA = "".join(f"DROP TABLE IF EXISTS {table};\n" for table in SCHEMA_TABLES)
+
+
+def get_key_type(con):
+    """Type de clé (uuid / integer / hash) du schéma existant, None s'il n'y a pas de schéma"""
+    row = con.execute("""
+        SELECT data_type FROM information_schema.columns
+        WHERE table_name = 'Teams' AND column_name = 'team_id'
+    """).fetchone()
+    if row is None:
+        return None
+    return {sql_type: name for name, sql_type in KEY_TYPES.items()}[row[0]]
+
+
+def read_key_type(db_path):
+    """get_key_type sur une base fermée (None si le fichier n'existe pas)"""
+    if not os.path.exists(db_path):
+        return None
+    con = duckdb.connect(db_path, read_only=True)
+    try:
+        return get_key_type(con)
+    finally:
+        con.close()
+
+
+def _create_tables(con, key_type):
+    """
+    key_type ne s'applique qu'à la création : sur un schéma existant, ses clés sont
+    gardées (DuckDB lierait les clés étrangères des tables à créer à celles en place).
+    """
+    if key_type is not None and key_type not in KEY_TYPES:
+        raise ValueError(f"Type de clé inconnu : {key_type}")
+    existing = get_key_type(con)
+    if existing is not None and key_type is not None and key_type != existing:
+        raise ValueError(f"Schéma existant en clés {existing} : impossible de passer en {key_type} "
+                         f"sans recréer la base")
+    key_type = existing or key_type or DEFAULT_KEY_TYPE
+    con.execute(SCHEMA_SQL.format(key=KEY_TYPES[key_type]))
+    return key_type
+
+
+def create_db_schema(db_path="./../db/db.duckdb", key_type=None, con=None):
+    """
+    Crée les tables absentes, avec key_type (défaut uuid) si le schéma n'existe pas.
+    Renvoie le type de clé du schéma ; lève ValueError si key_type contredit le schéma existant.
+    con : connexion ouverte (LoadSession), utilisée sans commit ni fermeture.
+    """
+    if con is not None:
+        return _create_tables(con, key_type)
+
+    etl_query.invalidate(db_path)
+    con = duckdb.connect(db_path)
+    try:
+        return _create_tables(con, key_type)
+    finally:
+        con.close()
+
+
+def reset_schema(con, key_type):
+    """
+    Supprime et recrée les tables (vides) dans la transaction en cours.
+    Remplace TRUNCATE : DuckDB refuse de réinsérer dans la même transaction
+    des clés supprimées encore référencées par une clé étrangère.
+    """
+    con.execute(DROP_SCHEMA)
+    con.execute(SCHEMA_SQL.format(key=KEY_TYPES[key_type]))
+
+
+def reset_plays(con, key_type):
+    """
+    Supprime et recrée Plays (vide) dans la transaction en cours : tant qu'elle existe,
+    DuckDB refuse UPDATE et DELETE sur Matches, qu'elle référence.
+    """
+    con.execute("DROP TABLE Plays")
+    con.execute(SCHEMA_SQL.format(key=KEY_TYPES[key_type]))
@@ -1,4 +1,5 @@
 def etl1():
     print("Hello etl 1")
 
-etl1()
\ No newline at end of file
+if __name__ == "__main__":
+    etl1()
@@ -1,4 +1,5 @@
 def etl2():
     print("Hello etl 2")
 
-etl2()
\ No newline at end of file
+if __name__ == "__main__":
+    etl2()
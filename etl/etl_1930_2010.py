@@ -1,11 +1,36 @@
+import logging
+import os
 import pandas as pd
 from unidecode import unidecode
+from etl_metrics import stage
+from etl_normalize import normalize_series
+from etl_teams import fix_edition_teams, resolve_teams
+
+logger = logging.getLogger("ETL")
 
 # =========================
 # CONFIGURATION
 # =========================
-INPUT_FILE = "./../data/WorldCupMatches1930-2010.csv"
-DATETIME_FILE = "./../data/WorldCupMatches1930-2022-datetime.csv"
+DATA_DIR = "./../data"
+INPUT_FILE = "WorldCupMatches1930-2010.csv"
+DATETIME_FILE = "WorldCupMatches1930-2022-datetime.csv"
+
+# Corrections manuelles (partagées avec etl_1930_2010_duckdb)
+# Matchs rejoués : (stade, équipe 1, équipe 2), date et heure reprises du CSV datetime
+SPECIFIC_MATCHES = [
+    ("Hardturm Stadium", "west germany", "turkey"),
+    ("St. Jakob Stadium", "switzerland", "italy"),
+    ("Malmö Stadion", "northern ireland", "czechoslovakia"),
+]
+
+# Dates et heures imposées pour 1994 : (équipe 1, équipe 2, date, heure)
+MATCHES_1994 = [
+    ("norway", "mexico", "06/19/1994", "13:00:00"),
+    ("netherlands", "saudi arabia", "06/20/1994", "16:30:00"),
+    ("italy", "mexico", "06/28/1994", "17:30:00"),
+    ("belgium", "saudi arabia", "06/29/1994", "17:30:00"),
+    ("spain", "switzerland", "06/18/1994", "13:00:00"),
+]
 
 # =========================
 # FONCTIONS UTILITAIRES
@@ -36,30 +61,6 @@ def normalize_round(round_str):
     
     return r.lower()
 
-def normalize_team(team_str):
-    """Normalise les noms d'équipes"""
-    if pd.isna(team_str):
-        return ""
-    
-    # Enlever les parenthèses
-    team = str(team_str).strip()
-    team = team.split("(")[0].strip()
-    
-    # Remplacements spécifiques
-    replacements = {
-        "USA": "United States",
-        "FRG": "West Germany",
-        "GDR": "East Germany",
-        "Serbia-Montenegro": "Serbia and Montenegro",
-        "Ireland": "Republic of Ireland",
-    }
-    
-    for old, new in replacements.items():
-        if team.upper() == old.upper():
-            return new
-    
-    return team
-
 def city_to_english(city):
     """Normalise les noms de villes"""
     if pd.isna(city) or str(city).strip() == "":
@@ -114,6 +115,47 @@ def get_match_date(row, df_dt):
     
     return None, None
 
+# Clés de jointure des 3 niveaux de fallback de get_match_date
+MATCH_DATE_LEVELS = [
+    ["_year", "round", "_team_lo", "_team_hi", "Replay"],
+    ["_year", "round", "_team_lo", "_team_hi"],
+    ["_year", "_team_lo", "_team_hi"],
+]
+
+def _with_team_pair(frame):
+    """Ajoute la paire d'équipes non ordonnée (_team_lo, _team_hi)"""
+    keyed = frame[["_year", "round", "team1", "team2", "Replay"]].copy()
+    swap = keyed["team1"] > keyed["team2"]
+    keyed["_team_lo"] = keyed["team1"].where(~swap, keyed["team2"])
+    keyed["_team_hi"] = keyed["team2"].where(~swap, keyed["team1"])
+    return keyed
+
+def resolve_match_dates(df, df_dt):
+    """
+    Version vectorisée de get_match_date pour tout le DataFrame.
+    df_dt est indexé une seule fois par niveau (premier match dans l'ordre
+    de df_dt, comme match.iloc[0]) puis chaque niveau est résolu par jointure.
+    Retourne un DataFrame [Match Date, Match Time] aligné sur df.index.
+    """
+    left = _with_team_pair(df)
+    right = _with_team_pair(df_dt)
+    right["_pos"] = range(len(df_dt))
+
+    positions = pd.Series(pd.NA, index=range(len(df)), dtype="Int64")
+    for keys in MATCH_DATE_LEVELS:
+        index = right.dropna(subset=keys).drop_duplicates(subset=keys, keep="first")
+        found = left[keys].merge(index[keys + ["_pos"]], on=keys, how="left")["_pos"]
+        positions = positions.fillna(found.astype("Int64"))
+
+    matched = positions.notna().to_numpy()
+    pos = positions.fillna(0).to_numpy(dtype="int64")
+    result = {}
+    for col in ["Match Date", "Match Time"]:
+        values = df_dt[col].to_numpy(dtype=object)[pos]
+        values[~matched] = None
+        result[col] = values
+    return pd.DataFrame(result, index=df.index)
+
 def create_datetime(row):
     """Combine Match Date et Match Time en datetime"""
     try:
@@ -143,19 +185,56 @@ def create_datetime(row):
     except Exception as e:
         return pd.NaT
 
+# Formats essayés dans l'ordre par create_datetime
+DATETIME_FORMATS = ['%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M:%S', '%Y-%m-%d %H:%M:%S']
+# Format du CSV datetime ("7/13/1930 15:00") : même résultat que l'inférence
+# de pd.to_datetime (mois en premier), sans parser ligne par ligne
+INFERRED_DATETIME_FORMATS = ['%m/%d/%Y %H:%M']
+
+def build_datetime(dates, times, sample_size=3):
+    """
+    Version colonne de create_datetime : chaque format est appliqué en une
+    passe sur les lignes encore non parsées, l'inférence pd.to_datetime ne
+    sert qu'au reliquat. Retourne (Series datetime, rapport des échecs).
+    """
+    date_str = dates.astype(object).where(dates.notna(), "").astype(str).str.strip()
+    time_str = times.astype(object).where(times.notna(), "").astype(str).str.strip()
+    combined = date_str + " " + time_str
+
+    valid = (
+        dates.notna() & times.notna() &
+        (date_str != "") & (time_str != "") &
+        (date_str.str.lower() != "none") & (time_str.str.lower() != "none")
+    )
+
+    result = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[us]")
+    pending = valid.copy()
+    for fmt in DATETIME_FORMATS + INFERRED_DATETIME_FORMATS + ["mixed"]:
+        if not pending.any():
+            break
+        parsed = pd.to_datetime(combined[pending], format=fmt, errors="coerce")
+        result[pending] = parsed
+        pending &= result.isna()
+
+    failed = combined[valid & result.isna()]
+    report = {"failed": int(len(failed)), "sample": failed.head(sample_size).tolist()}
+    return result, report
+
 # =========================
 # PIPELINE PRINCIPAL
 # =========================
-def load_and_clean_data():
+def load_and_clean_data(data_dir=DATA_DIR):
     """
     Charge et nettoie les données de 1930 à 2010.
     Retourne un DataFrame avec la colonne Datetime.
     """
-    print("📥 Chargement des données 1930-2010...")
+    logger.info("📥 Chargement des données 1930-2010...")
     
     # 1️⃣ Charger les CSV
-    df = pd.read_csv(INPUT_FILE)
-    df_datetime = pd.read_csv(DATETIME_FILE, encoding="latin1")
+    with stage("read") as m:
+        df = pd.read_csv(os.path.join(data_dir, INPUT_FILE))
+        df_datetime = pd.read_csv(os.path.join(data_dir, DATETIME_FILE), encoding="latin1")
+        m["rows_out"] = len(df)
     
     # 2️⃣ Nettoyage préalable
     df = df[
@@ -163,12 +242,12 @@ def load_and_clean_data():
         (~df["edition"].astype(str).str.contains("2014", na=False))
     ].copy()
     
-    # 3️⃣ Normaliser round
-    df["round"] = df["round"].apply(normalize_round)
-    
-    # 4️⃣ Normaliser équipes
-    df["team1"] = df["team1"].apply(normalize_team)
-    df["team2"] = df["team2"].apply(normalize_team)
+    # 3️⃣ Normaliser round / 4️⃣ équipes
+    with stage("normalize", rows_in=len(df)) as m:
+        df["round"] = normalize_series(df["round"], normalize_round)
+        df["team1"] = resolve_teams(df["team1"])
+        df["team2"] = resolve_teams(df["team2"])
+        m["rows_out"] = len(df)
     
     # 5️⃣ Extraire année
     df["year"] = (
@@ -178,11 +257,9 @@ def load_and_clean_data():
         .astype("Int64")
     )
     
-    # Correction Slovakia → Slovenia en 2002
-    df.loc[
-        (df["team2"].str.lower() == "slovakia") & (df["year"] == 2002),
-        "team2"
-    ] = "Slovenia"
+    # Erreurs d'une seule édition (Slovakia → Slovenia en 2002) : etl_teams.EDITION_FIXES
+    df["team1"] = fix_edition_teams(df["team1"], df["year"])
+    df["team2"] = fix_edition_teams(df["team2"], df["year"])
     
     # 6️⃣ Colonne Replay
     df["Replay"] = 0
@@ -197,9 +274,9 @@ def load_and_clean_data():
         "Away Team Name": "team2"
     })
     
-    df_datetime["round"] = df_datetime["round"].apply(normalize_round)
-    df_datetime["team1"] = df_datetime["team1"].apply(normalize_team)
-    df_datetime["team2"] = df_datetime["team2"].apply(normalize_team)
+    df_datetime["round"] = normalize_series(df_datetime["round"], normalize_round)
+    df_datetime["team1"] = resolve_teams(df_datetime["team1"])
+    df_datetime["team2"] = resolve_teams(df_datetime["team2"])
     
     df["_year"] = df["edition"].astype(str).str.extract(r"(\d{4})", expand=False)
     df_datetime["_year"] = df_datetime["Tournament Id"].astype(str).str.extract(r"(\d{4})", expand=False)
@@ -211,28 +288,23 @@ def load_and_clean_data():
     )
     
     # 8️⃣ Récupérer dates et heures
-    print("🔄 Récupération des dates et heures...")
-    df[["Match Date", "Match Time"]] = df.apply(
-        lambda r: pd.Series(get_match_date(r, df_datetime)), axis=1
-    )
+    logger.info("🔄 Récupération des dates et heures...")
+    with stage("date_resolution", rows_in=len(df)) as m:
+        df[["Match Date", "Match Time"]] = resolve_match_dates(df, df_datetime)
+        m["rows_out"] = int(df["Match Date"].notna().sum())
     
     # 🐛 DEBUG : Vérifier ce qu'on a récupéré
-    print(f"\n🔍 DEBUG - Échantillon de dates récupérées:")
-    sample = df[df['Match Date'].notna()].head(3)
-    for idx, row in sample.iterrows():
-        print(f"  Match Date: '{row['Match Date']}' | Match Time: '{row['Match Time']}'")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔍 DEBUG - Échantillon de dates récupérées:")
+        sample = df[df['Match Date'].notna()].head(3)
+        for idx, row in sample.iterrows():
+            logger.debug("  Match Date: '%s' | Match Time: '%s'", row['Match Date'], row['Match Time'])
     
     missing_dates = df['Match Date'].isna().sum()
-    print(f"\n⚠️  {missing_dates} matches sans date après récupération")
+    logger.info("⚠️  %s matches sans date après récupération", missing_dates)
     
     # 9️⃣ Corrections manuelles matches spécifiques
-    specific_matches = [
-        ("Hardturm Stadium", "West Germany", "Turkey"),
-        ("St. Jakob Stadium", "Switzerland", "Italy"),
-        ("Malmö Stadion", "Northern Ireland", "Czechoslovakia"),
-    ]
-    
-    for stadium, team1_name, team2_name in specific_matches:
+    for stadium, team1_name, team2_name in SPECIFIC_MATCHES:
         match_row = df_datetime[
             (df_datetime["Stadium Name"] == stadium) &
             (((df_datetime["team1"] == team1_name) & (df_datetime["team2"] == team2_name)) |
@@ -252,15 +324,7 @@ def load_and_clean_data():
             df.loc[mask, 'Match Time'] = match_time
     
     # 🔟 Corrections manuelles 1994
-    matches_1994 = [
-        ("Norway", "Mexico", "06/19/1994", "13:00:00"),
-        ("Netherlands", "Saudi Arabia", "06/20/1994", "16:30:00"),
-        ("Italy", "Mexico", "06/28/1994", "17:30:00"),
-        ("Belgium", "Saudi Arabia", "06/29/1994", "17:30:00"),
-        ("Spain", "Switzerland", "06/18/1994", "13:00:00"),
-    ]
-    
-    for team1, team2, d, t in matches_1994:
+    for team1, team2, d, t in MATCHES_1994:
         mask = (
             (df["edition"] == "1994-USA") &
             (df["team1"] == team1) &
@@ -269,60 +333,61 @@ def load_and_clean_data():
         df.loc[mask, ["Match Date", "Match Time"]] = [d, t]
     
     # 1️⃣1️⃣ Normaliser venue
-    df["venue"] = df["venue"].apply(city_to_english)
+    with stage("normalize", rows_in=len(df)) as m:
+        df["venue"] = normalize_series(df["venue"], city_to_english)
+        m["rows_out"] = len(df)
     
     # 1️⃣2️⃣ Créer colonne Datetime
-    print("🔄 Création de la colonne Datetime...")
-    df['Datetime'] = df.apply(create_datetime, axis=1)
+    logger.info("🔄 Création de la colonne Datetime...")
+    with stage("datetime", rows_in=len(df)) as m:
+        df['Datetime'], parse_report = build_datetime(df['Match Date'], df['Match Time'])
+        m["rows_out"] = int(df['Datetime'].notna().sum())
     
     # 🐛 DEBUG : Vérifier le parsing
-    print(f"\n🔍 DEBUG - Échantillon de Datetime créées:")
-    sample_dt = df[df['Datetime'].notna()].head(3)
-    for idx, row in sample_dt.iterrows():
-        print(f"  {row['team1']} vs {row['team2']}: {row['Datetime']}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🔍 DEBUG - Échantillon de Datetime créées:")
+        sample_dt = df[df['Datetime'].notna()].head(3)
+        for idx, row in sample_dt.iterrows():
+            logger.debug("  %s vs %s: %s", row['team1'], row['team2'], row['Datetime'])
     
-    failed_parsing = df[df['Match Date'].notna() & df['Datetime'].isna()]
-    if len(failed_parsing) > 0:
-        print(f"\n⚠️  {len(failed_parsing)} dates n'ont PAS pu être parsées!")
-        print("Exemple de format problématique:")
-        for idx, row in failed_parsing.head(2).iterrows():
-            print(f"  Date: '{row['Match Date']}' | Time: '{row['Match Time']}'")
+    if parse_report["failed"] > 0:
+        logger.warning("⚠️  %s dates n'ont PAS pu être parsées!", parse_report["failed"])
+        logger.warning("Exemple de format problématique: %s", parse_report["sample"])
     
     
     # 1️⃣3️⃣ Nettoyage final
     df.drop(columns="_year", inplace=True, errors='ignore')
     
     # ✅ Statistiques
-    print("\n" + "="*50)
-    print("📊 STATISTIQUES 1930-2010")
-    print("="*50)
-    print(f"✅ Total matches: {len(df)}")
-    print(f"✅ Matches avec Datetime: {df['Datetime'].notna().sum()}")
-    print(f"❌ Matches sans Datetime: {df['Datetime'].isna().sum()}")
-    print(f"📈 Taux de couverture: {df['Datetime'].notna().sum() / len(df) * 100:.1f}%")
+    logger.info("📊 STATISTIQUES 1930-2010")
+    logger.info("✅ Total matches: %s", len(df))
+    logger.info("✅ Matches avec Datetime: %s", df['Datetime'].notna().sum())
+    logger.info("❌ Matches sans Datetime: %s", df['Datetime'].isna().sum())
+    logger.info("📈 Taux de couverture: %.1f%%", df['Datetime'].notna().sum() / len(df) * 100)
     
     if df['Datetime'].isna().sum() > 0:
-        print("\n🔍 Matches manquants par édition:")
         missing = df[df['Datetime'].isna()].groupby('edition').size()
-        print(missing)
+        logger.info("🔍 Matches manquants par édition:\n%s", missing)
     
-    print("✅ Pipeline 1930-2010 terminé\n")
+    logger.info("✅ Pipeline 1930-2010 terminé")
     
     return df
 
 # =========================
 # FONCTION D'EXPORT PRINCIPALE
 # =========================
-def get_cleaned_1930_data():
+def get_cleaned_1930_data(data_dir=DATA_DIR):
     """
     Fonction à appeler depuis main.py
     """
-    return load_and_clean_data()
+    return load_and_clean_data(data_dir)
 
 # =========================
 # EXÉCUTION DIRECTE (pour tests)
 # =========================
 if __name__ == "__main__":
+    from etl_metrics import configure_logging
+    configure_logging()
     df = load_and_clean_data()
     
     # Export optionnel
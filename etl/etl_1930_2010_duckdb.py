@@ -0,0 +1,337 @@
+# etl_1930_2010_duckdb.py
+"""
+Moteur DuckDB du pipeline 1930-2010 : mêmes règles que
+etl_1930_2010.load_and_clean_data + etl_clean_1930_2010.get_cleaned_1930_data,
+exécutées en SQL sur les CSV (filtre poussé dans le scan, jointures des
+3 niveaux de dates, extraction des scores) au lieu de pandas.
+
+Les helpers Python (resolve_team, normalize_round, ...) ne sont appelés
+qu'une fois par valeur distincte pour construire de petites tables de
+correspondance jointes en SQL : la sortie est identique au pipeline pandas.
+"""
+import logging
+import os
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+import etl_1930_2010 as base
+import etl_clean_1930_2010 as clean
+from etl_1930_2010 import DATA_DIR, DATETIME_FILE, INPUT_FILE, MATCHES_1994, SPECIFIC_MATCHES
+from etl_metrics import stage
+from etl_normalize import cached_call
+from etl_teams import EDITION_FIXES, resolve_team
+
+logger = logging.getLogger("ETL")
+
+# Table finale laissée dans la connexion par build_1930_table
+STAGING_TABLE = "staging_1930"
+
+# Colonnes utiles du CSV datetime (lu en texte, comme pandas avant normalisation)
+DATETIME_COLUMNS = [
+    "Tournament Id", "Stage Name", "Home Team Name", "Away Team Name",
+    "Replay", "Match Date", "Match Time", "Stadium Name",
+]
+
+FINAL_COLUMNS = [
+    "Datetime", "Stage", "City", "Home Team Name", "Home Team Goals",
+    "Away Team Goals", "Away Team Name", "Home Result", "Away Result",
+]
+
+# =========================
+# SQL
+# =========================
+# Filtre PRELIMINARY / 2014 poussé dans le scan ; l'ordre d'insertion (rowid)
+# reste celui du fichier, comme l'index pandas
+READ_MATCHES = """
+CREATE OR REPLACE TEMP TABLE raw_1930 AS
+SELECT edition, round, score, team1, team2, venue
+FROM read_csv(?, header = true, all_varchar = true)
+WHERE NOT coalesce(contains(upper(round), 'PRELIMINARY'), false)
+  AND NOT coalesce(contains(edition, '2014'), false);
+"""
+
+READ_DATETIME = """
+CREATE OR REPLACE TEMP TABLE raw_datetime AS
+SELECT * FROM datetime_source;
+"""
+
+# Étapes 3 à 7 de load_and_clean_data : mapping, corrections d'édition (team_fixes), Replay
+MATCHES = """
+CREATE OR REPLACE TEMP TABLE matches_1930 AS
+WITH mapped AS (
+    SELECT
+        m.rowid AS _row,
+        m.edition,
+        r.mapped AS round,
+        t1.mapped AS team1,
+        t2.mapped AS team2,
+        m.score,
+        m.venue,
+        NULLIF(regexp_extract(m.edition, '(\\d{4})', 1), '') AS _year
+    FROM raw_1930 m
+    JOIN round_map r ON r.raw IS NOT DISTINCT FROM m.round
+    JOIN team_map t1 ON t1.raw IS NOT DISTINCT FROM m.team1
+    JOIN team_map t2 ON t2.raw IS NOT DISTINCT FROM m.team2
+), fixed AS (
+    SELECT m.* REPLACE (
+        coalesce(f1.fixed, m.team1) AS team1,
+        coalesce(f2.fixed, m.team2) AS team2
+    )
+    FROM mapped m
+    LEFT JOIN team_fixes f1 ON f1.year_ = m._year AND f1.raw = m.team1
+    LEFT JOIN team_fixes f2 ON f2.year_ = m._year AND f2.raw = m.team2
+)
+SELECT
+    *,
+    CASE WHEN row_number() OVER (PARTITION BY edition, round, team1, team2 ORDER BY _row) > 1
+         THEN 1 ELSE 0 END AS "Replay",
+    least(team1, team2) AS _team_lo,
+    greatest(team1, team2) AS _team_hi
+FROM fixed;
+"""
+
+DATETIMES = """
+CREATE OR REPLACE TEMP TABLE datetimes_1930 AS
+SELECT
+    d.rowid AS _pos,
+    NULLIF(regexp_extract(d."Tournament Id", '(\\d{4})', 1), '') AS _year,
+    r.mapped AS round,
+    t1.mapped AS team1,
+    t2.mapped AS team2,
+    least(t1.mapped, t2.mapped) AS _team_lo,
+    greatest(t1.mapped, t2.mapped) AS _team_hi,
+    coalesce(TRY_CAST(TRY_CAST(d."Replay" AS DOUBLE) AS INTEGER), 0) AS "Replay",
+    d."Match Date",
+    d."Match Time",
+    d."Stadium Name"
+FROM raw_datetime d
+JOIN round_map r ON r.raw IS NOT DISTINCT FROM d."Stage Name"
+JOIN team_map t1 ON t1.raw IS NOT DISTINCT FROM d."Home Team Name"
+JOIN team_map t2 ON t2.raw IS NOT DISTINCT FROM d."Away Team Name";
+"""
+
+# resolve_match_dates : premier match (plus petit _pos) de chaque niveau de clé
+RESOLVE_DATES = """
+CREATE OR REPLACE TEMP TABLE dated_1930 AS
+WITH level1 AS (
+    SELECT _year, round, _team_lo, _team_hi, "Replay", min(_pos) AS pos
+    FROM datetimes_1930 WHERE _year IS NOT NULL
+    GROUP BY ALL
+), level2 AS (
+    SELECT _year, round, _team_lo, _team_hi, min(_pos) AS pos
+    FROM datetimes_1930 WHERE _year IS NOT NULL
+    GROUP BY ALL
+), level3 AS (
+    SELECT _year, _team_lo, _team_hi, min(_pos) AS pos
+    FROM datetimes_1930 WHERE _year IS NOT NULL
+    GROUP BY ALL
+)
+SELECT m.*, d."Match Date", d."Match Time"
+FROM matches_1930 m
+LEFT JOIN level1 l1 USING (_year, round, _team_lo, _team_hi, "Replay")
+LEFT JOIN level2 l2 USING (_year, round, _team_lo, _team_hi)
+LEFT JOIN level3 l3 USING (_year, _team_lo, _team_hi)
+LEFT JOIN datetimes_1930 d ON d._pos = coalesce(l1.pos, l2.pos, l3.pos);
+"""
+
+SPECIFIC_MATCH_DATE = """
+SELECT "Match Date", "Match Time"
+FROM datetimes_1930
+WHERE "Stadium Name" = $stadium
+  AND ((team1 = $team1 AND team2 = $team2) OR (team1 = $team2 AND team2 = $team1))
+ORDER BY _pos
+LIMIT 1
+"""
+
+SPECIFIC_MATCH_UPDATE = """
+UPDATE dated_1930
+SET "Replay" = 1, "Match Date" = $date, "Match Time" = $time
+WHERE regexp_matches(venue, $pattern, 'i')
+  AND ((team1 = $team1 AND team2 = $team2) OR (team1 = $team2 AND team2 = $team1))
+"""
+
+MATCH_1994_UPDATE = """
+UPDATE dated_1930
+SET "Match Date" = $date, "Match Time" = $time
+WHERE edition = '1994-USA' AND team1 = $team1 AND team2 = $team2
+"""
+
+# get_cleaned_1930_data : normalisation finale, scores, résultats
+FINAL = f"""
+CREATE OR REPLACE TEMP TABLE {STAGING_TABLE} AS
+WITH cleaned AS (
+    SELECT
+        m._row,
+        dt.mapped AS "Datetime",
+        r.mapped AS "Stage",
+        v.mapped AS "City",
+        h.mapped AS "Home Team Name",
+        a.mapped AS "Away Team Name",
+        CAST(NULLIF(regexp_extract(m.score, '(\\d+)\\s*[-–]\\s*(\\d+)', 1), '') AS INTEGER) AS "Home Team Goals",
+        CAST(NULLIF(regexp_extract(m.score, '(\\d+)\\s*[-–]\\s*(\\d+)', 2), '') AS INTEGER) AS "Away Team Goals"
+    FROM dated_1930 m
+    JOIN datetime_map dt ON dt.match_date IS NOT DISTINCT FROM m."Match Date"
+                        AND dt.match_time IS NOT DISTINCT FROM m."Match Time"
+    JOIN clean_round_map r ON r.raw IS NOT DISTINCT FROM m.round
+    JOIN venue_map v ON v.raw IS NOT DISTINCT FROM m.venue
+    JOIN home_team_map h ON h.raw IS NOT DISTINCT FROM m.team1
+    JOIN away_team_map a ON a.raw IS NOT DISTINCT FROM m.team2
+)
+SELECT
+    "Datetime", "Stage", "City", "Home Team Name", "Home Team Goals", "Away Team Goals", "Away Team Name",
+    CASE WHEN "Home Team Goals" IS NULL OR "Away Team Goals" IS NULL THEN NULL
+         WHEN "Home Team Goals" > "Away Team Goals" THEN 'winner'
+         WHEN "Home Team Goals" < "Away Team Goals" THEN 'loser'
+         ELSE 'draw' END AS "Home Result",
+    CASE WHEN "Home Team Goals" IS NULL OR "Away Team Goals" IS NULL THEN NULL
+         WHEN "Away Team Goals" > "Home Team Goals" THEN 'winner'
+         WHEN "Away Team Goals" < "Home Team Goals" THEN 'loser'
+         ELSE 'draw' END AS "Away Result"
+FROM cleaned
+ORDER BY _row;
+"""
+
+
+# =========================
+# TABLES DE CORRESPONDANCE
+# =========================
+def read_datetime_csv(path):
+    """
+    Lecteur Arrow en flux du CSV datetime (latin-1 transcodé).
+    Les quelques lignes entièrement entre guillemets sont ignorées : pandas
+    les lit sans "Tournament Id", elles ne sont jamais appariées.
+    """
+    return pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(encoding="latin1"),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=lambda row: "skip"),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=DATETIME_COLUMNS,
+            column_types={name: pa.string() for name in DATETIME_COLUMNS},
+            strings_can_be_null=True,
+        ),
+    )
+
+
+def _distinct(con, query):
+    return [row[0] for row in con.execute(query).fetchall()]
+
+
+def register_mapping(con, name, values, func, *args):
+    """Table name(raw, mapped) : func appliqué une fois par valeur distincte"""
+    mapped = [cached_call(func, value, *args) for value in values]
+    table = pa.table({
+        "raw": pa.array(values, type=pa.string()),
+        "mapped": pa.array(mapped, type=pa.string()),
+    })
+    con.register(name, table)
+    return len(values)
+
+
+def _venue_to_city(venue):
+    return clean.normalize_city(base.city_to_english(venue))
+
+
+def register_datetime_map(con):
+    """build_datetime sur les couples (Match Date, Match Time) distincts"""
+    pairs = con.execute('SELECT DISTINCT "Match Date", "Match Time" FROM dated_1930').fetchall()
+    dates = pd.Series([p[0] for p in pairs], dtype=object)
+    times = pd.Series([p[1] for p in pairs], dtype=object)
+    parsed, report = base.build_datetime(dates, times)
+    if report["failed"] > 0:
+        logger.warning("⚠️  %s dates n'ont PAS pu être parsées!", report["failed"])
+        logger.warning("Exemple de format problématique: %s", report["sample"])
+    table = pa.table({
+        "match_date": pa.array(dates, type=pa.string()),
+        "match_time": pa.array(times, type=pa.string()),
+        "mapped": pa.array(parsed, type=pa.timestamp("us"), from_pandas=True),
+    })
+    con.register("datetime_map", table)
+
+
+# =========================
+# PIPELINE
+# =========================
+def build_1930_table(con, data_dir=DATA_DIR):
+    """
+    Exécute tout le pipeline 1930-2010 dans con.
+    Laisse la table temporaire STAGING_TABLE (colonnes de FINAL_COLUMNS).
+    """
+    with stage("read") as m:
+        con.execute(READ_MATCHES, [os.path.join(data_dir, INPUT_FILE)])
+        con.register("datetime_source", read_datetime_csv(os.path.join(data_dir, DATETIME_FILE)))
+        con.execute(READ_DATETIME)
+        con.unregister("datetime_source")
+        m["rows_out"] = con.execute("SELECT COUNT(*) FROM raw_1930").fetchone()[0]
+
+    with stage("normalize", rows_in=m["rows_out"]) as m:
+        register_mapping(con, "round_map", _distinct(con, """
+            SELECT round FROM raw_1930 UNION SELECT "Stage Name" FROM raw_datetime
+        """), base.normalize_round)
+        register_mapping(con, "team_map", _distinct(con, """
+            SELECT team1 FROM raw_1930 UNION SELECT team2 FROM raw_1930
+            UNION SELECT "Home Team Name" FROM raw_datetime UNION SELECT "Away Team Name" FROM raw_datetime
+        """), resolve_team)
+        con.register("team_fixes", pa.table({
+            "year_": pa.array([str(year) for year, _ in EDITION_FIXES], type=pa.string()),
+            "raw": pa.array([raw for _, raw in EDITION_FIXES], type=pa.string()),
+            "fixed": pa.array(list(EDITION_FIXES.values()), type=pa.string()),
+        }))
+        con.execute(MATCHES)
+        con.execute(DATETIMES)
+        m["rows_out"] = con.execute("SELECT COUNT(*) FROM matches_1930").fetchone()[0]
+
+    with stage("date_resolution", rows_in=m["rows_out"]) as m:
+        con.execute(RESOLVE_DATES)
+        for stadium, team1, team2 in SPECIFIC_MATCHES:
+            row = con.execute(SPECIFIC_MATCH_DATE, {"stadium": stadium, "team1": team1, "team2": team2}).fetchone()
+            if row is not None:
+                con.execute(SPECIFIC_MATCH_UPDATE, {
+                    "pattern": stadium.split()[0], "team1": team1, "team2": team2,
+                    "date": row[0], "time": row[1],
+                })
+        for team1, team2, d, t in MATCHES_1994:
+            con.execute(MATCH_1994_UPDATE, {"team1": team1, "team2": team2, "date": d, "time": t})
+        m["rows_out"] = con.execute('SELECT COUNT("Match Date") FROM dated_1930').fetchone()[0]
+
+    with stage("datetime", rows_in=m["rows_out"]):
+        register_datetime_map(con)
+
+    with stage("results") as m:
+        register_mapping(con, "clean_round_map", _distinct(con, "SELECT DISTINCT round FROM dated_1930"),
+                         clean.normalize_round)
+        register_mapping(con, "venue_map", _distinct(con, "SELECT DISTINCT venue FROM dated_1930"),
+                         _venue_to_city)
+        register_mapping(con, "home_team_map", _distinct(con, "SELECT DISTINCT team1 FROM dated_1930"),
+                         clean.normalize_text, "home team")
+        register_mapping(con, "away_team_map", _distinct(con, "SELECT DISTINCT team2 FROM dated_1930"),
+                         clean.normalize_text, "away team")
+        con.execute(FINAL)
+        m["rows_out"] = con.execute(f"SELECT COUNT(*) FROM {STAGING_TABLE}").fetchone()[0]
+
+    logger.info("✅ Données 1930-2010 finales prêtes (DuckDB) : %s matches", m["rows_out"])
+    return STAGING_TABLE
+
+
+def connect(threads=None):
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads = {int(threads)}")
+    return con
+
+
+def get_cleaned_1930_data(data_dir=DATA_DIR, threads=None):
+    """Même DataFrame que etl_clean_1930_2010.get_cleaned_1930_data"""
+    con = connect(threads)
+    try:
+        table = build_1930_table(con, data_dir)
+        df = con.execute(f"SELECT * FROM {table}").df()
+    finally:
+        con.close()
+    df["Home Team Goals"] = df["Home Team Goals"].astype("Int64")
+    df["Away Team Goals"] = df["Away Team Goals"].astype("Int64")
+    df["Datetime"] = df["Datetime"].astype("datetime64[us]")
+    return df[FINAL_COLUMNS]
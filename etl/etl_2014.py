@@ -1,8 +1,11 @@
-import duckdb
 import pandas as pd
 from unidecode import unidecode
-import geonamescache
 import logging
+from etl_columns import read_source
+from etl_geonames import get_countries, get_geonames, normalize_city_name, resolve_city
+from etl_metrics import stage
+from etl_normalize import normalize_series
+from etl_teams import resolve_team, resolve_teams
 
 logger = logging.getLogger("ETL")
 
@@ -10,9 +13,15 @@ logger = logging.getLogger("ETL")
 pd.set_option("display.max_columns", None)
 pd.set_option("display.width", None)
 
-gc = geonamescache.GeonamesCache()
-cities =  gc.get_cities()
-countries = gc.get_countries()
+
+def __getattr__(name):
+    # Référentiels geonamescache chargés au premier accès, pas à l'import du module
+    if name == "countries":
+        return get_countries()
+    if name == "gc":
+        return get_geonames()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 STAGE_MAP = {
         "group a": "group",
@@ -33,15 +42,6 @@ STAGE_MAP = {
         "play-off for third place": "play-off for third place",
     }
 
-COUNTRY_FIX_MAP = {
-    'rn">bosnia and herzegovina': "bosnia and herzegovina",
-    "ci? 1/2te d'ivoire": "ivory coast",
-    "ir iran": "iran",
-    "korea republic": "south korea",
-    "usa": "united states",
-    "china pr": "china"
-}
-
 def clean_text(value, default="Unknown"):
     if pd.isna(value) or str(value).strip() == "":
         logger.warning("Valeur manquante remplacée par %s", default)
@@ -56,14 +56,9 @@ def city_to_english(city):
         logger.warning("Ville manquante")
         return "unknown"
 
-    city_clean = unidecode(str(city)).lower().strip()
-
-    for c in cities.values():
-        c_name = unidecode(c["name"]).lower().strip()
-        if c_name == city_clean:
-            return c_name
+    city_clean = normalize_city_name(city)
 
-    return city_clean 
+    return resolve_city(city_clean) or city_clean
 
 def normalize_stage(stage):
     if pd.isna(stage):
@@ -75,21 +70,15 @@ def normalize_stage(stage):
     return STAGE_MAP.get(key, key)
 
 def normalize_country(name):
-    if pd.isna(name) or str(name).strip() == "":
-        logger.warning("Pays manquant → unknown")
-        return "unknown"
-
-    key = unidecode(str(name)).lower().strip()
-
-    if key in COUNTRY_FIX_MAP:
-        return COUNTRY_FIX_MAP[key]
+    # Alias (USA, IR Iran, noms mal encodés...) : référentiel commun etl_teams
+    return resolve_team(name)
 
-    logger.warning("Pays hors référentiel officiel : %s", name)
-    return key
-def get_cleaned_2014_data():
+def get_cleaned_2014_data(data_dir="./../data"):
     
-    df = pd.read_csv('./../data/WorldCupMatches2014.csv', sep=";", encoding='iso-8859-1') 
-    df = df.drop(columns=["Year", "Stadium", "Attendance", "Half-time Home Goals", "Half-time Away Goals", "Referee", "Assistant 1", "Assistant 2","RoundID"  ,  "MatchID","Home Team Initials", "Away Team Initials"])
+    # Seules les colonnes du registre sont parsées (Year, Stadium, Referee... ne sont plus lues)
+    with stage("read") as m:
+        df = read_source("2014", data_dir)
+        m["rows_out"] = len(df)
 
     df["Datetime"] = pd.to_datetime(
         df["Datetime"],
@@ -133,11 +122,13 @@ def get_cleaned_2014_data():
         ["Home Result", "Away Result"]] = ["loser", "winner"]
     df = df.drop(columns=["Win conditions", "Score home", "Score away"])
 
-    df["Stage"] = df["Stage"].apply(normalize_stage)
+    with stage("normalize", rows_in=len(df)) as m:
+        df["Stage"] = normalize_series(df["Stage"], normalize_stage)
 
-    df["City"] = df["City"].apply(city_to_english)
+        df["City"] = normalize_series(df["City"], city_to_english)
 
-    df["Home Team Name"] = df["Home Team Name"].apply(normalize_country)
-    df["Away Team Name"] = df["Away Team Name"].apply(normalize_country)
+        df["Home Team Name"] = resolve_teams(df["Home Team Name"])
+        df["Away Team Name"] = resolve_teams(df["Away Team Name"])
+        m["rows_out"] = len(df)
 
     return df
\ No newline at end of file
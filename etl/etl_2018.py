@@ -1,10 +1,18 @@
 import json
+import logging
 import pandas as pd
 import numpy as np
+from array import array
 from pathlib import Path
 from unidecode import unidecode
+from etl_json_stream import JsonStream
+from etl_metrics import stage
+from etl_normalize import normalize_series
+from etl_teams import resolve_teams
 import os
 
+logger = logging.getLogger("ETL")
+
 # --- FONCTIONS UTILITAIRES (HELPERS) ---
 
 def clean_text_field(text):
@@ -24,23 +32,20 @@ def standardize_stage_name(val):
     if 'final' in val: return 'final'
     return val
 
-# --- FONCTION PRINCIPALE ETL ---
+# --- EXTRACTION ---
 
-def get_cleaned_2018_data(json_file_path):
-    """
-    Extrait, Transforme et Nettoie les données du JSON 2018.
-    Retourne un DataFrame Pandas prêt pour l'analyse.
-    """
-    PROJECT_ROOT = Path(__file__).resolve().parents[1]
-    DATA_DIR = PROJECT_ROOT / "data"
-    json_file_path = DATA_DIR / "data_2018.json"
+# Sections du JSON contenant des matchs, dans l'ordre de sortie
+MATCH_SECTIONS = ('groups', 'knockout')
+
+# ETL_2018_STREAMING=1 : extraction en flux (JSON multi-tournois volumineux)
+STREAMING = os.environ.get("ETL_2018_STREAMING", "0") == "1"
+
+# ID absent (None) dans les buffers d'entiers
+_MISSING_ID = np.iinfo(np.int64).min
 
-    print(f"Traitement du fichier : {json_file_path}")
-    
-    # 1. EXTRACTION
-    if not os.path.exists(json_file_path):
-        raise FileNotFoundError(f"Le fichier {json_file_path} est introuvable.")
 
+def extract_matches(json_file_path):
+    """Extraction historique : json.load de tout le fichier, un dict par match."""
     with open(json_file_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
@@ -71,21 +76,155 @@ def get_cleaned_2018_data(json_file_path):
     for k, v in data['knockout'].items():
         _extract_matches(v['matches'], v['name'])
 
-    # Création du DataFrame initial
-    df = pd.DataFrame(all_matches)
+    return pd.DataFrame(all_matches)
+
+
+class _MatchBuffers:
+    """Colonnes typées d'une section (groups ou knockout), remplies match par match."""
+
+    def __init__(self):
+        self.dates = []
+        self.round_codes = array('i')
+        self.stadiums = array('q')
+        self.home_teams = array('q')
+        self.away_teams = array('q')
+        self.home_goals = array('d')
+        self.away_goals = array('d')
+
+    def append(self, m, round_code):
+        self.dates.append(m['date'])
+        self.round_codes.append(round_code)
+        self.stadiums.append(_id_or_missing(m['stadium']))
+        self.home_teams.append(_id_or_missing(m['home_team']))
+        self.away_teams.append(_id_or_missing(m['away_team']))
+        self.home_goals.append(np.nan if m['home_result'] is None else m['home_result'])
+        self.away_goals.append(np.nan if m['away_result'] is None else m['away_result'])
+
+
+def _id_or_missing(value):
+    return _MISSING_ID if value is None else value
+
+
+def _lookup(ids, values, keys):
+    """Résout des IDs par recherche dichotomique dans des tableaux triés (dernier doublon gagnant, comme un dict)"""
+    ids = np.asarray(ids, dtype=np.int64)
+    values = np.asarray(values, dtype=object)
+    keys = np.frombuffer(keys, dtype=np.int64) if len(keys) else np.empty(0, dtype=np.int64)
+    result = np.full(len(keys), None, dtype=object)
+    if len(ids) == 0:
+        return result
+
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    last = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+    sorted_ids, sorted_values = sorted_ids[last], values[order][last]
+
+    idx = np.searchsorted(sorted_ids, keys).clip(max=len(sorted_ids) - 1)
+    found = sorted_ids[idx] == keys
+    result[found] = sorted_values[idx[found]]
+    return result
+
+
+def extract_matches_streaming(json_file_path):
+    """
+    Extraction en flux : groups/knockout sont parcourus groupe par groupe et
+    chaque match remplit des buffers typés. teams/stadiums ne gardent que
+    (id, nom) et sont résolus à la fin, quel que soit leur ordre dans le fichier.
+    Même DataFrame que extract_matches.
+    """
+    team_ids, team_names = array('q'), []
+    stadium_ids, stadium_cities = array('q'), []
+    round_labels, round_codes = [], {}
+    buffers = {section: _MatchBuffers() for section in MATCH_SECTIONS}
+
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        stream = JsonStream(f)
+        for key in stream.iter_object():
+            if key == 'teams':
+                for _ in stream.iter_array():
+                    t = stream.read_value()
+                    team_ids.append(_id_or_missing(t['id']))
+                    team_names.append(t['name'])
+            elif key == 'stadiums':
+                for _ in stream.iter_array():
+                    s = stream.read_value()
+                    stadium_ids.append(_id_or_missing(s['id']))
+                    stadium_cities.append(s['city'])
+            elif key in buffers:
+                for _ in stream.iter_object():
+                    group = stream.read_value()
+                    code = round_codes.setdefault(group['name'], len(round_labels))
+                    if code == len(round_labels):
+                        round_labels.append(group['name'])
+                    for m in group['matches']:
+                        buffers[key].append(m, code)
+            else:
+                # tvchannels, images... : jamais matérialisés
+                stream.skip_value()
+
+    parts = [buffers[section] for section in MATCH_SECTIONS]
+    labels = np.asarray(round_labels, dtype=object)
+    codes = np.concatenate([np.frombuffer(b.round_codes, dtype=np.int32) for b in parts])
+
+    def _ints(name):
+        return b''.join(bytes(getattr(b, name)) for b in parts)
+
+    def _goals(name):
+        values = np.concatenate([np.frombuffer(getattr(b, name), dtype=np.float64) for b in parts])
+        # Entiers si aucun score manquant, comme le DataFrame construit depuis des dicts
+        return values.astype(np.int64) if not np.isnan(values).any() else values
+
+    return pd.DataFrame({
+        'raw_date': [d for b in parts for d in b.dates],
+        'raw_round': labels[codes] if len(codes) else np.empty(0, dtype=object),
+        'raw_city': _lookup(stadium_ids, stadium_cities, _ints('stadiums')),
+        'raw_home_team': _lookup(team_ids, team_names, _ints('home_teams')),
+        'raw_away_team': _lookup(team_ids, team_names, _ints('away_teams')),
+        'home_goals': _goals('home_goals'),
+        'away_goals': _goals('away_goals'),
+    })
+
+
+# --- FONCTION PRINCIPALE ETL ---
+
+def get_cleaned_2018_data(json_file_path=None, streaming=None):
+    """
+    Extrait, Transforme et Nettoie les données du JSON 2018.
+    Retourne un DataFrame Pandas prêt pour l'analyse.
+    Par défaut, lit data/data_2018.json à la racine du projet.
+    streaming=True : extraction en flux, mémoire bornée (défaut : ETL_2018_STREAMING).
+    """
+    if json_file_path is None:
+        PROJECT_ROOT = Path(__file__).resolve().parents[1]
+        json_file_path = PROJECT_ROOT / "data" / "data_2018.json"
+    if streaming is None:
+        streaming = STREAMING
+
+    logger.info("Traitement du fichier : %s", json_file_path)
+    
+    # 1. EXTRACTION
+    if not os.path.exists(json_file_path):
+        raise FileNotFoundError(f"Le fichier {json_file_path} est introuvable.")
+
+    with stage("read", streaming=streaming) as m:
+        # Création du DataFrame initial
+        df = extract_matches_streaming(json_file_path) if streaming else extract_matches(json_file_path)
+        m["rows_out"] = len(df)
 
     # 2. TRANSFORMATION & NETTOYAGE
     
     # Date : ISO 8601
     df['Datetime'] = pd.to_datetime(df['raw_date'], utc=True).dt.strftime('%Y-%m-%d %H:%M:%S')
 
-    # Texte : Villes et Équipes (Clean text)
-    df['City'] = df['raw_city'].apply(clean_text_field)
-    df['Home Team Name'] = df['raw_home_team'].apply(clean_text_field)
-    df['Away Team Name'] = df['raw_away_team'].apply(clean_text_field)
+    with stage("normalize", rows_in=len(df)) as m:
+        # Texte : Villes et Équipes (Clean text)
+        df['City'] = normalize_series(df['raw_city'], clean_text_field)
+        df['Home Team Name'] = resolve_teams(df['raw_home_team'])
+        df['Away Team Name'] = resolve_teams(df['raw_away_team'])
 
-    # Stage : Standardisation
-    df['Stage'] = df['raw_round'].apply(standardize_stage_name)
+        # Stage : Standardisation
+        df['Stage'] = normalize_series(df['raw_round'], standardize_stage_name)
+        m["rows_out"] = len(df)
 
     # Buts : Conversion en Entiers
     df['Home Team Goals'] = df['home_goals'].fillna(0).astype(int)
@@ -118,7 +257,7 @@ def get_cleaned_2018_data(json_file_path):
     
     df_final = df[final_cols]
     
-    print(f"✅ Succès : {len(df_final)} matchs traités.")
+    logger.info("✅ Succès : %s matchs traités.", len(df_final))
     return df_final
 
 # --- TEST DU SCRIPT (S'exécute seulement si on lance ce fichier directement) ---
@@ -1,16 +1,16 @@
 # etl_2022.py
+import logging
 import pandas as pd # type: ignore
 import numpy as np # type: ignore
 import os
+from etl_columns import read_source, source_path
+from etl_metrics import stage
+from etl_teams import resolve_team, resolve_teams
 
-# --- 1. GLOBAL CONSTANTS (Configuration) ---
-# Moved here so they are accessible for inspection or modification
-TEAM_MAPPING = {
-    "ir iran": "iran",
-    "korea republic": "south korea"
-    # Add other mapping if necessary
-}
+logger = logging.getLogger("ETL")
 
+# --- 1. GLOBAL CONSTANTS (Configuration) ---
+# Team aliases live in the shared registry (etl_teams.TEAMS)
 STAGE_MAP = {
     **{f'group {x}': 'group' for x in 'abcdefgh'},
     'round of 16': 'round of 16',
@@ -26,14 +26,7 @@ def clean_team_name(name) -> str:
     """
     Unit-testable helper to normalize a single team name.
     """
-    if pd.isna(name):
-        return "unknown"
-    
-    # Convert to string, lowercase, strip
-    clean_val = str(name).lower().strip()
-    
-    # Replace using the dictionary, or return original if not in dict
-    return TEAM_MAPPING.get(clean_val, clean_val)
+    return resolve_team(name)
 
 def create_merge_key(t1: str, t2: str, date_val) -> str:
     """
@@ -56,40 +49,100 @@ def create_merge_key(t1: str, t2: str, date_val) -> str:
     
     return f"{teams[0]}_{teams[1]}_{d_str}"
 
+def _day_numbers(dates) -> np.ndarray:
+    """Days since epoch; NaT gets its own value so NaT keys still match each other (like "NAT")."""
+    dates = pd.to_datetime(pd.Series(dates))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]").astype(np.int64)
+    return days  # NaT -> int64 min, never a real day
+
+def build_merge_keys(left, right) -> tuple:
+    """
+    Vectorized equivalent of create_merge_key for two frames.
+    left / right: (team_a, team_b, dates) Series triples.
+    Team names share one set of categorical codes; the unordered pair is
+    (min code, max code), combined with the day number into one int64 key.
+    Two rows get the same key exactly when create_merge_key gives the same string.
+    """
+    names = pd.concat([left[0], left[1], right[0], right[1]], ignore_index=True).astype(str)
+    codes, uniques = pd.factorize(names)
+    n_teams = max(len(uniques), 1)
+
+    days = np.concatenate([_day_numbers(left[2]), _day_numbers(right[2])])
+    nat = days == np.iinfo(np.int64).min
+    real = days[~nat]
+    first_day = real.min() if len(real) else 0
+    day_index = np.where(nat, 0, days - first_day + 1)  # 0 reserved for NaT
+    n_days = int(day_index.max()) + 1 if len(day_index) else 1
+
+    if n_teams * n_teams * n_days >= np.iinfo(np.int64).max:
+        raise ValueError("Merge key space exceeds int64")
+
+    splits = np.cumsum([len(left[0]), len(left[1]), len(right[0])])
+    a_left, b_left, a_right, b_right = np.split(codes.astype(np.int64), splits)
+    n_left = len(left[0])
+
+    def _keys(a, b, day):
+        return (np.minimum(a, b) * n_teams + np.maximum(a, b)) * n_days + day
+
+    return _keys(a_left, b_left, day_index[:n_left]), _keys(a_right, b_right, day_index[n_left:])
+
+def report_unmatched(df1: pd.DataFrame, df2: pd.DataFrame, key: str = 'join_key') -> tuple:
+    """
+    Rows of either file whose key has no counterpart in the other one
+    (dropped by the inner merge). Logged as warnings, returned for inspection.
+    """
+    unmatched1 = df1[~df1[key].isin(df2[key])]
+    unmatched2 = df2[~df2[key].isin(df1[key])]
+    for label, unmatched, cols in (
+        ("matches", unmatched1, ['team1', 'team2', 'date_clean']),
+        ("venue", unmatched2, ['home_team', 'away_team', 'date_clean']),
+    ):
+        if len(unmatched):
+            logger.warning(
+                "⚠️ %s row(s) of the 2022 %s file have no counterpart and are dropped: %s",
+                len(unmatched), label,
+                unmatched[[c for c in cols if c in unmatched.columns]].head(5).to_dict('records'),
+            )
+    return unmatched1, unmatched2
+
 # --- 3. MAIN PIPELINE (Orchestrator) ---
 
-def get_cleaned_2022_data() -> pd.DataFrame:
+def get_cleaned_2022_data(data_base_dir="./../data") -> pd.DataFrame:
     """
     Main ETL orchestrator. 
     Handles File I/O and applies the helper functions.
     """
-    print("--- STARTING 2022 ETL PROCESS ---")
+    logger.info("--- STARTING 2022 ETL PROCESS ---")
 
     # A. Configuration
-    data_base_dir = "./../data" # Adjust this path as needed
-    
-    file1_path = os.path.join(data_base_dir, "WorldCupMatches2022.csv")
-    file2_path = os.path.join(data_base_dir, "WorldCupMatches2022-venue.csv")
-    mapping_path = os.path.join(data_base_dir, "stadium_city_mapping2022.csv")
+    file1_path = source_path("2022_matches", data_base_dir)
+    file2_path = source_path("2022_venue", data_base_dir)
+    mapping_path = source_path("2022_stadiums", data_base_dir)
 
     # Verify files
     for p in [file1_path, file2_path, mapping_path]:
         if not os.path.exists(p):
             raise FileNotFoundError(f"CRITICAL: Required file not found at {p}")
 
-    # B. Load Data
-    stadium_df = pd.read_csv(mapping_path)
-    stadium_mapping = stadium_df.set_index(stadium_df.columns[0])[stadium_df.columns[1]].to_dict()
+    # B. Load Data (only the registry columns of etl_columns, with explicit dtypes)
+    with stage("read") as m:
+        stadium_df = read_source("2022_stadiums", data_base_dir)
+        stadium_mapping = stadium_df.set_index(stadium_df.columns[0])[stadium_df.columns[1]].to_dict()
 
-    df1 = pd.read_csv(file1_path)
-    df2 = pd.read_csv(file2_path)
+        df1 = read_source("2022_matches", data_base_dir)
+        df2 = read_source("2022_venue", data_base_dir)
+        m["rows_out"] = len(df1)
 
     # C. Transform Team Names (Using Helper)
-    # We use .apply() here to utilize the unit-testable function
-    df1['team1'] = df1['team1'].apply(clean_team_name)
-    df1['team2'] = df1['team2'].apply(clean_team_name)
-    df2['home_team'] = df2['home_team'].apply(clean_team_name)
-    df2['away_team'] = df2['away_team'].apply(clean_team_name)
+    # The unit-testable helper runs once per distinct name (shared memo cache)
+    with stage("normalize", rows_in=len(df1) + len(df2)) as m:
+        df1['team1'] = resolve_teams(df1['team1'])
+        df1['team2'] = resolve_teams(df1['team2'])
+        df2['home_team'] = resolve_teams(df2['home_team'])
+        df2['away_team'] = resolve_teams(df2['away_team'])
+        m["rows_out"] = len(df1) + len(df2)
 
     # D. Transform Dates (Pandas native is fine here, typically tested via integration)
     df1['date_clean'] = pd.to_datetime(df1['date'], dayfirst=True, errors='coerce')
@@ -99,25 +152,28 @@ def get_cleaned_2022_data() -> pd.DataFrame:
     if 'category' in df1.columns:
         df1['round_clean'] = df1['category'].str.lower().str.strip().map(STAGE_MAP).fillna('unknown')
     else:
-        print("Warning: 'category' column missing in File 1")
+        logger.warning("⚠️ 'category' column missing in File 1")
         df1['round_clean'] = 'unknown'
 
-    # F. Generate Join Keys (Using Helper)
-    df1['join_key'] = df1.apply(
-        lambda x: create_merge_key(x['team1'], x['team2'], x['date_clean']), axis=1
-    )
-    df2['join_key'] = df2.apply(
-        lambda x: create_merge_key(x['home_team'], x['away_team'], x['date_clean']), axis=1
-    )
+    with stage("join", rows_in=len(df1)) as m:
+        # F. Generate Join Keys (integer keys, same matching as create_merge_key)
+        df1['join_key'], df2['join_key'] = build_merge_keys(
+            (df1['team1'], df1['team2'], df1['date_clean']),
+            (df2['home_team'], df2['away_team'], df2['date_clean']),
+        )
+        unmatched1, unmatched2 = report_unmatched(df1, df2)
+        m["unmatched_matches"] = len(unmatched1)
+        m["unmatched_venue"] = len(unmatched2)
 
-    # G. Merge
-    merged = pd.merge(df1, df2, on='join_key', how='inner', suffixes=('_f1', '_f2'))
+        # G. Merge
+        merged = pd.merge(df1, df2, on='join_key', how='inner', suffixes=('_f1', '_f2'))
+        m["rows_out"] = len(merged)
 
     if merged.empty:
-        print("Error: Merge resulted in 0 rows.")
+        logger.error("❌ Merge resulted in 0 rows.")
         return pd.DataFrame()
 
-    print(f"Successfully merged {len(merged)} rows.")
+    logger.info("Successfully merged %s rows.", len(merged))
 
     # H. Final Construction
     merged['Home Team Goals'] = pd.to_numeric(merged['number of goals team1'], errors='coerce').fillna(0).astype(int)
@@ -0,0 +1,86 @@
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger("ETL")
+
+
+def default_cache_root(environ=os.environ):
+    """ETL_CACHE_DIR, sinon le cache utilisateur (XDG) : jamais à côté du paquet installé"""
+    if environ.get("ETL_CACHE_DIR"):
+        return Path(environ["ETL_CACHE_DIR"])
+    return Path(environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "worldcup-etl"
+
+
+# --- CONFIGURATION ---
+# Racine des caches (éditions nettoyées, index geonames)
+CACHE_ROOT = default_cache_root()
+CACHE_DIR = CACHE_ROOT / "editions"
+
+
+def file_digest(path):
+    """sha256 d'un fichier, lu par blocs"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_key(inputs, code_files):
+    """
+    Clé d'une édition : chemin absolu et hash de chaque source brute, hash du code de nettoyage.
+    Deux --data-dir différents ne partagent jamais une entrée, même à contenu identique.
+    """
+    h = hashlib.sha256()
+    for path in sorted(os.path.realpath(p) for p in inputs):
+        h.update(f"input:{path}:{file_digest(path)}\n".encode())
+    # Code : nom seul, le cache reste valable si le dépôt ou le venv est déplacé
+    for path in sorted(code_files, key=os.path.basename):
+        h.update(f"code:{os.path.basename(path)}:{file_digest(path)}\n".encode())
+    return h.hexdigest()
+
+
+def cache_path(edition, key, cache_dir=None):
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    return cache_dir / f"{edition}-{key[:16]}.parquet"
+
+
+def invalidate(edition=None, cache_dir=None):
+    """Supprime le cache d'une édition (de toutes si edition=None) ; renvoie le nombre de fichiers"""
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_DIR
+    if not cache_dir.exists():
+        return 0
+    pattern = f"{edition}-*.parquet" if edition else "*.parquet"
+    removed = 0
+    for path in cache_dir.glob(pattern):
+        path.unlink()
+        removed += 1
+    return removed
+
+
+def cached_edition(edition, func, args=(), inputs=(), code_files=(), refresh=False, cache_dir=None):
+    """
+    func(*args), lu dans le cache Parquet si ni les sources ni le code n'ont changé.
+    refresh=True recalcule et réécrit le cache.
+    """
+    key = cache_key(inputs, code_files)
+    path = cache_path(edition, key, cache_dir)
+
+    if path.exists() and not refresh:
+        logger.info("Édition %s lue depuis le cache %s", edition, path)
+        return pd.read_parquet(path)
+
+    df = func(*args)
+
+    # Une seule génération par édition : les anciennes clés sont obsolètes
+    invalidate(edition, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    logger.info("Édition %s mise en cache dans %s", edition, path)
+    return df
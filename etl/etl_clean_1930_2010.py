@@ -2,7 +2,9 @@ import pandas as pd
 from unidecode import unidecode
 import logging
 import re
-from etl_1930_2010 import load_and_clean_data
+from etl_1930_2010 import load_and_clean_data, DATA_DIR
+from etl_metrics import configure_logging, stage
+from etl_normalize import normalize_series
 
 # =========================
 # CONFIG
@@ -13,18 +15,15 @@ pd.set_option("display.width", None)
 # =========================
 # LOGGING
 # =========================
-logging.basicConfig(
-    filename="etl_worldcup.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+# Handlers configurés par le point d'entrée (etl_metrics.configure_logging)
+logger = logging.getLogger("ETL")
 
 # =========================
 # UTILS
 # =========================
 def normalize_text(val, field_name="value"):
     if pd.isna(val) or str(val).strip() == "":
-        logging.warning(f"{field_name} missing → replaced by 'unknown'")
+        logger.warning("%s missing → replaced by 'unknown'", field_name)
         return "unknown"
     val = unidecode(str(val)).lower().strip()
     val = re.sub(r"[^a-z0-9\s]", "", val)
@@ -54,7 +53,7 @@ def normalize_round(val):
 
 def normalize_city(val):
     if pd.isna(val) or str(val).strip() == "":
-        logging.warning("City missing → replaced by 'unknown'")
+        logger.warning("City missing → replaced by 'unknown'")
         return "unknown"
     val = unidecode(str(val)).lower().strip()
     val = val.replace(".", "").replace("_", " ")
@@ -80,33 +79,35 @@ def compute_away_result(row):
         return "loser"
     return "draw"
 
-def get_cleaned_1930_data():
+def get_cleaned_1930_data(data_dir=DATA_DIR):
     """
     Fonction principale qui retourne les données 1930-2010 nettoyées
     """
     # =========================
     # 0️⃣ CHARGER LE DATAFRAME DEPUIS L'AUTRE ETL
     # =========================
-    df_etl = load_and_clean_data()
+    df_etl = load_and_clean_data(data_dir)
     
     # ⚠️ NE PAS RECRÉER DATETIME - Elle existe déjà et est correcte !
     # La colonne Datetime est déjà créée dans etl_1930_2010.py
     
-    # =========================
-    # 1️⃣ NORMALISATION ROUND / STAGE
-    # =========================
-    df_etl["round"] = df_etl["round"].apply(normalize_round)
+    with stage("normalize", rows_in=len(df_etl)) as m:
+        # =========================
+        # 1️⃣ NORMALISATION ROUND / STAGE
+        # =========================
+        df_etl["round"] = normalize_series(df_etl["round"], normalize_round)
 
-    # =========================
-    # 2️⃣ NORMALISATION CITY
-    # =========================
-    df_etl["venue"] = df_etl["venue"].apply(normalize_city)
+        # =========================
+        # 2️⃣ NORMALISATION CITY
+        # =========================
+        df_etl["venue"] = normalize_series(df_etl["venue"], normalize_city)
 
-    # =========================
-    # 3️⃣ NORMALISATION TEAM NAMES
-    # =========================
-    df_etl["team1"] = df_etl["team1"].apply(lambda x: normalize_text(x, "home team"))
-    df_etl["team2"] = df_etl["team2"].apply(lambda x: normalize_text(x, "away team"))
+        # =========================
+        # 3️⃣ NORMALISATION TEAM NAMES
+        # =========================
+        df_etl["team1"] = normalize_series(df_etl["team1"], normalize_text, "home team")
+        df_etl["team2"] = normalize_series(df_etl["team2"], normalize_text, "away team")
+        m["rows_out"] = len(df_etl)
 
     # =========================
     # 4️⃣ GOALS (robuste)
@@ -121,8 +122,10 @@ def get_cleaned_1930_data():
     # =========================
     # 5️⃣ CALCUL DES RESULTATS
     # =========================
-    df_etl["Home Result"] = df_etl.apply(compute_home_result, axis=1)
-    df_etl["Away Result"] = df_etl.apply(compute_away_result, axis=1)
+    with stage("results", rows_in=len(df_etl)) as m:
+        df_etl["Home Result"] = df_etl.apply(compute_home_result, axis=1)
+        df_etl["Away Result"] = df_etl.apply(compute_away_result, axis=1)
+        m["rows_out"] = len(df_etl)
 
     # =========================
     # 6️⃣ SELECTION COLONNES FINALES
@@ -141,9 +144,9 @@ def get_cleaned_1930_data():
     
     df_final = df_etl[list(FINAL_COLUMNS.keys())].rename(columns=FINAL_COLUMNS)
     
-    print("\n✅ Données 1930-2010 finales prêtes")
-    print(f"   - {len(df_final)} matches")
-    print(f"   - {df_final['Datetime'].notna().sum()} avec Datetime")
+    logger.info("✅ Données 1930-2010 finales prêtes")
+    logger.info("   - %s matches", len(df_final))
+    logger.info("   - %s avec Datetime", df_final['Datetime'].notna().sum())
     
     return df_final
 
@@ -151,6 +154,7 @@ def get_cleaned_1930_data():
 # TEST (si exécuté directement)
 # =========================
 if __name__ == "__main__":
+    configure_logging()
     df = get_cleaned_1930_data()
     print("\n🔍 Aperçu final:")
     print(df.info())
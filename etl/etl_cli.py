@@ -0,0 +1,318 @@
+"""
+Point d'entrée en ligne de commande du pipeline Coupe du monde.
+
+Exemples (depuis etl/, ou n'importe où avec --data-dir / --db-path) :
+    worldcup-etl                                   # pipeline complet
+    worldcup-etl --editions 2018,2022              # recharge 2 éditions (incrémental)
+    worldcup-etl --stages extract --output df.parquet
+    worldcup-etl --stages view
+    worldcup-etl --editions 2014 --dry-run         # affiche le plan sans rien exécuter
+    worldcup-etl --stages export --external        # Parquet par année + catalogue de vues
+    worldcup-etl --swap                            # construit db.duckdb.next puis bascule
+    worldcup-etl --rollback                        # remet en service la génération précédente
+
+Étapes :
+- extract : extraction + nettoyage des éditions choisies (cache Parquet) ;
+- load    : contrôle qualité (etl_validation), schéma (si absent) puis chargement
+            dans DuckDB, implique extract ;
+- view    : (re)création de la vue d'analyse ;
+- export  : faits, dimensions et matches_flat en Parquet partitionné par année
+            (hors défaut : --stages all ou --stages ...,export).
+Charger un sous-ensemble d'éditions passe en mode incrémental : les autres
+éditions déjà en base ne sont pas touchées.
+
+--swap : load et view construisent une nouvelle base à côté de la base en service
+(copie de celle-ci en mode incrémental), la valident puis la renomment à sa place.
+Les lecteurs ne voient jamais un chargement partiel ; l'ancienne base est gardée
+en db.duckdb.prev pour --rollback.
+"""
+import argparse
+import logging
+import os
+import sys
+
+import db_creation as db_creator
+import duckdb
+import etl_cache
+import etl_export
+import etl_metrics
+import etl_session
+import etl_validation
+import main as pipeline
+
+logger = logging.getLogger("ETL")
+
+STAGES = ("extract", "load", "view", "export")
+DEFAULT_STAGES = "extract,load,view"
+
+
+def parse_choices(value, choices, label):
+    """"a,b" -> liste dans l'ordre de choices ; "all" -> tout"""
+    if value in (None, "", "all"):
+        return list(choices)
+    requested = [v.strip() for v in value.split(",") if v.strip()]
+    unknown = [v for v in requested if v not in choices]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"{label} inconnue(s) : {', '.join(unknown)} (choix : {', '.join(choices)})")
+    return [c for c in choices if c in requested]
+
+
+def build_parser():
+    editions = list(pipeline.EDITION_SOURCES)
+    parser = argparse.ArgumentParser(
+        prog="worldcup-etl", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--editions", default="all",
+                        type=lambda v: parse_choices(v, editions, "Édition"),
+                        help=f"éditions séparées par des virgules ({','.join(editions)}) ou all")
+    parser.add_argument("--stages", default=DEFAULT_STAGES,
+                        type=lambda v: parse_choices(v, STAGES, "Étape"),
+                        help=f"étapes séparées par des virgules ({','.join(STAGES)}) ou all ; défaut {DEFAULT_STAGES}")
+    parser.add_argument("--data-dir", default=pipeline.DATA_DIR, help="dossier des sources (ETL_DATA_DIR)")
+    parser.add_argument("--db-path", default=pipeline.DB_PATH, help="base DuckDB (ETL_DB_PATH)")
+    parser.add_argument("--mode", choices=("full", "incremental"), default=None,
+                        help="chargement ; défaut : ETL_LOAD_MODE si toutes les éditions, sinon incremental")
+    parser.add_argument("--key-type", choices=tuple(db_creator.KEY_TYPES), default=pipeline.KEY_TYPE or None,
+                        help="clés des dimensions à la création du schéma (ETL_KEY_TYPE) ; "
+                             "défaut : celles de la base existante, uuid pour une nouvelle base")
+    parser.add_argument("--engine-1930", choices=tuple(pipeline.ENGINES_1930), default=pipeline.ENGINE_1930,
+                        help="moteur du pipeline 1930-2010 (ETL_1930_ENGINE)")
+    parser.add_argument("--export-dir", default=etl_export.EXPORT_DIR, help="dossier de l'export Parquet (ETL_EXPORT_DIR)")
+    parser.add_argument("--external", action="store_true",
+                        help="export : écrit aussi warehouse.duckdb, vues sur les fichiers Parquet")
+    parser.add_argument("--swap", action="store_true", default=etl_session.SWAP,
+                        help="construit une nouvelle base, la valide puis bascule dessus (ETL_DB_SWAP=1)")
+    parser.add_argument("--rollback", action="store_true",
+                        help="remet en service la génération précédente de --db-path puis s'arrête")
+    parser.add_argument("--validation", choices=etl_validation.MODES, default=etl_validation.MODE,
+                        help="contrôle avant load : fail, quarantine, warn ou off (ETL_VALIDATION_MODE)")
+    parser.add_argument("--validation-sample", type=int, default=etl_validation.SAMPLE,
+                        help="contrôle N lignes tirées au hasard, 0 = toutes (ETL_VALIDATION_SAMPLE)")
+    parser.add_argument("--quarantine", default=etl_validation.QUARANTINE_PATH,
+                        help="Parquet des lignes rejetées en mode quarantine (ETL_QUARANTINE_PATH)")
+    parser.add_argument("--validation-report", default=None, help="écrit le rapport de validation en JSON")
+    parser.add_argument("--threads", default=etl_session.THREADS, help="threads DuckDB du chargement (ETL_DB_THREADS)")
+    parser.add_argument("--memory-limit", default=etl_session.MEMORY_LIMIT,
+                        help="mémoire max DuckDB, ex. 2GB (ETL_DB_MEMORY_LIMIT)")
+    parser.add_argument("--temp-directory", default=etl_session.TEMP_DIRECTORY,
+                        help="dossier de débordement DuckDB (ETL_DB_TEMP_DIRECTORY)")
+    parser.add_argument("--workers", type=int, default=pipeline.DEFAULT_WORKERS, help="process d'extraction (ETL_WORKERS)")
+    parser.add_argument("--cache", dest="no_cache", action="store_false", default=not pipeline.DEFAULT_USE_CACHE,
+                        help="lit et écrit le cache Parquet des éditions (ETL_CACHE=1)")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", help="ignore le cache Parquet des éditions")
+    parser.add_argument("--refresh", default="",
+                        type=lambda v: parse_choices(v, editions, "Édition") if v else [],
+                        help="éditions à recalculer et remettre en cache")
+    parser.add_argument("--output", default=None, help="écrit le DataFrame extrait en Parquet")
+    parser.add_argument("--dry-run", action="store_true", help="affiche le plan sans rien exécuter")
+    parser.add_argument("--log-level", default=etl_metrics.LOG_LEVEL, help="niveau de log (ETL_LOG_LEVEL)")
+    parser.add_argument("--metrics-json", default=pipeline.METRICS_JSON, help="rapport JSON des étapes (ETL_METRICS_JSON)")
+    parser.add_argument("--metrics-prom", default=pipeline.METRICS_PROM, help="métriques Prometheus (ETL_METRICS_PROM)")
+    return parser
+
+
+def _cache_status(name, data_dir, use_cache, refresh):
+    if not use_cache:
+        return "désactivé"
+    if name in refresh:
+        return "recalcul"
+    inputs, code_files = pipeline.edition_inputs(name, data_dir)
+    if not all(os.path.exists(p) for p in inputs):
+        return "sources manquantes"
+    path = etl_cache.cache_path(name, etl_cache.cache_key(inputs, code_files))
+    return "hit" if path.exists() else "miss"
+
+
+def make_plan(args):
+    """Travail prévu pour des arguments parsés ; lève ValueError si incohérent"""
+    stages = list(args.stages)
+    if "load" in stages and "extract" not in stages:
+        stages.insert(0, "extract")  # rien à charger sans extraction
+    all_editions = args.editions == list(pipeline.EDITION_SOURCES)
+
+    mode = args.mode or (pipeline.LOAD_MODE if all_editions else "incremental")
+    if "load" in stages and mode == "full" and not all_editions:
+        raise ValueError("--mode full avec un sous-ensemble d'éditions viderait les autres : utiliser incremental")
+    if args.output and "extract" not in stages:
+        raise ValueError("--output demande l'étape extract")
+    if "load" in stages and args.validation == "quarantine" and args.validation_sample:
+        raise ValueError("--validation quarantine contrôle toutes les lignes : pas de --validation-sample")
+
+    # Une base reconstruite à vide (--swap en full) peut changer de clés ; sinon, celles du schéma en place
+    rebuilt = args.swap and mode == "full"
+    try:
+        existing_key_type = None if rebuilt else db_creator.read_key_type(args.db_path)
+    except duckdb.Error as e:
+        raise ValueError(f"Base {args.db_path} illisible : {e}") from e
+    if "load" in stages and existing_key_type and args.key_type not in (None, existing_key_type):
+        raise ValueError(f"--key-type {args.key_type} : la base {args.db_path} est en clés {existing_key_type} "
+                         f"(changer de clés demande une nouvelle base ou --swap en mode full)")
+    key_type = existing_key_type or args.key_type or db_creator.DEFAULT_KEY_TYPE
+
+    use_cache = not args.no_cache
+    editions = []
+    for name in args.editions if "extract" in stages else []:
+        inputs, _ = pipeline.edition_inputs(name, args.data_dir)
+        editions.append({
+            "edition": name,
+            "sources": [{"path": p, "exists": os.path.exists(p)} for p in inputs],
+            "cache": _cache_status(name, args.data_dir, use_cache, args.refresh),
+        })
+
+    return {
+        "stages": stages,
+        "editions": editions,
+        "data_dir": args.data_dir,
+        "db_path": args.db_path,
+        "db_exists": os.path.exists(args.db_path),
+        "mode": mode if "load" in stages else None,
+        "validation": args.validation if "load" in stages else None,
+        "validation_sample": args.validation_sample,
+        "quarantine": args.quarantine,
+        "validation_report": args.validation_report,
+        "key_type": key_type,
+        "schema_exists": existing_key_type is not None,
+        "engine_1930": args.engine_1930,
+        "workers": args.workers,
+        "swap": args.swap and ("load" in stages or "view" in stages),
+        "db_settings": {k: v for k, v in (("threads", args.threads), ("memory_limit", args.memory_limit),
+                                          ("temp_directory", args.temp_directory)) if v},
+        "use_cache": use_cache,
+        "refresh": list(args.refresh),
+        "output": args.output,
+        "export_dir": args.export_dir if "export" in stages else None,
+        "external": args.external,
+    }
+
+
+def format_plan(plan):
+    lines = [f"Étapes : {', '.join(plan['stages'])}"]
+    for e in plan["editions"]:
+        missing = [s["path"] for s in e["sources"] if not s["exists"]]
+        sources = f"MANQUANT {', '.join(missing)}" if missing else f"{len(e['sources'])} source(s) OK"
+        lines.append(f"  extract {e['edition']:<10} {sources} ; cache {e['cache']}")
+    if plan["output"]:
+        lines.append(f"  écrit {plan['output']}")
+    if plan["validation"] and plan["validation"] != "off":
+        sample = f" sur {plan['validation_sample']} lignes" if plan["validation_sample"] else ""
+        target = f" -> {plan['quarantine']}" if plan["validation"] == "quarantine" else ""
+        lines.append(f"  validate mode {plan['validation']}{sample}{target}")
+    if "load" in plan["stages"]:
+        schema = "existant" if plan["schema_exists"] else "à créer"
+        schema += f" (clés {plan['key_type']})"
+        lines.append(f"  load    {plan['db_path']} ; schéma {schema} ; mode {plan['mode']}")
+    if "view" in plan["stages"]:
+        lines.append(f"  view    {plan['db_path']}")
+    if plan["swap"]:
+        base = "copie de la base en service" if plan["mode"] == "incremental" else "base vide"
+        lines.append(f"  swap    {plan['db_path']}.next ({base}) -> validation -> {plan['db_path']}")
+    if plan["db_settings"] and ("load" in plan["stages"] or "view" in plan["stages"]):
+        lines.append(f"  DuckDB  {plan['db_settings']}")
+    if "export" in plan["stages"]:
+        catalog = " + catalogue externe" if plan["external"] else ""
+        lines.append(f"  export  {plan['db_path']} -> {plan['export_dir']}{catalog}")
+    return "\n".join(lines)
+
+
+def run(plan):
+    """Exécute le plan ; renvoie les statistiques du chargement (ou None)"""
+    missing = [s["path"] for e in plan["editions"] for s in e["sources"] if not s["exists"]]
+    if missing:
+        raise FileNotFoundError(f"Sources introuvables : {', '.join(missing)}")
+
+    stats = None
+    if "extract" in plan["stages"]:
+        tasks = pipeline.edition_tasks(plan["data_dir"], plan["engine_1930"])
+        editions = {e["edition"]: tasks[e["edition"]] for e in plan["editions"]}
+        df = pipeline.merge_data(
+            workers=plan["workers"], editions=editions, use_cache=plan["use_cache"],
+            refresh=plan["refresh"], data_dir=plan["data_dir"],
+        )
+        logger.info("📦 %s matchs extraits (%s)", len(df), ", ".join(editions))
+        if plan["output"]:
+            df.to_parquet(plan["output"], index=False)
+            logger.info("💾 DataFrame écrit dans %s", plan["output"])
+
+    if plan["validation"]:
+        # Avant la session : rien n'est écrit en base si le contrôle échoue (mode fail)
+        report = None
+        try:
+            df, report = etl_validation.validate_matches(
+                df, mode=plan["validation"], sample=plan["validation_sample"], quarantine_path=plan["quarantine"],
+            )
+        except etl_validation.ValidationError as e:
+            report = e.report
+            raise
+        finally:
+            if plan["validation_report"] and report is not None:
+                etl_validation.write_report(report, plan["validation_report"])
+        if report and report["quarantined"]:
+            logger.warning("🚧 %s ligne(s) en quarantaine, absentes du chargement : %s",
+                           report["quarantined"], report["quarantine_path"])
+
+    if "load" in plan["stages"] or "view" in plan["stages"]:
+        db_dir = os.path.dirname(plan["db_path"])
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # Schéma, chargement et vue : une connexion, une transaction
+        if plan["swap"]:
+            session = etl_session.SwapSession(plan["db_path"], copy_live=plan["mode"] != "full",
+                                              **plan["db_settings"])
+        else:
+            session = etl_session.LoadSession(plan["db_path"], **plan["db_settings"])
+        with session:
+            if "load" in plan["stages"]:
+                session.create_schema(plan["key_type"])
+                stats = session.load(df, mode=plan["mode"])
+                logger.info("🗄️  Chargement %s : %s", plan["mode"],
+                            {k: v for k, v in stats.items() if k != "match_ids"})
+                logger.info("📊 Tables : %s", session.table_counts())
+            if "view" in plan["stages"]:
+                session.create_view()
+
+    if "export" in plan["stages"]:
+        # Après le commit : l'export ne contient que des données validées
+        etl_export.export_warehouse(plan["db_path"], plan["export_dir"], external=plan["external"])
+    return stats
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.rollback:
+        if args.dry_run:
+            print(f"rollback {args.db_path}{etl_session.PREV_SUFFIX} -> {args.db_path}")
+            return 0
+        etl_metrics.configure_logging(args.log_level)
+        try:
+            etl_session.rollback_swap(args.db_path)
+        except FileNotFoundError as e:
+            logger.error("❌ %s", e)
+            return 1
+        return 0
+
+    try:
+        plan = make_plan(args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.dry_run:
+        print(format_plan(plan))
+        return 0
+
+    etl_metrics.configure_logging(args.log_level)
+    etl_metrics.reset()  # rapport de ce run seulement (main() appelé plusieurs fois dans un process)
+    logger.info("Plan :\n%s", format_plan(plan))
+    try:
+        run(plan)
+    except Exception:
+        logger.exception("❌ Pipeline échoué")
+        return 1
+    finally:
+        # Écrit aussi les étapes terminées quand le pipeline échoue
+        pipeline.write_metrics(args.metrics_json, args.metrics_prom)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+# etl_columns.py
+import os
+
+import pandas as pd
+
+# --- REGISTRE DES SOURCES ---
+# Pour chaque fichier : options de lecture et colonnes réellement utilisées par
+# les étapes du pipeline, avec leur dtype. Les autres colonnes ne sont pas parsées.
+# Les valeurs converties ensuite par pd.to_numeric(errors="coerce") sont lues
+# en texte : une cellule invalide reste coercée en NaN comme avant.
+SOURCES = {
+    "2014": {
+        "file": "WorldCupMatches2014.csv",
+        "read_options": {"sep": ";", "encoding": "iso-8859-1"},
+        "columns": {
+            # dates
+            "Datetime": "str",
+            # normalisation
+            "Stage": "str",
+            "City": "str",
+            "Home Team Name": "str",
+            "Away Team Name": "str",
+            # scores et résultats (tirs au but dans "Win conditions")
+            "Home Team Goals": "str",
+            "Away Team Goals": "str",
+            "Win conditions": "str",
+        },
+    },
+    "2022_matches": {
+        "file": "WorldCupMatches2022.csv",
+        "read_options": {},
+        "columns": {
+            # clé de jointure
+            "team1": "str",
+            "team2": "str",
+            "date": "str",
+            # stage
+            "category": "str",
+            # scores
+            "number of goals team1": "str",
+            "number of goals team2": "str",
+        },
+        # get_cleaned_2022_data tolère son absence (stage "unknown")
+        "optional": {"category"},
+    },
+    "2022_venue": {
+        "file": "WorldCupMatches2022-venue.csv",
+        "read_options": {},
+        "columns": {
+            # clé de jointure
+            "home_team": "str",
+            "away_team": "str",
+            "match_time": "str",
+            # ville (via stadium_city_mapping2022.csv)
+            "venue": "str",
+        },
+    },
+    "2022_stadiums": {
+        "file": "stadium_city_mapping2022.csv",
+        "read_options": {},
+        "columns": {
+            "stadium_name": "str",
+            "city": "str",
+        },
+    },
+}
+
+
+def source_path(name, data_dir):
+    return os.path.join(data_dir, SOURCES[name]["file"])
+
+
+def read_source(name, data_dir):
+    """
+    Lit une source du registre : seulement les colonnes déclarées, avec
+    leur dtype (pas d'inférence). Lève ValueError si une colonne
+    obligatoire manque dans le fichier.
+    """
+    source = SOURCES[name]
+    columns = source["columns"]
+    df = pd.read_csv(
+        source_path(name, data_dir),
+        usecols=lambda column: column in columns,
+        dtype=columns,
+        **source["read_options"],
+    )
+    missing = [c for c in columns if c not in df.columns and c not in source.get("optional", ())]
+    if missing:
+        raise ValueError(f"Source {name} ({source['file']}) : colonnes manquantes {missing}")
+    return df
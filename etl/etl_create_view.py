@@ -1,7 +1,7 @@
 import duckdb
+from etl_metrics import stage
 
-VIEW = """ 
-CREATE OR REPLACE VIEW v_matches_flat AS
+FLAT_SELECT = """
 SELECT
     m.match_id,
 
@@ -31,12 +31,71 @@ JOIN Plays ph ON ph.match_id = m.match_id AND ph.position_ = 'home'
 JOIN Teams th ON th.team_id = ph.team_id
 
 JOIN Plays pa ON pa.match_id = m.match_id AND pa.position_ = 'away'
-JOIN Teams ta ON ta.team_id = pa.team_id;
+JOIN Teams ta ON ta.team_id = pa.team_id
+"""
+
+VIEW = f"""
+CREATE OR REPLACE VIEW v_matches_flat AS
+{FLAT_SELECT};
+"""
+
+# Version matérialisée de v_matches_flat, triée par année / date pour que les
+# zonemaps DuckDB éliminent les row groups hors de la plage demandée
+MATERIALIZED_TABLE = "matches_flat"
+
+FLAT_TABLE_REBUILD = f"""
+CREATE OR REPLACE TABLE {MATERIALIZED_TABLE} AS
+SELECT * FROM ({FLAT_SELECT}) f
+ORDER BY year_, match_date, match_id;
+"""
+
+FLAT_TABLE_DELETE = f"""
+DELETE FROM {MATERIALIZED_TABLE}
+WHERE match_id IN (SELECT UNNEST(?::INTEGER[]));
+"""
+
+FLAT_TABLE_INSERT = f"""
+INSERT INTO {MATERIALIZED_TABLE}
+SELECT * FROM ({FLAT_SELECT}) f
+WHERE f.match_id IN (SELECT UNNEST(?::INTEGER[]))
+ORDER BY year_, match_date, match_id;
 """
 
 
-def create_view(db_path="./../db/db.duckdb"):
-    con = duckdb.connect(db_path)
-    con.execute(VIEW)
-    con.commit()
-    con.close()
\ No newline at end of file
+def create_view(db_path="./../db/db.duckdb", con=None):
+    """con : connexion ouverte (LoadSession), utilisée sans commit ni fermeture"""
+    import etl_query  # etl_query importe ce module
+
+    with stage("view"):
+        if con is not None:
+            con.execute(VIEW)
+            return
+        etl_query.invalidate(db_path)
+        con = duckdb.connect(db_path)
+        con.execute(VIEW)
+        con.commit()
+        con.close()
+
+
+def flat_table_exists(con):
+    return con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name = ?",
+        [MATERIALIZED_TABLE],
+    ).fetchone()[0] > 0
+
+
+def refresh_flat_table(con, match_ids=None):
+    """
+    Rafraîchit matches_flat sur une connexion ouverte (sans commit).
+    match_ids=None : reconstruction complète triée.
+    Sinon seules les lignes des matchs indiqués sont supprimées puis réinsérées.
+    """
+    with stage("flat_table", rows_in=None if match_ids is None else len(match_ids)):
+        if match_ids is None or not flat_table_exists(con):
+            con.execute(FLAT_TABLE_REBUILD)
+            return
+        if not match_ids:
+            return
+        ids = [int(i) for i in match_ids]
+        con.execute(FLAT_TABLE_DELETE, [ids])
+        con.execute(FLAT_TABLE_INSERT, [ids])
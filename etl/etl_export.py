@@ -0,0 +1,207 @@
+"""
+Export Parquet de l'entrepôt et mode « tables externes ».
+
+export_warehouse écrit les faits, les dimensions et matches_flat en Parquet,
+partitionnés par year_ (dossiers Hive year_=1930/...) quand la table a une
+année. Les lignes sont lues par lots (RecordBatchReader DuckDB) et écrites au
+fil de l'eau par pyarrow.dataset : la mémoire ne dépend pas de la taille de la base.
+Chaque export est écrit dans un dossier versionné (export.v<horodatage>), catalogue
+compris ; export_dir est un lien symbolique vers la version courante, remplacé en
+une seule opération : un lecteur ne voit jamais un export à moitié écrit. La
+version précédente est gardée pour les lecteurs qui l'ont déjà ouverte.
+Les lignes sans année ne sont pas exportées (comptées dans le manifeste).
+
+Mode tables externes : warehouse.duckdb, écrit dans le dossier d'export,
+ne contient que des vues read_parquet sur ces fichiers. Les lecteurs
+d'autres process l'ouvrent en lecture seule, ou appellent connect_external pour
+une base en mémoire. Ils ne lisent que les partitions d'années demandées, sans
+prendre le verrou de db.duckdb.
+"""
+import glob
+import json
+import logging
+import os
+import shutil
+import time
+
+import duckdb
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as pa_ds
+import pyarrow.parquet as pq
+from etl_metrics import stage
+
+logger = logging.getLogger("ETL")
+
+# --- CONFIGURATION ---
+EXPORT_DIR = os.environ.get("ETL_EXPORT_DIR", "./../export")
+# Lignes par lot lu dans DuckDB et par row group Parquet
+BATCH_SIZE = 65536
+
+MANIFEST = "manifest.json"
+CATALOG = "warehouse.duckdb"
+PARTITION = "year_"
+
+# Relation exportée -> requête ; les faits reçoivent l'année de leur match pour être partitionnés
+EXPORT_TABLES = {
+    "Teams": "SELECT * FROM Teams",
+    "Rounds": "SELECT * FROM Rounds",
+    "City": "SELECT * FROM City",
+    "MatchTime": "SELECT * FROM MatchTime",
+    "Matches": """
+        SELECT m.*, mt.year_
+        FROM Matches m JOIN MatchTime mt ON mt.time_id = m.time_id
+    """,
+    "Plays": """
+        SELECT p.*, mt.year_
+        FROM Plays p
+        JOIN Matches m    ON m.match_id = p.match_id
+        JOIN MatchTime mt ON mt.time_id = m.time_id
+    """,
+    "matches_flat": "SELECT * FROM matches_flat",
+}
+
+# Vues du catalogue externe qui reprennent une relation exportée
+EXTERNAL_ALIASES = {"v_matches_flat": "matches_flat"}
+
+
+def _write_relation(con, name, sql, out_dir, batch_size):
+    """Écrit une relation par lots ; renvoie son entrée du manifeste"""
+    reader = con.execute(sql).to_arrow_reader(batch_size)
+    schema = reader.schema
+    partition = PARTITION if PARTITION in schema.names else None
+    rows = skipped = 0
+
+    def batches():
+        nonlocal rows, skipped
+        for batch in reader:
+            if partition:
+                # Une année NULL irait dans year_=__HIVE_DEFAULT_PARTITION__, illisible en INTEGER
+                kept = batch.filter(pc.is_valid(batch.column(partition)))
+                skipped += batch.num_rows - kept.num_rows
+                batch = kept
+            rows += batch.num_rows
+            yield batch
+
+    path = os.path.join(out_dir, name)
+    pa_ds.write_dataset(
+        pa.RecordBatchReader.from_batches(schema, batches()), path,
+        format="parquet",
+        partitioning=[partition] if partition else None,
+        partitioning_flavor="hive" if partition else None,
+        basename_template=f"{name}-{{i}}.parquet",
+        max_rows_per_group=batch_size,
+    )
+    if rows == 0:
+        # Table vide : un fichier sans ligne garde le schéma lisible par read_parquet
+        os.makedirs(path, exist_ok=True)
+        pq.write_table(schema.empty_table(), os.path.join(path, f"{name}-0.parquet"))
+    if skipped:
+        logger.warning("⚠️ Export %s : %s lignes sans %s ignorées", name, skipped, partition)
+    return {"columns": schema.names, "partition": partition, "rows": rows, "skipped": skipped}
+
+
+def external_views_sql(export_dir, manifest):
+    """CREATE VIEW read_parquet(...) pour chaque relation du manifeste (chemins absolus, liens résolus)"""
+    statements = []
+    root = os.path.realpath(export_dir)
+    for name, entry in manifest["tables"].items():
+        columns = ", ".join(f'"{c}"' for c in entry["columns"])
+        glob = os.path.join(root, name, "**", "*.parquet").replace("'", "''")
+        options = f", hive_partitioning = true, hive_types = {{'{PARTITION}': INTEGER}}" if entry["partition"] else ""
+        statements.append(f"CREATE OR REPLACE VIEW {name} AS SELECT {columns} FROM read_parquet('{glob}'{options});")
+    for alias, name in EXTERNAL_ALIASES.items():
+        if name in manifest["tables"]:
+            statements.append(f"CREATE OR REPLACE VIEW {alias} AS SELECT * FROM {name};")
+    return "\n".join(statements)
+
+
+def read_manifest(export_dir=EXPORT_DIR):
+    with open(os.path.join(export_dir, MANIFEST), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _versions(export_dir):
+    return glob.glob(f"{glob.escape(export_dir)}.v*")
+
+
+def _swap(export_dir, version_dir):
+    """Fait pointer export_dir vers version_dir (un seul rename) ; renvoie la version remplacée"""
+    previous = None
+    if os.path.islink(export_dir):
+        previous = os.path.realpath(export_dir)
+    elif os.path.exists(export_dir):
+        # Ancien export en dossier simple : devient une version, une seule fois
+        previous = f"{export_dir}.v0"
+        os.rename(export_dir, previous)
+    link_tmp = f"{export_dir}.link-{os.getpid()}"
+    if os.path.lexists(link_tmp):
+        os.remove(link_tmp)
+    os.symlink(os.path.basename(version_dir), link_tmp)
+    os.replace(link_tmp, export_dir)
+    return previous
+
+
+def export_warehouse(db_path="./../db/db.duckdb", export_dir=EXPORT_DIR, external=False,
+                     con=None, batch_size=BATCH_SIZE):
+    """
+    Exporte EXPORT_TABLES en Parquet dans une nouvelle version, puis y fait pointer export_dir.
+    external=True : écrit aussi le catalogue warehouse.duckdb de vues sur ces fichiers.
+    Renvoie le manifeste (colonnes, partition et lignes de chaque relation).
+    """
+    export_dir = os.path.abspath(export_dir)
+    version_dir = f"{export_dir}.v{time.time_ns()}"
+    os.makedirs(version_dir)
+
+    own = con is None
+    if own:
+        con = duckdb.connect(db_path, read_only=True)
+    try:
+        manifest = {"tables": {}}
+        for name, sql in EXPORT_TABLES.items():
+            with stage("export", table=name) as m:
+                manifest["tables"][name] = _write_relation(con, name, sql, version_dir, batch_size)
+                m["rows_out"] = manifest["tables"][name]["rows"]
+        with open(os.path.join(version_dir, MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        if external:
+            # Vues sur les fichiers de cette version : valides avant comme après la bascule
+            create_external_catalog(version_dir, manifest)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+    finally:
+        if own:
+            con.close()
+
+    previous = _swap(export_dir, version_dir)
+    for old in _versions(export_dir):
+        if old not in (version_dir, previous):
+            shutil.rmtree(old, ignore_errors=True)
+    logger.info("📤 Export Parquet : %s (%s)", export_dir,
+                ", ".join(f"{n} {t['rows']}" for n, t in manifest["tables"].items()))
+    return manifest
+
+
+def create_external_catalog(export_dir=EXPORT_DIR, manifest=None):
+    """Écrit warehouse.duckdb : uniquement des vues sur les fichiers de l'export"""
+    export_dir = os.path.realpath(export_dir)
+    manifest = manifest or read_manifest(export_dir)
+    path = os.path.join(export_dir, CATALOG)
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    catalog = duckdb.connect(tmp_path)
+    catalog.execute(external_views_sql(export_dir, manifest))
+    catalog.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def connect_external(export_dir=EXPORT_DIR):
+    """Base DuckDB en mémoire dont les tables sont des vues sur l'export Parquet (aucun verrou de fichier)"""
+    # Manifeste et fichiers lus dans la même version, même si une bascule a lieu entre-temps
+    export_dir = os.path.realpath(export_dir)
+    con = duckdb.connect()
+    con.execute(external_views_sql(export_dir, read_manifest(export_dir)))
+    return con
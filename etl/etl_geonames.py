@@ -0,0 +1,86 @@
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+
+from unidecode import unidecode
+from etl_cache import CACHE_ROOT
+
+logger = logging.getLogger("ETL")
+
+_geonames = None
+_city_index = None
+_countries = None
+
+
+def normalize_city_name(name):
+    """Clé de recherche d'une ville : unidecode + minuscules + strip"""
+    return unidecode(str(name)).lower().strip()
+
+
+def _geonames_version():
+    from importlib.metadata import version
+    return version("geonamescache")
+
+
+def index_path(cache_dir=None):
+    """Fichier de l'index, un par version de geonamescache"""
+    cache_dir = Path(cache_dir) if cache_dir is not None else CACHE_ROOT
+    return cache_dir / f"geonames_cities_{_geonames_version()}.json.gz"
+
+
+def get_geonames():
+    """Instance geonamescache.GeonamesCache, créée au premier appel et partagée"""
+    global _geonames
+    if _geonames is None:
+        import geonamescache
+        _geonames = geonamescache.GeonamesCache()
+    return _geonames
+
+
+def build_city_index():
+    """Nom normalisé -> nom de ville, pour toutes les villes geonamescache (la première gagne)"""
+    index = {}
+    for c in get_geonames().get_cities().values():
+        c_name = normalize_city_name(c["name"])
+        index.setdefault(c_name, c_name)
+    return index
+
+
+def load_city_index(cache_dir=None):
+    """Lit l'index sur disque, ou le construit et l'écrit s'il n'existe pas"""
+    path = index_path(cache_dir)
+    if path.exists():
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    logger.info("Construction de l'index des villes geonames : %s", path)
+    index = build_city_index()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return index
+
+
+def get_city_index():
+    """Index des villes, chargé au premier appel et partagé par toutes les éditions"""
+    global _city_index
+    if _city_index is None:
+        _city_index = load_city_index()
+    return _city_index
+
+
+def resolve_city(name):
+    """Ville correspondant à un nom normalisé, None si inconnue"""
+    return get_city_index().get(name)
+
+
+def get_countries():
+    """Pays geonamescache (code ISO -> infos), chargés au premier appel et non à l'import"""
+    global _countries
+    if _countries is None:
+        _countries = get_geonames().get_countries()
+    return _countries
@@ -1,11 +1,17 @@
 import duckdb
+import etl_query
+from db_creation import get_key_type, reset_plays, reset_schema
+from etl_create_view import refresh_flat_table
+from etl_metrics import stage
+from etl_staging import to_staging_table
+from etl_team_stats import mark_team_stats, refresh_team_stats
 
 SQL_PIPELINE = """
 DROP SEQUENCE IF EXISTS match_id_seq;
 CREATE SEQUENCE match_id_seq START 1;
 
 INSERT INTO Teams (team_id, team_name)
-SELECT uuid(), team_name
+SELECT {team_key}, team_name
 FROM (
     SELECT DISTINCT "Home Team Name" AS team_name FROM staging_matches
     UNION
@@ -13,25 +19,24 @@ FROM (
 );
 
 INSERT INTO Rounds (round_id, round_name)
-SELECT uuid(), Stage
+SELECT {round_key}, Stage
 FROM staging_matches
 GROUP BY Stage;
 
 INSERT INTO City (city_id, city_name)
-SELECT uuid(), City
+SELECT {city_key}, City
 FROM staging_matches
 GROUP BY City;
 
 INSERT INTO MatchTime (time_id, date_, day_, month_, year_)
 SELECT
-  uuid(),
-  CAST("Datetime" AS TIMESTAMP),
+  {time_key},
+  "Datetime",
   EXTRACT(DAY FROM "Datetime"),
   EXTRACT(MONTH FROM "Datetime"),
   EXTRACT(YEAR FROM "Datetime")
 FROM staging_matches
-GROUP BY CAST("Datetime" AS TIMESTAMP), EXTRACT(DAY FROM "Datetime"), 
-         EXTRACT(MONTH FROM "Datetime"), EXTRACT(YEAR FROM "Datetime");
+GROUP BY "Datetime";
 
 CREATE TEMP TABLE match_map AS
 SELECT
@@ -61,7 +66,7 @@ SELECT
 FROM match_map m
 JOIN Rounds r ON r.round_name = m."Stage"
 JOIN City c ON c.city_name = m."City"
-JOIN MatchTime t ON t.date_ = CAST(m."Datetime" AS TIMESTAMP);
+JOIN MatchTime t ON t.date_ = m."Datetime";
 
 INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
 SELECT
@@ -86,21 +91,310 @@ JOIN Teams ta ON ta.team_name = m."Away Team Name";
 DROP TABLE match_map;
 """
 
-TRUNCATE_ALL = """
-TRUNCATE TABLE Plays;
-TRUNCATE TABLE Matches;
-TRUNCATE TABLE MatchTime;
-TRUNCATE TABLE City;
-TRUNCATE TABLE Rounds;
-TRUNCATE TABLE Teams;
+# Mode incrémental : un match est identifié par son jour et sa paire d'équipes (sans
+# ordre domicile / extérieur), plus son rang parmi les matchs de même jour et même paire
+# (matchs rejoués datés du jour du premier). Heure, stage, ville, côté et score peuvent
+# être corrigés : le match garde son match_id. Les éditions présentes dans le staging sont
+# rechargées en entier : leurs matchs absents du staging sont supprimés, les autres
+# éditions ne sont pas lues.
+INCREMENTAL_PIPELINE = """
+CREATE OR REPLACE TEMP TABLE staging_keyed AS
+SELECT
+    *,
+    CAST(date_ AS DATE) AS match_day,
+    LEAST("Home Team Name", "Away Team Name") AS team_low,
+    GREATEST("Home Team Name", "Away Team Name") AS team_high,
+    row_number() OVER (
+        PARTITION BY match_day, team_low, team_high
+        ORDER BY date_, "Stage", "City", "Home Team Name", "Home Team Goals", "Away Team Goals"
+    ) AS occurrence
+FROM (
+    SELECT DISTINCT
+        "Datetime" AS date_,
+        "Stage",
+        "City",
+        "Home Team Name",
+        "Away Team Name",
+        "Home Team Goals",
+        "Away Team Goals",
+        "Home result",
+        "Away result"
+    FROM staging_matches
+    WHERE "Datetime" IS NOT NULL
+);
+
+INSERT INTO Teams (team_id, team_name)
+SELECT {team_key}, s.team_name
+FROM (
+    SELECT "Home Team Name" AS team_name FROM staging_keyed
+    UNION
+    SELECT "Away Team Name" FROM staging_keyed
+) s
+WHERE NOT EXISTS (SELECT 1 FROM Teams t WHERE t.team_name = s.team_name);
+
+INSERT INTO Rounds (round_id, round_name)
+SELECT {round_key}, s."Stage"
+FROM (SELECT DISTINCT "Stage" FROM staging_keyed) s
+WHERE NOT EXISTS (SELECT 1 FROM Rounds r WHERE r.round_name = s."Stage");
+
+INSERT INTO City (city_id, city_name)
+SELECT {city_key}, s."City"
+FROM (SELECT DISTINCT "City" FROM staging_keyed) s
+WHERE NOT EXISTS (SELECT 1 FROM City c WHERE c.city_name = s."City");
+
+INSERT INTO MatchTime (time_id, date_, day_, month_, year_)
+SELECT {time_key}, s.date_, EXTRACT(DAY FROM s.date_), EXTRACT(MONTH FROM s.date_), EXTRACT(YEAR FROM s.date_)
+FROM (SELECT DISTINCT date_ FROM staging_keyed) s
+WHERE NOT EXISTS (SELECT 1 FROM MatchTime t WHERE t.date_ = s.date_);
+
+-- Matchs en base des éditions rechargées, rangés comme le staging
+CREATE OR REPLACE TEMP TABLE existing_matches AS
+SELECT
+    m.match_id, m.time_id, m.round_id, m.city_id,
+    CAST(mt.date_ AS DATE) AS match_day,
+    LEAST(th.team_name, ta.team_name) AS team_low,
+    GREATEST(th.team_name, ta.team_name) AS team_high,
+    ph.team_id AS home_team_id, ph.goal_nb AS home_goals, ph.result_ AS home_result,
+    pa.goal_nb AS away_goals, pa.result_ AS away_result,
+    row_number() OVER (
+        PARTITION BY match_day, team_low, team_high
+        ORDER BY mt.date_, r.round_name, c.city_name, th.team_name, ph.goal_nb, pa.goal_nb
+    ) AS occurrence
+FROM Matches m
+JOIN MatchTime mt ON mt.time_id = m.time_id
+JOIN Rounds r     ON r.round_id = m.round_id
+JOIN City c       ON c.city_id = m.city_id
+JOIN Plays ph     ON ph.match_id = m.match_id AND ph.position_ = 'home'
+JOIN Plays pa     ON pa.match_id = m.match_id AND pa.position_ = 'away'
+JOIN Teams th     ON th.team_id = ph.team_id
+JOIN Teams ta     ON ta.team_id = pa.team_id
+WHERE mt.year_ IN (SELECT DISTINCT EXTRACT(YEAR FROM date_) FROM staging_keyed);
+
+CREATE OR REPLACE TEMP TABLE match_diff AS
+SELECT
+    s.*,
+    t.time_id,
+    r.round_id,
+    c.city_id,
+    th.team_id AS home_team_id,
+    ta.team_id AS away_team_id,
+    e.match_id,
+    e.time_id IS DISTINCT FROM t.time_id
+        OR e.round_id IS DISTINCT FROM r.round_id
+        OR e.city_id IS DISTINCT FROM c.city_id AS moved,
+    e.home_team_id IS DISTINCT FROM th.team_id
+        OR e.home_goals IS DISTINCT FROM s."Home Team Goals"
+        OR e.away_goals IS DISTINCT FROM s."Away Team Goals"
+        OR e.home_result IS DISTINCT FROM s."Home result"
+        OR e.away_result IS DISTINCT FROM s."Away result" AS rescored
+FROM staging_keyed s
+JOIN MatchTime t ON t.date_ = s.date_
+JOIN Rounds r    ON r.round_name = s."Stage"
+JOIN City c      ON c.city_name = s."City"
+JOIN Teams th    ON th.team_name = s."Home Team Name"
+JOIN Teams ta    ON ta.team_name = s."Away Team Name"
+LEFT JOIN existing_matches e
+    ON  e.match_day = s.match_day
+    AND e.team_low = s.team_low
+    AND e.team_high = s.team_high
+    AND e.occurrence = s.occurrence;
+
+CREATE OR REPLACE TEMP TABLE new_matches AS
+SELECT
+    ((SELECT COALESCE(MAX(match_id), 0) FROM Matches)
+     + row_number() OVER (ORDER BY date_, "Stage", "City", "Home Team Name", "Away Team Name"))::INTEGER AS new_match_id,
+    *
+FROM match_diff
+WHERE match_id IS NULL;
+
+CREATE OR REPLACE TEMP TABLE changed_matches AS
+SELECT *
+FROM match_diff
+WHERE match_id IS NOT NULL AND (moved OR rescored);
+
+CREATE OR REPLACE TEMP TABLE deleted_matches AS
+SELECT match_id
+FROM existing_matches e
+WHERE NOT EXISTS (
+    SELECT 1 FROM staging_keyed s
+    WHERE s.match_day = e.match_day AND s.team_low = e.team_low
+      AND s.team_high = e.team_high AND s.occurrence = e.occurrence
+);
 """
 
-def load_matches(df, db_path="./../db/db.duckdb"):
-    con = duckdb.connect(db_path)
-    con.register("staging_matches", df)
-    con.execute(TRUNCATE_ALL)
-    con.commit()
-    con.execute(SQL_PIPELINE)
-    con.commit()
+INCREMENTAL_APPLY = """
+INSERT INTO Matches (match_id, round_id, city_id, time_id)
+SELECT new_match_id, round_id, city_id, time_id
+FROM new_matches;
+
+INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
+SELECT new_match_id, home_team_id, 'home', "Home Team Goals", "Home result"
+FROM new_matches;
+
+INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
+SELECT new_match_id, away_team_id, 'away', "Away Team Goals", "Away result"
+FROM new_matches;
+
+-- (match_id, team_id) reste la clé : une inversion domicile / extérieur ne change que position_
+UPDATE Plays
+SET position_ = CASE WHEN Plays.team_id = c.home_team_id THEN 'home' ELSE 'away' END,
+    goal_nb   = CASE WHEN Plays.team_id = c.home_team_id THEN c."Home Team Goals" ELSE c."Away Team Goals" END,
+    result_   = CASE WHEN Plays.team_id = c.home_team_id THEN c."Home result" ELSE c."Away result" END
+FROM changed_matches c
+WHERE Plays.match_id = c.match_id AND c.rescored;
+"""
+
+# DuckDB refuse dans une transaction UPDATE / DELETE sur Matches tant que Plays la
+# référence : Plays est mise de côté et recréée, Matches est corrigée sur place
+PLAYS_KEEP = """
+CREATE OR REPLACE TEMP TABLE plays_kept AS
+SELECT match_id, team_id, position_, goal_nb, result_
+FROM Plays
+WHERE match_id NOT IN (SELECT match_id FROM deleted_matches);
+"""
+
+MATCHES_FIX = """
+UPDATE Matches
+SET round_id = c.round_id, city_id = c.city_id, time_id = c.time_id
+FROM changed_matches c
+WHERE Matches.match_id = c.match_id AND c.moved;
+
+DELETE FROM Matches
+WHERE match_id IN (SELECT match_id FROM deleted_matches);
+
+INSERT INTO Plays (match_id, team_id, position_, goal_nb, result_)
+SELECT * FROM plays_kept ORDER BY match_id, position_ DESC;
+
+DROP TABLE plays_kept;
+"""
+
+INCREMENTAL_STATS = """
+SELECT
+    (SELECT COUNT(*) FROM new_matches) AS inserted,
+    (SELECT COUNT(*) FROM changed_matches) AS updated,
+    (SELECT COUNT(*) FROM match_diff) - (SELECT COUNT(*) FROM new_matches)
+        - (SELECT COUNT(*) FROM changed_matches) AS unchanged,
+    (SELECT COUNT(*) FROM deleted_matches) AS deleted,
+    (SELECT COUNT(*) FROM staging_matches WHERE "Datetime" IS NULL) AS skipped
+"""
+
+INCREMENTAL_MATCH_IDS = """
+SELECT new_match_id FROM new_matches
+UNION ALL
+SELECT match_id FROM changed_matches
+UNION ALL
+SELECT match_id FROM deleted_matches
+ORDER BY 1
+"""
+
+INCREMENTAL_CLEANUP = """
+DROP TABLE IF EXISTS new_matches;
+DROP TABLE IF EXISTS changed_matches;
+DROP TABLE IF EXISTS deleted_matches;
+DROP TABLE IF EXISTS match_diff;
+DROP TABLE IF EXISTS existing_matches;
+DROP TABLE IF EXISTS staging_keyed;
+"""
+
+# Membre de dimension à partir duquel chaque clé est générée, par pipeline
+FULL_KEY_MEMBERS = {
+    "team_key": ("Teams", "team_id", "team_name"),
+    "round_key": ("Rounds", "round_id", "Stage"),
+    "city_key": ("City", "city_id", "City"),
+    "time_key": ("MatchTime", "time_id", '"Datetime"'),
+}
+
+INCREMENTAL_KEY_MEMBERS = {
+    "team_key": ("Teams", "team_id", "s.team_name"),
+    "round_key": ("Rounds", "round_id", 's."Stage"'),
+    "city_key": ("City", "city_id", 's."City"'),
+    "time_key": ("MatchTime", "time_id", "s.date_"),
+}
+
+def key_expression(key_type, table, id_column, member):
+    """Expression SQL qui génère la clé d'un nouveau membre de dimension"""
+    if key_type == "uuid":
+        return "uuid()"
+    if key_type == "integer":
+        # Entiers denses, à la suite des clés déjà présentes
+        return (f"((SELECT COALESCE(MAX({id_column}), 0) FROM {table})"
+                f" + row_number() OVER (ORDER BY {member}))::INTEGER")
+    if key_type == "hash":
+        return f"hash({member})"
+    raise ValueError(f"Type de clé inconnu : {key_type}")
+
+def render_pipeline(sql, key_type, members):
+    return sql.format(**{
+        name: key_expression(key_type, *member) for name, member in members.items()
+    })
+
+def load_matches(df, db_path="./../db/db.duckdb", mode="full", con=None):
+    """
+    Charge le DataFrame fusionné dans le schéma en étoile.
+    mode="full" : tables recréées vides puis rechargement complet.
+    mode="incremental" : recharge les éditions présentes dans df (matchs identifiés par
+    jour et paire d'équipes) : insère les nouveaux, corrige les modifiés en gardant leur
+    match_id, supprime ceux qui n'y sont plus ; les autres éditions ne sont pas touchées.
+    con : connexion ouverte (LoadSession), utilisée sans commit ni fermeture ;
+    sinon une connexion est ouverte et le chargement est une seule transaction.
+    Retourne les statistiques du chargement et les match_id modifiés.
+    """
+    if mode not in ("full", "incremental"):
+        raise ValueError(f"Mode de chargement inconnu : {mode}")
+
+    with stage("load", rows_in=len(df), mode=mode) as m:
+        # Table Arrow typée (TIMESTAMP, libellés dictionnaire, buts int8) : pas de CAST côté SQL
+        with stage("staging", rows_in=len(df)) as s:
+            staging = to_staging_table(df)
+            s["rows_out"] = staging.num_rows
+
+        own = con is None
+        if own:
+            # Libère la connexion de lecture partagée et vide le cache des requêtes
+            etl_query.invalidate(db_path)
+            con = duckdb.connect(db_path)
+            con.begin()
+        try:
+            stats, match_ids = _load(con, staging, mode)
+            if own:
+                con.commit()
+        finally:
+            if own:
+                con.close()  # sans commit : rollback, la base reste dans son état précédent
+        m["rows_out"] = stats["inserted"] + stats["updated"]
+
+    stats["match_ids"] = match_ids
+    return stats
+
+
+def _load(con, staging, mode):
+    """Chargement dans la transaction en cours de con"""
+    con.register("staging_matches", staging)
+    key_type = get_key_type(con)
+    if key_type is None:
+        raise ValueError("Schéma absent : appeler create_db_schema avant load_matches")
+    if mode == "full":
+        reset_schema(con, key_type)
+        con.execute(render_pipeline(SQL_PIPELINE, key_type, FULL_KEY_MEMBERS))
+        refresh_flat_table(con)
+        refresh_team_stats(con)
+        match_ids = [r[0] for r in con.execute("SELECT match_id FROM Matches ORDER BY 1").fetchall()]
+        stats = {"inserted": len(match_ids), "updated": 0, "unchanged": 0, "deleted": 0, "skipped": 0}
+    else:
+        con.execute(render_pipeline(INCREMENTAL_PIPELINE, key_type, INCREMENTAL_KEY_MEMBERS))
+        inserted, updated, unchanged, deleted, skipped = con.execute(INCREMENTAL_STATS).fetchone()
+        stats = {"inserted": inserted, "updated": updated, "unchanged": unchanged,
+                 "deleted": deleted, "skipped": skipped}
+        match_ids = [r[0] for r in con.execute(INCREMENTAL_MATCH_IDS).fetchall()]
+        # Couples (équipe, année) d'avant correction ou suppression
+        mark_team_stats(con, match_ids)
+        con.execute(INCREMENTAL_APPLY)
+        if deleted or con.execute("SELECT COUNT(*) FROM changed_matches WHERE moved").fetchone()[0]:
+            con.execute(PLAYS_KEEP)
+            reset_plays(con, key_type)
+            con.execute(MATCHES_FIX)
+        con.execute(INCREMENTAL_CLEANUP)
+        refresh_flat_table(con, match_ids)
+        refresh_team_stats(con, match_ids)
     con.unregister("staging_matches")
-    con.close()
\ No newline at end of file
+    return stats, match_ids
@@ -0,0 +1,115 @@
+# etl_json_stream.py
+import json
+
+# --- CONFIGURATION ---
+# Taille des blocs lus dans le fichier : la mémoire reste bornée par ce bloc
+# plus la plus grande valeur décodée d'un coup (un groupe, une équipe...)
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = ",]}" + _WHITESPACE
+
+
+class JsonStream:
+    """
+    Parcours incrémental d'un document JSON (stdlib uniquement).
+    Les objets et tableaux sont itérés entrée par entrée ; seules les
+    valeurs demandées par read_value() sont décodées entièrement.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    # --- tampon ---
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Le préfixe déjà consommé est abandonné à chaque lecture
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("JSON tronqué : fin de fichier inattendue")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"JSON invalide : {char!r} attendu, {self.buf[self.pos]!r} trouvé")
+        self.pos += 1
+
+    # --- valeurs ---
+    def read_value(self):
+        """Décode entièrement la valeur suivante"""
+        first = self._peek()
+        if first not in "{[\"":
+            # Nombre ou littéral : il faut voir son délimiteur pour ne pas le couper
+            while not any(c in _DELIMITERS for c in self.buf[self.pos:]) and self._fill():
+                pass
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            self.pos = end
+            return value
+
+    def skip_value(self):
+        """Saute la valeur suivante sans la garder en mémoire"""
+        first = self._peek()
+        if first == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif first == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def iter_object(self):
+        """Itère les clés d'un objet ; l'appelant lit ou saute chaque valeur"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+    def iter_array(self):
+        """Itère les éléments d'un tableau ; l'appelant lit ou saute chaque élément"""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("]")
+            return
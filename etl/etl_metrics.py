@@ -0,0 +1,196 @@
+# etl_metrics.py
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows : pas de pic RSS
+    resource = None
+
+logger = logging.getLogger("ETL")
+
+# --- CONFIGURATION ---
+# Niveau des messages du pipeline (DEBUG affiche les échantillons de contrôle)
+LOG_LEVEL = os.environ.get("ETL_LOG_LEVEL", "INFO")
+LOG_FILE = os.environ.get("ETL_LOG_FILE", "etl_worldcup.log")
+
+# ETL_TRACEMALLOC=1 : pic mémoire Python exact par étape (ralentit pandas)
+TRACE_PYTHON_MEMORY = os.environ.get("ETL_TRACEMALLOC", "0") == "1"
+
+# Étapes gardées au plus : un process qui enchaîne les sessions sans reset() ne grossit pas
+MAX_RECORDS = int(os.environ.get("ETL_METRICS_MAX_RECORDS", "10000"))
+
+# Étapes mesurées depuis le début du process (ou le dernier reset()), les plus anciennes oubliées
+_records = deque(maxlen=MAX_RECORDS)
+_stack = []
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def configure_logging(level=LOG_LEVEL, log_file=LOG_FILE):
+    """
+    Console (messages seuls) + fichier de log (horodaté).
+    À appeler depuis les points d'entrée, pas à l'import des modules.
+    """
+    root = logging.getLogger()
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter("%(message)s"))
+    root.addHandler(console)
+    if log_file:
+        file_handler = logging.FileHandler(log_file, encoding="utf-8")
+        file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+        root.addHandler(file_handler)
+
+
+# ============================================================
+# Mesures mémoire
+# ============================================================
+
+def current_rss_bytes():
+    """RSS courant du process (Linux), None si indisponible"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def max_rss_bytes():
+    """Pic RSS du process depuis son démarrage, None si indisponible (Windows)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+# ============================================================
+# Étapes
+# ============================================================
+
+@contextmanager
+def stage(name, rows_in=None, **labels):
+    """
+    Mesure une étape du pipeline :
+        with stage("read", edition="2014") as m:
+            df = ...
+            m["rows_out"] = len(df)
+    Les étapes imbriquées héritent des labels de l'étape parente.
+    """
+    parent = _stack[-1] if _stack else None
+    record = {
+        "stage": name,
+        "parent": parent["stage"] if parent else None,
+        "labels": {**(parent["labels"] if parent else {}), **labels},
+        "rows_in": rows_in,
+        "rows_out": None,
+    }
+    # L'étape qui démarre tracemalloc l'arrête à sa sortie
+    started_tracing = TRACE_PYTHON_MEMORY and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if TRACE_PYTHON_MEMORY:
+        if parent is not None:
+            parent["_peak"] = max(parent.get("_peak", 0), tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+
+    _stack.append(record)
+    rss_start = current_rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = repr(e)
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        rss_end = current_rss_bytes()
+        record["rss_delta_bytes"] = rss_end - rss_start if rss_start is not None and rss_end is not None else None
+        record["max_rss_bytes"] = max_rss_bytes()
+        if TRACE_PYTHON_MEMORY:
+            peak = max(tracemalloc.get_traced_memory()[1], record.pop("_peak", 0))
+            record["python_peak_bytes"] = peak
+            if parent is not None:
+                parent["_peak"] = max(parent.get("_peak", 0), peak)
+        if started_tracing:
+            tracemalloc.stop()
+        _stack.pop()
+        _records.append(record)
+        logger.debug(
+            "⏱️  %s %s : %.3fs, %s → %s lignes",
+            name, record["labels"] or "", record["seconds"], record["rows_in"], record["rows_out"],
+        )
+
+
+def records():
+    """Copie des étapes terminées, dans l'ordre de fin"""
+    return [dict(r) for r in _records]
+
+
+def extend(new_records):
+    """Ajoute des étapes mesurées ailleurs (process d'extraction)"""
+    _records.extend(new_records)
+
+
+def reset():
+    _records.clear()
+
+
+# ============================================================
+# Export
+# ============================================================
+
+def write_json(path):
+    """Rapport JSON : une entrée par étape terminée"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"stages": records()}, f, indent=2, default=str)
+
+
+# Métriques exportées : (nom, champ, aide, agrégation des étapes répétées)
+PROMETHEUS_METRICS = [
+    ("etl_stage_seconds", "seconds", "Wall time of a pipeline stage", sum),
+    ("etl_stage_rows_in", "rows_in", "Rows entering a pipeline stage", sum),
+    ("etl_stage_rows_out", "rows_out", "Rows produced by a pipeline stage", sum),
+    ("etl_stage_rss_delta_bytes", "rss_delta_bytes", "Resident memory growth during a stage", max),
+    ("etl_stage_max_rss_bytes", "max_rss_bytes", "Process peak resident memory at stage end", max),
+    ("etl_stage_python_peak_bytes", "python_peak_bytes", "Peak traced Python memory during a stage", max),
+]
+
+
+def _label_string(record):
+    labels = {"stage": record["stage"], **record["labels"]}
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for v in labels.values())
+    return ",".join(f'{k}="{v}"' for k, v in zip(labels, escaped))
+
+
+def prometheus_text():
+    """Format texte Prometheus (node_exporter textfile collector)"""
+    lines = []
+    for metric, field, help_text, aggregate in PROMETHEUS_METRICS:
+        series = {}
+        for record in _records:
+            if record.get(field) is not None:
+                series.setdefault(_label_string(record), []).append(record[field])
+        if not series:
+            continue
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        lines.extend(f"{metric}{{{labels}}} {round(aggregate(values), 6)}" for labels, values in series.items())
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    # Écriture atomique : le collector ne lit jamais un fichier à moitié écrit
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
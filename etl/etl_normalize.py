@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+# Valeurs distinctes gardées au plus par couple (fonction, arguments)
+CACHE_MAXSIZE = 100_000
+
+# Caches partagés par toutes les éditions pendant tout le run
+_caches = {}
+
+# Clé unique pour toutes les valeurs manquantes (None, NaN, pd.NA, NaT)
+_MISSING = object()
+
+
+def _get_cache(func, args):
+    key = (func, args)
+    if key not in _caches:
+        _caches[key] = OrderedDict()
+    return _caches[key]
+
+
+def cached_call(func, value, *args, maxsize=CACHE_MAXSIZE):
+    """func(value, *args) mis en cache (LRU borné) ; func doit être pure"""
+    cache = _get_cache(func, args)
+    key = _MISSING if pd.isna(value) else value
+
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+
+    result = func(value, *args)
+    cache[key] = result
+    if len(cache) > maxsize:
+        cache.popitem(last=False)
+    return result
+
+
+def normalize_series(series, func, *args, maxsize=CACHE_MAXSIZE):
+    """
+    Équivalent de series.apply(lambda v: func(v, *args)) : func n'est appelée
+    qu'une fois par valeur distincte (factorize + cached_call).
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+
+    mapped = np.empty(len(uniques), dtype=object)
+    for i, value in enumerate(uniques):
+        mapped[i] = cached_call(func, value, *args, maxsize=maxsize)
+
+    return pd.Series(mapped[codes], index=series.index, name=series.name)
+
+
+def clear_caches():
+    """Vide tous les caches (entre deux runs indépendants)"""
+    _caches.clear()
+
+
+def cache_info():
+    """Nombre de valeurs en cache par fonction"""
+    return {
+        f"{func.__module__}.{func.__qualname__}{list(args) if args else ''}": len(cache)
+        for (func, args), cache in _caches.items()
+    }
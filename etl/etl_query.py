@@ -0,0 +1,261 @@
+"""
+Couche de requêtes pour les consommateurs de la base (dashboards, API...).
+
+Fonctions typées au-dessus de matches_flat et des agrégats d'équipes. Toutes
+passent par une connexion DuckDB en lecture seule partagée par base. Le SQL
+est constant et les valeurs sont liées en paramètres à chaque exécution (pas
+de requête préparée réutilisable : l'API Python de DuckDB n'en expose pas, et
+EXECUTE n'accepte que des littéraux). Les résultats (tuples immuables) sont
+gardés dans un cache LRU en mémoire.
+
+Le cache est vidé quand la base change :
+- le loader appelle invalidate(db_path) avant d'écrire (libère aussi la
+  connexion, DuckDB refusant un accès en écriture pendant qu'elle est ouverte) ;
+- la signature du fichier (inode, mtime, taille, WAL) est comparée à celle de
+  l'ouverture, au plus une fois par CHECK_INTERVAL secondes (deux os.stat) : un
+  chargement ou une bascule blue/green par un autre process est détecté avec ce délai.
+"""
+import datetime as dt
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Union
+
+import duckdb
+from etl_create_view import MATERIALIZED_TABLE
+from etl_team_stats import ALL_TIME_TABLE, EDITION_TABLE, LOSS_RESULTS, WIN_RESULTS
+
+# --- CONFIGURATION ---
+DB_PATH = os.environ.get("ETL_DB_PATH", "./../db/db.duckdb")
+# Nombre de résultats gardés en mémoire (toutes requêtes confondues)
+CACHE_SIZE = int(os.environ.get("ETL_QUERY_CACHE_SIZE", "1024"))
+# Délai max (secondes) avant de voir une écriture faite par un autre process (0 : à chaque appel)
+CHECK_INTERVAL = float(os.environ.get("ETL_QUERY_CHECK_INTERVAL", "1"))
+
+
+# --- TYPES DE RÉSULTATS ---
+
+class Match(NamedTuple):
+    match_id: int
+    match_date: Optional[dt.datetime]
+    year_: Optional[int]
+    stage: str
+    city: str
+    home_team: str
+    home_goals: int
+    home_result: str
+    away_team: str
+    away_goals: int
+    away_result: str
+
+
+class TeamEdition(NamedTuple):
+    year_: Optional[int]
+    matches: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+
+
+class TeamStats(NamedTuple):
+    """Ligne de TeamEditionStats (une édition)"""
+    team_id: object              # UUID, INTEGER ou UBIGINT selon key_type
+    team_name: str
+    year_: Optional[int]
+    matches: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+
+
+class TeamAllTimeStats(NamedTuple):
+    """Ligne de TeamAllTimeStats (cumul toutes éditions)"""
+    team_id: object
+    team_name: str
+    editions: int
+    first_year: Optional[int]
+    last_year: Optional[int]
+    matches: int
+    wins: int
+    draws: int
+    losses: int
+    goals_for: int
+    goals_against: int
+
+
+class CityResults(NamedTuple):
+    city: str
+    matches: int
+    home_wins: int
+    draws: int
+    away_wins: int
+    goals: int
+
+
+# --- REQUÊTES ---
+MATCH_COLUMNS = ", ".join(Match._fields)
+
+QUERIES = {
+    "head_to_head": (Match, f"""
+        SELECT {MATCH_COLUMNS} FROM {MATERIALIZED_TABLE}
+        WHERE (home_team = $1 AND away_team = $2) OR (home_team = $2 AND away_team = $1)
+        ORDER BY match_date, match_id
+    """),
+    "team_history": (TeamEdition, f"""
+        SELECT {", ".join(TeamEdition._fields)} FROM {EDITION_TABLE}
+        WHERE team_name = $1
+        ORDER BY year_
+    """),
+    "team_edition_stats": (TeamStats, f"""
+        SELECT {", ".join(TeamStats._fields)} FROM {EDITION_TABLE}
+        WHERE team_name = $1 AND year_ = $2
+    """),
+    "team_all_time_stats": (TeamAllTimeStats, f"""
+        SELECT {", ".join(TeamAllTimeStats._fields)} FROM {ALL_TIME_TABLE}
+        WHERE team_name = $1
+    """),
+    "matches_by_edition": (Match, f"""
+        SELECT {MATCH_COLUMNS} FROM {MATERIALIZED_TABLE}
+        WHERE year_ = $1 AND ($2::VARCHAR IS NULL OR stage = $2)
+        ORDER BY match_date, match_id
+    """),
+    "results_by_city": (CityResults, f"""
+        SELECT
+            city,
+            COUNT(*)::INTEGER                                            AS matches,
+            COUNT(*) FILTER (WHERE home_result IN {WIN_RESULTS})::INTEGER  AS home_wins,
+            COUNT(*) FILTER (WHERE home_result = 'draw')::INTEGER          AS draws,
+            COUNT(*) FILTER (WHERE home_result IN {LOSS_RESULTS})::INTEGER AS away_wins,
+            SUM(home_goals + away_goals)::INTEGER                          AS goals
+        FROM {MATERIALIZED_TABLE}
+        WHERE $1::VARCHAR IS NULL OR city = $1
+        GROUP BY city
+        ORDER BY city
+    """),
+}
+
+
+def _file_token(db_path):
+    """Signature de la base : change à chaque écriture (fichier ou WAL) et à chaque bascule (inode)"""
+    token = []
+    for path in (db_path, db_path + ".wal"):
+        try:
+            st = os.stat(path)
+            token.append((st.st_ino, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            token.append(None)
+    return tuple(token)
+
+
+class _Reader:
+    """Connexion en lecture seule d'une base + cache LRU de ses résultats"""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.token = _file_token(db_path)
+        self.checked = time.monotonic()
+        self.con = duckdb.connect(db_path, read_only=True)
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.con.close()
+        self.cache.clear()
+
+
+_readers = {}
+_lock = threading.Lock()
+
+
+def _reader(db_path):
+    """Lecteur de la base, rouvert si le fichier a changé depuis son ouverture"""
+    reader = _readers.get(db_path)
+    if reader is not None:
+        now = time.monotonic()
+        if now - reader.checked >= CHECK_INTERVAL:
+            reader.checked = now
+            if reader.token != _file_token(db_path):
+                reader.close()
+                reader = None
+    if reader is None:
+        reader = _readers[db_path] = _Reader(db_path)
+    return reader
+
+
+def run_query(name, params, db_path=None):
+    """Exécute une requête de QUERIES (ou la lit dans le cache) ; renvoie un tuple de lignes typées"""
+    row_type, sql = QUERIES[name]
+    db_path = os.path.abspath(db_path or DB_PATH)
+    key = (name, tuple(params))
+    with _lock:
+        reader = _reader(db_path)
+        if key in reader.cache:
+            reader.cache.move_to_end(key)
+            reader.hits += 1
+            return reader.cache[key]
+
+        reader.misses += 1
+        result = tuple(row_type(*row) for row in reader.con.execute(sql, list(params)).fetchall())
+        reader.cache[key] = result
+        if len(reader.cache) > CACHE_SIZE:
+            reader.cache.popitem(last=False)
+        return result
+
+
+def invalidate(db_path=None):
+    """
+    Vide le cache et ferme la connexion partagée d'une base (de toutes si db_path=None).
+    Appelé par le loader avant d'écrire.
+    """
+    with _lock:
+        paths = list(_readers) if db_path is None else [os.path.abspath(db_path)]
+        for path in paths:
+            reader = _readers.pop(path, None)
+            if reader is not None:
+                reader.close()
+
+
+def cache_info(db_path=None):
+    reader = _readers.get(os.path.abspath(db_path or DB_PATH))
+    if reader is None:
+        return {"hits": 0, "misses": 0, "size": 0}
+    return {"hits": reader.hits, "misses": reader.misses, "size": len(reader.cache)}
+
+
+# --- API ---
+
+def head_to_head(team_a: str, team_b: str, db_path: Optional[str] = None) -> tuple[Match, ...]:
+    """Matchs entre deux équipes (noms normalisés), dans les deux sens, par date"""
+    return run_query("head_to_head", (team_a, team_b), db_path)
+
+
+def team_history(team: str, db_path: Optional[str] = None) -> tuple[TeamEdition, ...]:
+    """Totaux de l'équipe à chaque édition jouée (TeamEditionStats), par année"""
+    return run_query("team_history", (team,), db_path)
+
+
+def get_team_stats(team: str, year: Optional[int] = None,
+                   db_path: Optional[str] = None) -> Optional[Union[TeamStats, TeamAllTimeStats]]:
+    """Totaux d'une équipe : cumul toutes éditions (year=None) ou une édition ; None si absente"""
+    if year is None:
+        rows = run_query("team_all_time_stats", (team,), db_path)
+    else:
+        rows = run_query("team_edition_stats", (team, int(year)), db_path)
+    return rows[0] if rows else None
+
+
+def matches_by_edition(year: int, stage: Optional[str] = None,
+                       db_path: Optional[str] = None) -> tuple[Match, ...]:
+    """Matchs d'une édition, éventuellement d'une seule phase ("group", "final"...)"""
+    return run_query("matches_by_edition", (int(year), stage), db_path)
+
+
+def results_by_city(city: Optional[str] = None, db_path: Optional[str] = None) -> tuple[CityResults, ...]:
+    """Bilan par ville hôte (toutes si city=None)"""
+    return run_query("results_by_city", (city,), db_path)
@@ -0,0 +1,242 @@
+import logging
+import os
+import shutil
+
+import duckdb
+import etl_query
+from db_creation import SCHEMA_TABLES, create_db_schema
+from etl_create_view import MATERIALIZED_TABLE, create_view
+from etl_inserter_2014 import load_matches
+from etl_metrics import stage
+
+logger = logging.getLogger("ETL")
+
+# --- CONFIGURATION ---
+# Ressources DuckDB d'une session de chargement (vides : réglages DuckDB par défaut).
+# Plusieurs jobs sur la même machine : limiter threads et mémoire, et donner un
+# dossier de débordement pour que les gros tris / jointures passent sur disque.
+THREADS = os.environ.get("ETL_DB_THREADS", "")
+MEMORY_LIMIT = os.environ.get("ETL_DB_MEMORY_LIMIT", "")        # ex. "2GB"
+TEMP_DIRECTORY = os.environ.get("ETL_DB_TEMP_DIRECTORY", "")
+# Bascule blue/green par défaut (SwapSession) pour la CLI
+SWAP = os.environ.get("ETL_DB_SWAP", "0") == "1"
+
+
+class LoadSession:
+    """
+    Une connexion DuckDB et une transaction pour tout un chargement :
+
+        with LoadSession(db_path, threads=4, memory_limit="2GB") as session:
+            session.create_schema("integer")
+            session.load(df, mode="full")
+            session.create_view()
+
+    Commit unique à la sortie du bloc ; en cas d'exception, rollback : la base
+    garde son état d'avant le chargement (jamais d'entrepôt vidé à moitié).
+    """
+
+    def __init__(self, db_path="./../db/db.duckdb", threads=THREADS, memory_limit=MEMORY_LIMIT,
+                 temp_directory=TEMP_DIRECTORY):
+        self.db_path = db_path
+        self.config = {}
+        if threads:
+            self.config["threads"] = int(threads)
+        if memory_limit:
+            self.config["memory_limit"] = str(memory_limit)
+        if temp_directory:
+            self.config["temp_directory"] = str(temp_directory)
+        self.con = None
+
+    def __enter__(self):
+        # Libère la connexion de lecture partagée et vide le cache des requêtes
+        etl_query.invalidate(self.db_path)
+        self.con = duckdb.connect(self.db_path, config=self.config)
+        self.con.begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                with stage("commit"):
+                    self.con.commit()
+            else:
+                logger.error("❌ Chargement annulé (rollback) : %r", exc)
+                self.con.rollback()
+        finally:
+            self.con.close()
+            self.con = None
+        return False
+
+    def settings(self):
+        """Réglages effectifs de la connexion"""
+        rows = self.con.execute(
+            "SELECT name, value FROM duckdb_settings() WHERE name IN ('threads', 'memory_limit', 'temp_directory')"
+        ).fetchall()
+        return dict(rows)
+
+    def create_schema(self, key_type=None):
+        return create_db_schema(key_type=key_type, con=self.con)
+
+    def load(self, df, mode="full"):
+        return load_matches(df, mode=mode, con=self.con)
+
+    def create_view(self):
+        create_view(con=self.con)
+
+    def table_counts(self):
+        """Lignes par table du schéma, sur la connexion de la session (avant ou après commit)"""
+        sql = " UNION ALL ".join(f"SELECT '{t}', COUNT(*) FROM {t}" for t in SCHEMA_TABLES)
+        return dict(self.con.execute(sql).fetchall())
+
+
+# ============================================================
+# Bascule blue/green
+# ============================================================
+
+NEXT_SUFFIX = ".next"   # génération en construction
+PREV_SUFFIX = ".prev"   # génération précédente, gardée pour rollback
+
+
+def validate_database(db_path):
+    """
+    Contrôles avant mise en service d'une base construite.
+    Renvoie les volumes par table ; lève ValueError si la base est incohérente.
+    """
+    con = duckdb.connect(db_path, read_only=True)
+    try:
+        counts = {t: con.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in SCHEMA_TABLES}
+        flat = con.execute(f"SELECT COUNT(*) FROM {MATERIALIZED_TABLE}").fetchone()[0]
+        view = con.execute("SELECT COUNT(*) FROM v_matches_flat").fetchone()[0]
+    except duckdb.Error as e:
+        raise ValueError(f"Base {db_path} incomplète : {e}") from e
+    finally:
+        con.close()
+
+    errors = []
+    if counts["Matches"] == 0:
+        errors.append("aucun match")
+    if counts["Plays"] != 2 * counts["Matches"]:
+        errors.append(f"{counts['Plays']} lignes Plays pour {counts['Matches']} matchs")
+    if flat != counts["Matches"] or view != counts["Matches"]:
+        errors.append(f"{MATERIALIZED_TABLE} {flat} / v_matches_flat {view} pour {counts['Matches']} matchs")
+    if errors:
+        raise ValueError(f"Base {db_path} invalide : {', '.join(errors)}")
+    return counts
+
+
+def _move_aside(path, target):
+    """Garde path sous target par un lien physique : path reste en place, rien ne disparaît"""
+    if os.path.exists(target):
+        os.remove(target)
+    try:
+        os.link(path, target)
+    except OSError:
+        shutil.copy2(path, target)
+
+
+def _move_wal(path, target):
+    """
+    Le WAL suit son fichier : path.wal devient target.wal. Sans WAL à déplacer,
+    un target.wal resté en place est supprimé (il serait rejoué sur le mauvais fichier).
+    """
+    wal, target_wal = path + ".wal", target + ".wal"
+    if os.path.exists(wal):
+        os.replace(wal, target_wal)
+    elif os.path.exists(target_wal):
+        os.remove(target_wal)
+
+
+def swap_database(next_path, db_path):
+    """
+    Met next_path en service à la place de db_path, par un rename atomique.
+    L'ancienne génération est gardée en db_path.prev, avec son WAL. Une connexion
+    déjà ouverte continue de lire l'ancien fichier ; les nouvelles ouvrent le nouveau
+    (dans un même process, une fois fermées les connexions sur l'ancien, DuckDB
+    gardant une instance par chemin).
+    """
+    prev_path = db_path + PREV_SUFFIX
+    if os.path.exists(db_path):
+        _move_aside(db_path, prev_path)
+    _move_wal(db_path, prev_path)
+    os.replace(next_path, db_path)
+    _move_wal(next_path, db_path)
+    etl_query.invalidate(db_path)
+    logger.info("🔁 %s mis en service (génération précédente : %s)", db_path, prev_path)
+
+
+def rollback_swap(db_path):
+    """Remet en service la génération précédente (la courante devient .prev), WAL compris"""
+    prev_path = db_path + PREV_SUFFIX
+    if not os.path.exists(prev_path):
+        raise FileNotFoundError(f"Aucune génération précédente : {prev_path}")
+    tmp_path = db_path + ".rollback"
+    _move_aside(db_path, tmp_path)
+    _move_wal(db_path, tmp_path)
+    os.replace(prev_path, db_path)
+    _move_wal(prev_path, db_path)
+    os.replace(tmp_path, prev_path)
+    _move_wal(tmp_path, prev_path)
+    etl_query.invalidate(db_path)
+    logger.info("↩️  %s : génération précédente remise en service", db_path)
+
+
+class SwapSession(LoadSession):
+    """
+    LoadSession qui construit une nouvelle base à côté de la base en service :
+
+        with SwapSession(db_path) as session:
+            session.create_schema("integer")
+            session.load(df)
+            session.create_view()
+
+    Les lecteurs de db_path ne sont ni bloqués ni exposés à un chargement partiel.
+    À la sortie du bloc, la base db_path.next est validée (validate_database) puis
+    renommée en db_path. copy_live=True part d'une copie de la base en service
+    (chargement incrémental) au lieu d'une base vide.
+    """
+
+    def __init__(self, db_path="./../db/db.duckdb", copy_live=False, validate=validate_database, **settings):
+        super().__init__(db_path + NEXT_SUFFIX, **settings)
+        self.live_path = db_path
+        self.copy_live = copy_live
+        self.validate = validate
+        self.counts = None
+
+    def __enter__(self):
+        for path in (self.db_path, self.db_path + ".wal"):
+            if os.path.exists(path):
+                os.remove(path)  # construction précédente interrompue
+        if self.copy_live and os.path.exists(self.live_path):
+            shutil.copy2(self.live_path, self.db_path)
+            if os.path.exists(self.live_path + ".wal"):
+                shutil.copy2(self.live_path + ".wal", self.db_path + ".wal")
+        return super().__enter__()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                with stage("commit"):
+                    self.con.commit()
+                    self.con.execute("CHECKPOINT")  # fichier autonome, sans WAL, avant le rename
+            finally:
+                self.con.close()
+                self.con = None
+        else:
+            super().__exit__(exc_type, exc, tb)
+            self._discard()
+            return False
+
+        try:
+            with stage("validate"):
+                self.counts = self.validate(self.db_path)
+        except Exception:
+            logger.error("❌ Base construite rejetée, %s reste en service", self.live_path)
+            self._discard()
+            raise
+        swap_database(self.db_path, self.live_path)
+        return False
+
+    def _discard(self):
+        for path in (self.db_path, self.db_path + ".wal"):
+            if os.path.exists(path):
+                os.remove(path)
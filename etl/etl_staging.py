@@ -0,0 +1,77 @@
+# etl_staging.py
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# --- CONTRAT DU STAGING ---
+# Colonnes attendues par les pipelines SQL de etl_inserter_2014, avec leur type Arrow.
+# Les libellés (peu de valeurs distinctes) sont dictionary-encodés, DuckDB les lit sans copie.
+LABEL = pa.dictionary(pa.int32(), pa.string())
+GOALS = pa.int8()
+
+STAGING_SCHEMA = pa.schema([
+    ("Datetime", pa.timestamp("us")),
+    ("Stage", LABEL),
+    ("City", LABEL),
+    ("Home Team Name", LABEL),
+    ("Away Team Name", LABEL),
+    ("Home Team Goals", GOALS),
+    ("Away Team Goals", GOALS),
+    ("Home Result", LABEL),
+    ("Away Result", LABEL),
+])
+
+
+def _label_array(series):
+    """Factorisation pandas -> DictionaryArray (codes int32, valeurs manquantes nulles)"""
+    codes, uniques = pd.factorize(series)
+    indices = pa.array(codes.astype(np.int32), mask=codes < 0)
+    dictionary = pa.array(np.asarray(uniques, dtype=object), type=pa.string())
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def _goals_array(series):
+    values = pa.array(pd.to_numeric(series, errors="raise"), from_pandas=True)
+    return values.cast(GOALS)  # cast sûr : erreur si un score dépasse int8
+
+
+def _datetime_array(series):
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors="coerce")
+    if getattr(series.dt, "tz", None) is not None:
+        series = series.dt.tz_convert("UTC").dt.tz_localize(None)
+    return pa.array(series.astype("datetime64[us]"), type=pa.timestamp("us"), from_pandas=True)
+
+
+CONVERTERS = {
+    pa.timestamp("us"): _datetime_array,
+    LABEL: _label_array,
+    GOALS: _goals_array,
+}
+
+
+def to_staging_table(df):
+    """
+    Convertit le DataFrame fusionné en table Arrow typée selon STAGING_SCHEMA.
+    Une table Arrow (sortie DuckDB par exemple) est convertie par cast.
+    """
+    if isinstance(df, pa.Table):
+        missing = [name for name in STAGING_SCHEMA.names if name not in df.column_names]
+        if missing:
+            raise ValueError(f"Colonnes manquantes pour le staging : {missing}")
+        try:
+            return df.select(STAGING_SCHEMA.names).cast(STAGING_SCHEMA)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            raise ValueError(f"Table non conforme à STAGING_SCHEMA : {e}") from e
+
+    missing = [name for name in STAGING_SCHEMA.names if name not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes pour le staging : {missing}")
+
+    arrays = []
+    for field in STAGING_SCHEMA:
+        try:
+            arrays.append(CONVERTERS[field.type](df[field.name]))
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            raise ValueError(f"Colonne {field.name!r} non conforme au type {field.type} : {e}") from e
+    return pa.Table.from_arrays(arrays, schema=STAGING_SCHEMA)
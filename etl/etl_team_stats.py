@@ -0,0 +1,133 @@
+from etl_metrics import stage
+
+# Agrégats par équipe, tenus à jour par load_matches : une ligne par (équipe, année)
+# et un cumul toutes éditions. Le nom de l'équipe est recopié pour que les lectures
+# se fassent sur une seule table, sans jointure (lectures : etl_query.get_team_stats / team_history).
+EDITION_TABLE = "TeamEditionStats"
+ALL_TIME_TABLE = "TeamAllTimeStats"
+
+# 2022 utilise win / loss, les autres éditions winner / loser
+WIN_RESULTS = ("winner", "win")
+LOSS_RESULTS = ("loser", "loss")
+
+STAT_COLUMNS = ["matches", "wins", "draws", "losses", "goals_for", "goals_against"]
+
+EDITION_SELECT = f"""
+SELECT
+    p.team_id,
+    t.team_name,
+    mt.year_,
+    COUNT(*)::INTEGER                                                    AS matches,
+    COUNT(*) FILTER (WHERE p.result_ IN {WIN_RESULTS})::INTEGER          AS wins,
+    COUNT(*) FILTER (WHERE p.result_ = 'draw')::INTEGER                  AS draws,
+    COUNT(*) FILTER (WHERE p.result_ IN {LOSS_RESULTS})::INTEGER         AS losses,
+    SUM(p.goal_nb)::INTEGER                                              AS goals_for,
+    SUM(o.goal_nb)::INTEGER                                              AS goals_against
+FROM Plays p
+JOIN Plays o      ON o.match_id = p.match_id AND o.position_ <> p.position_
+JOIN Matches m    ON m.match_id = p.match_id
+JOIN MatchTime mt ON mt.time_id = m.time_id
+JOIN Teams t      ON t.team_id = p.team_id
+{{where}}
+GROUP BY p.team_id, t.team_name, mt.year_
+"""
+
+ALL_TIME_SELECT = f"""
+SELECT
+    team_id,
+    any_value(team_name)        AS team_name,
+    COUNT(*)::INTEGER           AS editions,
+    MIN(year_)                  AS first_year,
+    MAX(year_)                  AS last_year,
+    SUM(matches)::INTEGER       AS matches,
+    SUM(wins)::INTEGER          AS wins,
+    SUM(draws)::INTEGER         AS draws,
+    SUM(losses)::INTEGER        AS losses,
+    SUM(goals_for)::INTEGER     AS goals_for,
+    SUM(goals_against)::INTEGER AS goals_against
+FROM {EDITION_TABLE}
+{{where}}
+GROUP BY team_id
+"""
+
+# Reconstruction complète, triée par équipe ; l'index sert les lectures par nom
+STATS_REBUILD = f"""
+CREATE OR REPLACE TABLE {EDITION_TABLE} AS
+SELECT * FROM ({EDITION_SELECT.format(where="")}) s
+ORDER BY team_name, year_;
+CREATE INDEX {EDITION_TABLE}_team_name ON {EDITION_TABLE} (team_name);
+
+CREATE OR REPLACE TABLE {ALL_TIME_TABLE} AS
+SELECT * FROM ({ALL_TIME_SELECT.format(where="")}) s
+ORDER BY team_name;
+CREATE INDEX {ALL_TIME_TABLE}_team_name ON {ALL_TIME_TABLE} (team_name);
+"""
+
+# (équipe, année) touchés par les matchs chargés : seules ces lignes sont recalculées
+STATS_AFFECTED_TABLE = f"""
+CREATE TEMP TABLE IF NOT EXISTS team_stats_affected AS
+SELECT team_id, year_ FROM {EDITION_TABLE} LIMIT 0;
+"""
+
+STATS_AFFECTED = """
+INSERT INTO team_stats_affected
+SELECT DISTINCT p.team_id, mt.year_
+FROM Plays p
+JOIN Matches m    ON m.match_id = p.match_id
+JOIN MatchTime mt ON mt.time_id = m.time_id
+WHERE p.match_id IN (SELECT UNNEST(?::INTEGER[]));
+"""
+
+STATS_REFRESH = f"""
+DELETE FROM {EDITION_TABLE} s
+USING team_stats_affected a
+WHERE s.team_id = a.team_id AND s.year_ IS NOT DISTINCT FROM a.year_;
+
+INSERT INTO {EDITION_TABLE}
+{EDITION_SELECT.format(where='''WHERE EXISTS (
+    SELECT 1 FROM team_stats_affected a
+    WHERE a.team_id = p.team_id AND a.year_ IS NOT DISTINCT FROM mt.year_
+)''')};
+
+DELETE FROM {ALL_TIME_TABLE}
+WHERE team_id IN (SELECT team_id FROM team_stats_affected);
+
+INSERT INTO {ALL_TIME_TABLE}
+{ALL_TIME_SELECT.format(where="WHERE team_id IN (SELECT team_id FROM team_stats_affected)")};
+
+DROP TABLE team_stats_affected;
+"""
+
+
+def stats_tables_exist(con):
+    return con.execute(
+        "SELECT COUNT(*) FROM information_schema.tables WHERE table_name IN (?, ?)",
+        [EDITION_TABLE, ALL_TIME_TABLE],
+    ).fetchone()[0] == 2
+
+
+def mark_team_stats(con, match_ids):
+    """
+    Retient les (équipe, année) des matchs indiqués, recalculés au prochain refresh_team_stats.
+    À appeler avant de modifier ou supprimer des matchs : leurs anciens couples sont lus dans Plays.
+    """
+    if match_ids and stats_tables_exist(con):
+        con.execute(STATS_AFFECTED_TABLE)
+        con.execute(STATS_AFFECTED, [[int(i) for i in match_ids]])
+
+
+def refresh_team_stats(con, match_ids=None):
+    """
+    Rafraîchit TeamEditionStats / TeamAllTimeStats sur une connexion ouverte (sans commit).
+    match_ids=None : reconstruction complète.
+    Sinon seuls les couples (équipe, année) des matchs indiqués, et le cumul de ces équipes, sont recalculés.
+    """
+    with stage("team_stats", rows_in=None if match_ids is None else len(match_ids)):
+        if match_ids is None or not stats_tables_exist(con):
+            con.execute(STATS_REBUILD)
+            return
+        if not match_ids:
+            return
+        mark_team_stats(con, match_ids)
+        con.execute(STATS_REFRESH)
+
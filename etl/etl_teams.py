@@ -0,0 +1,257 @@
+"""
+Référentiel des équipes, partagé par toutes les éditions.
+
+Chaque équipe a un nom canonique (celui de Teams), son code FIFA et les alias
+vus dans les sources. Un nom est cherché tel quel (clé normalisée) dans l'index
+des noms, alias et codes ; sinon, rapprochement par trigrammes au-dessus de
+FUZZY_THRESHOLD. resolve_teams passe par normalize_series : une résolution par
+valeur distincte et par run.
+"""
+import logging
+import re
+from collections import Counter, defaultdict
+
+import pandas as pd
+from unidecode import unidecode
+from etl_normalize import normalize_series
+
+logger = logging.getLogger("ETL")
+
+# --- CONFIGURATION ---
+# Dice minimal sur les trigrammes pour un rapprochement ("argentinia" 0.76, "niger" -> "nigeria" 0.71)
+FUZZY_THRESHOLD = 0.75
+UNKNOWN = "unknown"
+
+# (nom canonique, code FIFA, alias) ; les alias passent par team_key comme les sources
+TEAMS = [
+    ("algeria", "ALG", ()),
+    ("angola", "ANG", ()),
+    ("argentina", "ARG", ()),
+    ("australia", "AUS", ()),
+    ("austria", "AUT", ()),
+    ("belgium", "BEL", ()),
+    ("bolivia", "BOL", ()),
+    ("bosnia and herzegovina", "BIH", ('rn">bosnia and herzegovina', "bosnia-herzegovina")),
+    ("brazil", "BRA", ()),
+    ("bulgaria", "BUL", ()),
+    ("cameroon", "CMR", ()),
+    ("canada", "CAN", ()),
+    ("chile", "CHI", ()),
+    ("china", "CHN", ("china pr",)),
+    ("colombia", "COL", ()),
+    ("costa rica", "CRC", ()),
+    ("croatia", "CRO", ()),
+    ("cuba", "CUB", ()),
+    ("czech republic", "CZE", ("czechia",)),
+    ("czechoslovakia", "TCH", ()),
+    ("denmark", "DEN", ()),
+    ("dutch east indies", "INH", ()),
+    ("east germany", "GDR", ("germany dr",)),
+    ("ecuador", "ECU", ()),
+    ("egypt", "EGY", ()),
+    ("el salvador", "SLV", ()),
+    ("england", "ENG", ()),
+    ("france", "FRA", ()),
+    ("germany", "GER", ()),
+    ("ghana", "GHA", ()),
+    ("greece", "GRE", ()),
+    ("haiti", "HAI", ()),
+    ("honduras", "HON", ()),
+    ("hungary", "HUN", ()),
+    ("iceland", "ISL", ()),
+    ("iran", "IRN", ("ir iran",)),
+    ("iraq", "IRQ", ()),
+    ("israel", "ISR", ()),
+    ("italy", "ITA", ()),
+    ("ivory coast", "CIV", ("cote d'ivoire", "ci? 1/2te d'ivoire")),  # 2014 : Côte mal encodé
+    ("jamaica", "JAM", ()),
+    ("japan", "JPN", ()),
+    ("kuwait", "KUW", ()),
+    ("mexico", "MEX", ()),
+    ("morocco", "MAR", ()),
+    ("netherlands", "NED", ("holland",)),
+    ("new zealand", "NZL", ()),
+    ("nigeria", "NGA", ()),
+    ("north korea", "PRK", ("korea dpr",)),
+    ("northern ireland", "NIR", ()),
+    ("norway", "NOR", ()),
+    ("panama", "PAN", ()),
+    ("paraguay", "PAR", ()),
+    ("peru", "PER", ()),
+    ("poland", "POL", ()),
+    ("portugal", "POR", ()),
+    ("qatar", "QAT", ()),
+    ("republic of ireland", "IRL", ("ireland", "eire")),
+    ("romania", "ROU", ()),
+    ("russia", "RUS", ()),
+    ("saudi arabia", "KSA", ()),
+    ("scotland", "SCO", ()),
+    ("senegal", "SEN", ()),
+    ("serbia", "SRB", ()),
+    ("serbia and montenegro", "SCG", ("serbia-montenegro",)),
+    ("slovakia", "SVK", ()),
+    ("slovenia", "SVN", ()),
+    ("south africa", "RSA", ()),
+    ("south korea", "KOR", ("korea republic",)),
+    ("soviet union", "URS", ("ussr",)),
+    ("spain", "ESP", ()),
+    ("sweden", "SWE", ()),
+    ("switzerland", "SUI", ()),
+    ("togo", "TOG", ()),
+    ("trinidad and tobago", "TRI", ()),
+    ("tunisia", "TUN", ()),
+    ("turkey", "TUR", ("turkiye",)),
+    ("ukraine", "UKR", ()),
+    ("united arab emirates", "UAE", ()),
+    ("united states", "USA", ("united states of america",)),
+    ("uruguay", "URU", ()),
+    ("wales", "WAL", ()),
+    ("west germany", "FRG", ("germany fr",)),
+    ("yugoslavia", "YUG", ()),
+    ("zaire", "ZAI", ()),
+]
+
+FIFA_CODES = {canonical: code for canonical, code, _ in TEAMS}
+
+# Erreurs propres à une édition : (année, nom canonique) -> vraie équipe
+EDITION_FIXES = {
+    (2002, "slovakia"): "slovenia",  # Slovakia n'a pas joué en 2002
+}
+
+_index = None
+_trigrams = None
+# Noms gardés tels quels par resolve_team pendant le run (signalés par resolve_teams)
+_unresolved = set()
+
+
+def clean_name(name):
+    """Nettoyage historique des éditions : unidecode + minuscules, sans "(...)" """
+    return unidecode(str(name)).split("(")[0].lower().strip()
+
+
+def team_key(name):
+    """Clé de recherche : clean_name, ponctuation remplacée par des espaces"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", clean_name(name)).split())
+
+
+def _key_trigrams(key):
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def _build_index():
+    """Clé -> nom canonique, pour les noms canoniques, alias et codes FIFA"""
+    index = {}
+    for canonical, code, aliases in TEAMS:
+        for name in (canonical, code, *aliases):
+            key = team_key(name)
+            if index.get(key, canonical) != canonical:
+                raise ValueError(f"Alias {name!r} déjà attribué à {index[key]!r}")
+            index[key] = canonical
+    return index
+
+
+def get_index():
+    """Index de recherche exacte, construit au premier appel"""
+    global _index
+    if _index is None:
+        _index = _build_index()
+    return _index
+
+
+def _numbers(key):
+    return frozenset(token for token in key.split() if any(c.isdigit() for c in token))
+
+
+def get_trigram_index():
+    """Mots à chiffres -> trigramme -> clés, et nombre de trigrammes par clé (au premier nom inconnu)"""
+    global _trigrams
+    if _trigrams is None:
+        groups, sizes = defaultdict(lambda: defaultdict(set)), {}
+        for key in get_index():
+            trigrams = set(_key_trigrams(key))
+            sizes[key] = len(trigrams)
+            for trigram in trigrams:
+                groups[_numbers(key)][trigram].add(key)
+        _trigrams = (dict(groups), sizes)
+    return _trigrams
+
+
+def fuzzy_match(key, threshold=FUZZY_THRESHOLD):
+    """
+    (nom canonique, score) de la clé la plus proche (Dice sur les trigrammes) ;
+    (None, score) sous le seuil ou en cas d'ex aequo. Les mots à chiffres doivent
+    être identiques ("france s2" n'est jamais "france").
+    """
+    groups, sizes = get_trigram_index()
+    postings = groups.get(_numbers(key))
+    if postings is None:
+        return None, 0.0
+
+    trigrams = set(_key_trigrams(key))
+    shared = Counter()
+    for trigram in trigrams:
+        shared.update(postings.get(trigram, ()))
+    if not shared:
+        return None, 0.0
+
+    index = get_index()
+    scores = {}
+    for candidate, n in shared.items():
+        score = 2 * n / (len(trigrams) + sizes[candidate])
+        canonical = index[candidate]
+        scores[canonical] = max(score, scores.get(canonical, 0.0))
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, score = ranked[0]
+    if score < threshold or (len(ranked) > 1 and ranked[1][1] == score):
+        return None, score
+    return best, score
+
+
+def resolve_team(name):
+    """Nom canonique d'une équipe ; un nom inconnu est gardé nettoyé (clean_name)"""
+    if pd.isna(name) or str(name).strip() == "":
+        return UNKNOWN
+
+    key = team_key(name)
+    canonical = get_index().get(key)
+    if canonical is not None:
+        return canonical
+
+    canonical, score = fuzzy_match(key)
+    if canonical is not None:
+        logger.info("Équipe rapprochée : %r -> %s (%.2f)", name, canonical, score)
+        return canonical
+
+    logger.debug("Équipe hors référentiel : %r", name)
+    _unresolved.add(clean_name(name))
+    return clean_name(name)
+
+
+def resolve_teams(series):
+    """resolve_team sur une colonne ; un seul warning liste ses nouveaux noms hors référentiel"""
+    before = len(_unresolved)
+    result = normalize_series(series, resolve_team)
+    if len(_unresolved) > before:
+        new = sorted(set(result.unique()) & _unresolved)
+        logger.warning("⚠️  %s équipe(s) hors référentiel dans %s : %s%s", len(new), series.name,
+                       ", ".join(new[:5]), ", ..." if len(new) > 5 else "")
+    return result
+
+
+def unresolved_teams():
+    """Noms hors référentiel depuis le début du run"""
+    return sorted(_unresolved)
+
+
+def fix_edition_teams(teams, years):
+    """Applique EDITION_FIXES à une colonne de noms canoniques, selon l'année de chaque ligne"""
+    teams = teams.copy()
+    for (year, wrong), right in EDITION_FIXES.items():
+        teams[(teams == wrong) & (years == year).fillna(False).to_numpy(dtype=bool)] = right
+    return teams
+
+
+def fifa_code(name):
+    """Code FIFA d'une équipe (nom ou alias), None si inconnue"""
+    return FIFA_CODES.get(get_index().get(team_key(name)))
@@ -0,0 +1,226 @@
+"""
+Contrôle qualité du DataFrame fusionné, avant load_matches.
+
+Les règles sont déclarées dans RULES : un nom, une sévérité et un prédicat
+vectorisé qui renvoie le masque des lignes en défaut. Les colonnes utiles sont
+préparées une seule fois (tableaux numpy : buts, issue de chaque résultat,
+dates manquantes...) puis chaque règle est une expression sur ces tableaux,
+sans apply ligne à ligne.
+
+Modes (ETL_VALIDATION_MODE, ou --validation dans worldcup-etl) :
+- fail       : (défaut) une ligne en défaut sur une règle "error" arrête le pipeline ;
+- quarantine : ces lignes sont retirées et écrites dans QUARANTINE_PATH
+               (colonne _rules), le chargement continue avec le reste (sur demande :
+               un problème de données se voit alors comme des matchs manquants) ;
+- warn       : rien n'est retiré, le rapport est seulement journalisé ;
+- off        : pas de contrôle.
+Les règles "warning" ne retirent jamais de ligne.
+
+sample=N contrôle N lignes tirées au hasard (gros volumes) : les volumes du
+rapport sont alors extrapolés, et les doublons ne sont cherchés que dans
+l'échantillon. Incompatible avec quarantine, qui doit voir toutes les lignes.
+"""
+import json
+import logging
+import os
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+from etl_metrics import stage
+from etl_team_stats import LOSS_RESULTS, WIN_RESULTS
+
+logger = logging.getLogger("ETL")
+
+# --- CONFIGURATION ---
+MODES = ("fail", "quarantine", "warn", "off")
+MODE = os.environ.get("ETL_VALIDATION_MODE", "fail")
+# Lignes contrôlées au plus (0 : toutes)
+SAMPLE = int(os.environ.get("ETL_VALIDATION_SAMPLE", "0"))
+QUARANTINE_PATH = os.environ.get("ETL_QUARANTINE_PATH", "./../quarantine/matches.parquet")
+# Lignes en défaut gardées dans le rapport, par règle
+SAMPLES_PER_RULE = 5
+
+# Issue d'un résultat du point de vue de l'équipe (2022 : win / loss, autres éditions : winner / loser)
+OUTCOMES = {**{r: 1 for r in WIN_RESULTS}, "draw": 0, **{r: -1 for r in LOSS_RESULTS}}
+UNKNOWN_TEAM = "unknown"
+
+
+class ValidationError(ValueError):
+    """Lignes en défaut en mode fail ; report contient le rapport complet"""
+
+    def __init__(self, message, report):
+        super().__init__(message)
+        self.report = report
+
+
+class Rule(NamedTuple):
+    name: str
+    severity: str                # "error" : ligne rejetée (fail / quarantine) ; "warning" : signalée
+    description: str
+    check: Callable              # _Columns -> masque numpy des lignes en défaut
+
+
+class _Columns:
+    """Colonnes du DataFrame converties une fois pour toutes les règles"""
+
+    def __init__(self, df):
+        datetime = df["Datetime"]
+        if not pd.api.types.is_datetime64_any_dtype(datetime):
+            datetime = pd.to_datetime(datetime, errors="coerce")
+        self.datetime = datetime
+        self.nat = datetime.isna().to_numpy()
+        self.home_goals = _goals(df["Home Team Goals"])
+        self.away_goals = _goals(df["Away Team Goals"])
+        self.home_outcome = _outcome(df["Home Result"])
+        self.away_outcome = _outcome(df["Away Result"])
+        self.home_team = df["Home Team Name"]
+        self.away_team = df["Away Team Name"]
+
+
+def _goals(series):
+    return pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _outcome(series):
+    """1 / 0 / -1 par ligne, NaN hors vocabulaire ; OUTCOMES lu une fois par valeur distincte"""
+    codes, uniques = pd.factorize(series)
+    lookup = np.array([OUTCOMES.get(v, np.nan) for v in uniques] + [np.nan], dtype=float)
+    return lookup[codes]  # code -1 (valeur manquante) -> dernier élément, NaN
+
+
+def _missing_team(series):
+    return (series.isna() | (series == UNKNOWN_TEAM)).to_numpy(dtype=bool)
+
+
+def _result_mismatch(c):
+    """Résultats opposés entre les deux équipes, et cohérents avec le score"""
+    known = ~np.isnan(c.home_outcome) & ~np.isnan(c.away_outcome)
+    score = np.sign(c.home_goals - c.away_goals)
+    scored = known & ~np.isnan(score)
+    not_opposite = known & (c.home_outcome + c.away_outcome != 0)
+    # Score nul + vainqueur autorisé (tirs au but) ; perdant qui a marqué plus, non
+    against_score = scored & (c.home_outcome * score < 0)
+    draw_not_level = scored & (c.home_outcome == 0) & (score != 0)
+    return not_opposite | against_score | draw_not_level
+
+
+def _duplicate_fixture(c):
+    """Même paire d'équipes (dans un sens ou l'autre) à la même date et heure"""
+    # Équipes en codes entiers communs aux deux colonnes : comparaisons et hachage sur int64
+    n = len(c.home_team)
+    codes, _ = pd.factorize(pd.concat([c.home_team, c.away_team], ignore_index=True))
+    home, away = codes[:n], codes[n:]
+    fixtures = pd.DataFrame({
+        "datetime": c.datetime.to_numpy().astype("datetime64[ns]").view("int64"),
+        "lo": np.minimum(home, away),
+        "hi": np.maximum(home, away),
+    })
+    return fixtures.duplicated(keep="first").to_numpy() & ~c.nat
+
+
+RULES = [
+    Rule("missing_goals", "error", "Buts manquants",
+         lambda c: np.isnan(c.home_goals) | np.isnan(c.away_goals)),
+    Rule("negative_goals", "error", "Buts négatifs",
+         lambda c: (c.home_goals < 0) | (c.away_goals < 0)),
+    Rule("unknown_result", "error", f"Résultat hors vocabulaire ({', '.join(OUTCOMES)})",
+         lambda c: np.isnan(c.home_outcome) | np.isnan(c.away_outcome)),
+    Rule("result_mismatch", "error", "Résultats non opposés ou contredits par le score", _result_mismatch),
+    Rule("missing_datetime", "error", "Date manquante (NaT) : aucun MatchTime à joindre",
+         lambda c: c.nat),
+    Rule("missing_team", "error", "Équipe manquante",
+         lambda c: _missing_team(c.home_team) | _missing_team(c.away_team)),
+    Rule("same_team", "error", "Équipe qui joue contre elle-même",
+         lambda c: (c.home_team == c.away_team).to_numpy(dtype=bool)),
+    Rule("duplicate_fixture", "warning", "Même affiche à la même date et heure (doublon ou date erronée)",
+         _duplicate_fixture),
+]
+
+
+def _samples(df, mask):
+    rows = df.loc[mask].head(SAMPLES_PER_RULE)
+    return [{"index": index, **record} for index, record in zip(rows.index.tolist(), rows.to_dict("records"))]
+
+
+def check_rules(df, rules=None):
+    """Masque de chaque règle sur df (RULES par défaut) : {nom: tableau booléen}"""
+    rules = RULES if rules is None else rules
+    columns = _Columns(df)
+    return {rule.name: np.asarray(rule.check(columns), dtype=bool) for rule in rules}
+
+
+def validate_matches(df, mode=MODE, sample=SAMPLE, quarantine_path=QUARANTINE_PATH, rules=None, seed=0):
+    """
+    Contrôle le DataFrame fusionné avec rules (RULES par défaut).
+    Renvoie (DataFrame à charger, rapport). Lève ValidationError en mode fail.
+    """
+    rules = RULES if rules is None else rules
+    if mode not in MODES:
+        raise ValueError(f"Mode de validation inconnu : {mode} (choix : {', '.join(MODES)})")
+    sampled = bool(sample) and len(df) > sample
+    if sampled and mode == "quarantine":
+        raise ValueError("La quarantaine contrôle toutes les lignes : pas d'échantillonnage (sample=0)")
+    if mode == "off":
+        return df, None
+
+    with stage("quality", rows_in=len(df), mode=mode) as m:
+        checked = df.sample(n=sample, random_state=seed) if sampled else df
+        masks = check_rules(checked, rules)
+        scale = len(df) / len(checked) if len(checked) else 0
+
+        report = {"mode": mode, "rows": len(df), "checked": len(checked), "sampled": sampled, "rules": []}
+        rejected = np.zeros(len(checked), dtype=bool)
+        for rule in rules:
+            mask = masks[rule.name]
+            violations = int(mask.sum())
+            entry = {
+                "rule": rule.name, "severity": rule.severity, "description": rule.description,
+                "violations": violations,
+            }
+            if sampled:
+                entry["estimated"] = round(violations * scale)
+            if violations:
+                entry["samples"] = _samples(checked, mask)
+                logger.warning("⚠️  Validation %s (%s) : %s ligne(s)%s - %s", rule.name, rule.severity,
+                               violations, " dans l'échantillon" if sampled else "", rule.description)
+            if rule.severity == "error":
+                rejected |= mask
+            report["rules"].append(entry)
+
+        report["rejected"] = int(rejected.sum())
+        report["quarantined"] = 0
+        if report["rejected"] and mode == "fail":
+            failed = [r["rule"] for r in report["rules"] if r["severity"] == "error" and r["violations"]]
+            raise ValidationError(
+                f"{report['rejected']} ligne(s) invalide(s) ({', '.join(failed)}) : chargement annulé", report,
+            )
+        if report["rejected"] and mode == "quarantine":
+            df = _quarantine(df, rejected, masks, rules, quarantine_path)
+            report["quarantined"] = report["rejected"]
+            report["quarantine_path"] = quarantine_path
+        m["rows_out"] = len(df)
+
+    logger.info("✅ Validation (%s) : %s ligne(s) contrôlée(s), %s rejetée(s), %s en quarantaine",
+                mode, len(checked), report["rejected"], report["quarantined"])
+    return df, report
+
+
+def _quarantine(df, rejected, masks, rules, path):
+    """Écrit les lignes rejetées (avec les règles en défaut) et renvoie les autres"""
+    errors = [rule.name for rule in rules if rule.severity == "error"]
+    failed = np.array([",".join(n for n in errors if masks[n][i]) for i in np.flatnonzero(rejected)], dtype=object)
+    bad = df.loc[rejected].assign(_rules=failed)
+    if len(bad) == len(df):
+        raise ValidationError("Toutes les lignes sont invalides : rien à charger", {"rejected": len(df)})
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    bad.to_parquet(path, index=True)
+    return df.loc[~rejected]
+
+
+def write_report(report, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, default=str)
@@ -6,4 +6,5 @@ def help():
     print("2 etl2.py")
     print("- etl2()")
 
-help()
\ No newline at end of file
+if __name__ == "__main__":
+    help()
@@ -1,23 +1,180 @@
 import etl_clean_1930_2010 as etl_base
+import etl_1930_2010 as etl_1930_2010
+import etl_1930_2010_duckdb
 import etl_inserter_2014 as inserter
 import etl_create_view as etl_view
 import etl_2014 as etl_2014
 import etl_2018 as etl_2018
 import etl_2022 as etl_2022
 import db_creation as db_creator
+import etl_cache
+import etl_columns
+import etl_geonames
+import etl_json_stream
+import etl_metrics
+import etl_normalize
+import etl_teams
 import pandas as pd
+import io
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
+logger = logging.getLogger("ETL")
 
-def merge_data():
-    big_df = etl_base.get_cleaned_1930_data()
-    df_2014 = etl_2014.get_cleaned_2014_data()
-    df_2018 = etl_2018.get_cleaned_2018_data('data/data_2018.json')
-    df_2022 = etl_2022.get_cleaned_2022_data()
-    big_df = pd.concat([big_df, df_2014, df_2018, df_2022], ignore_index=True)
-    big_df["Datetime"] = pd.to_datetime(big_df["Datetime"], errors="coerce")
-    print(big_df.info())
+# Chemins par défaut (relatifs à etl/, comme dans le conteneur)
+DATA_DIR = os.environ.get("ETL_DATA_DIR", "./../data")
+DB_PATH = os.environ.get("ETL_DB_PATH", "./../db/db.duckdb")
+
+# Moteur du pipeline 1930-2010 : "pandas" (historique) ou "duckdb" (SQL, même sortie)
+ENGINE_1930 = os.environ.get("ETL_1930_ENGINE", "pandas")
+
+ENGINES_1930 = {
+    "pandas": etl_base.get_cleaned_1930_data,
+    "duckdb": etl_1930_2010_duckdb.get_cleaned_1930_data,
+}
+
+
+def edition_tasks(data_dir=DATA_DIR, engine_1930=None):
+    """Éditions extraites par merge_data, dans l'ordre du pd.concat final"""
+    engine_1930 = engine_1930 or ENGINE_1930
+    if engine_1930 not in ENGINES_1930:
+        raise ValueError(f"Moteur 1930-2010 inconnu : {engine_1930}")
+    return {
+        "1930-2010": (ENGINES_1930[engine_1930], (data_dir,)),
+        "2014": (etl_2014.get_cleaned_2014_data, (data_dir,)),
+        "2018": (etl_2018.get_cleaned_2018_data, (os.path.join(data_dir, "data_2018.json"),)),
+        "2022": (etl_2022.get_cleaned_2022_data, (data_dir,)),
+    }
+
+
+# Sources et code de nettoyage de chaque édition : clé du cache Parquet
+EDITION_SOURCES = {
+    "1930-2010": (
+        ["WorldCupMatches1930-2010.csv", "WorldCupMatches1930-2022-datetime.csv"],
+        [etl_base, etl_1930_2010, etl_1930_2010_duckdb, etl_normalize, etl_teams],
+    ),
+    "2014": (["WorldCupMatches2014.csv"], [etl_2014, etl_columns, etl_geonames, etl_normalize, etl_teams]),
+    "2018": (["data_2018.json"], [etl_2018, etl_json_stream, etl_normalize, etl_teams]),
+    "2022": (
+        ["WorldCupMatches2022.csv", "WorldCupMatches2022-venue.csv", "stadium_city_mapping2022.csv"],
+        [etl_2022, etl_columns, etl_normalize, etl_teams],
+    ),
+}
+
+# ETL_CACHE=1 active le cache Parquet des éditions (désactivé par défaut, comme avant le cache)
+DEFAULT_USE_CACHE = os.environ.get("ETL_CACHE", "0") == "1"
+
+# Nombre de process pour l'extraction (1 = séquentiel)
+DEFAULT_WORKERS = int(os.environ.get("ETL_WORKERS", "1"))
+
+# Clés des dimensions à la création du schéma : "uuid", "integer" (entiers denses) ou "hash".
+# Vide : uuid pour une nouvelle base, sinon le type du schéma existant.
+KEY_TYPE = os.environ.get("ETL_KEY_TYPE", "")
+
+# "full" (TRUNCATE + rechargement) ou "incremental" (rechargement des éditions présentes, match_id gardés)
+LOAD_MODE = os.environ.get("ETL_LOAD_MODE", "full")
+
+# Rapports des étapes mesurées (désactivés si vides)
+METRICS_JSON = os.environ.get("ETL_METRICS_JSON", "")
+METRICS_PROM = os.environ.get("ETL_METRICS_PROM", "")
+
+
+def edition_inputs(name, data_dir=DATA_DIR):
+    """Fichiers sources et fichiers de code d'une édition (clé du cache)"""
+    inputs, modules = EDITION_SOURCES[name]
+    return [os.path.join(data_dir, f) for f in inputs], [m.__file__ for m in modules]
+
+
+def extract_edition(name, func, args=(), use_cache=False, refresh=False, data_dir=DATA_DIR):
+    """Exécute l'extraction d'une édition et mesure son temps (wall-clock)"""
+    start = time.perf_counter()
+    try:
+        with etl_metrics.stage("extract", edition=name) as m:
+            if use_cache and name in EDITION_SOURCES:
+                inputs, code_files = edition_inputs(name, data_dir)
+                df = etl_cache.cached_edition(
+                    name, func, args,
+                    inputs=inputs,
+                    code_files=code_files,
+                    refresh=refresh,
+                )
+            else:
+                df = func(*args)
+            m["rows_out"] = len(df)
+    except Exception as e:
+        raise RuntimeError(f"Extraction de l'édition {name} échouée : {e!r}") from e
+    return df, time.perf_counter() - start
+
+
+def _extract_in_worker(name, func, args=(), use_cache=False, refresh=False, data_dir=DATA_DIR):
+    """extract_edition dans un process du pool : renvoie aussi les étapes mesurées"""
+    mark = len(etl_metrics.records())
+    df, elapsed = extract_edition(name, func, args, use_cache, refresh, data_dir)
+    return df, elapsed, etl_metrics.records()[mark:]
+
+
+def concat_editions(frames):
+    """Concatène les éditions nettoyées et unifie la colonne Datetime"""
+    with etl_metrics.stage("merge", rows_in=sum(len(df) for df in frames)) as m:
+        big_df = pd.concat(frames, ignore_index=True)
+        big_df["Datetime"] = pd.to_datetime(big_df["Datetime"], errors="coerce")
+        m["rows_out"] = len(big_df)
+    return big_df
+
+
+def merge_data(workers=DEFAULT_WORKERS, editions=None, use_cache=DEFAULT_USE_CACHE,
+               refresh=(), bypass=(), data_dir=DATA_DIR):
+    """
+    Extrait et concatène toutes les éditions.
+    refresh : éditions à recalculer (et remettre en cache),
+    bypass : éditions à recalculer sans lire ni écrire le cache.
+    """
+    editions = edition_tasks(data_dir) if editions is None else editions
+    start = time.perf_counter()
+
+    def options(name):
+        return use_cache and name not in bypass, name in refresh, data_dir
+
+    if workers > 1:
+        # Les éditions ne partagent aucun état : une par process
+        with ProcessPoolExecutor(max_workers=min(workers, len(editions))) as pool:
+            futures = {
+                name: pool.submit(_extract_in_worker, name, func, args, *options(name))
+                for name, (func, args) in editions.items()
+            }
+            results = {}
+            for name, future in futures.items():
+                df, elapsed, records = future.result()
+                etl_metrics.extend(records)
+                results[name] = (df, elapsed)
+    else:
+        results = {
+            name: extract_edition(name, func, args, *options(name))
+            for name, (func, args) in editions.items()
+        }
+
+    for name, (_, elapsed) in results.items():
+        logger.info("⏱️  %s : %.2fs", name, elapsed)
+    logger.info("⏱️  Extraction totale (%s worker(s)) : %.2fs", workers, time.perf_counter() - start)
+
+    big_df = concat_editions([df for df, _ in results.values()])
+    if logger.isEnabledFor(logging.DEBUG):
+        buffer = io.StringIO()
+        big_df.info(buf=buffer)
+        logger.debug(buffer.getvalue())
     return big_df
 
-db_creator.create_db_schema()
-inserter.load_matches(merge_data())
-etl_view.create_view()
\ No newline at end of file
+
+def write_metrics(json_path=METRICS_JSON, prom_path=METRICS_PROM):
+    if json_path:
+        etl_metrics.write_json(json_path)
+    if prom_path:
+        etl_metrics.write_prometheus(prom_path)
+
+
+if __name__ == "__main__":
+    # Sans argument : pipeline complet (toutes les éditions, schéma + chargement + vue), voir etl_cli
+    import etl_cli
+    raise SystemExit(etl_cli.main())
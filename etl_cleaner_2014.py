@@ -1,5 +1,7 @@
 import duckdb
 import etl.etl_inserter_2014 as inserter
+from etl.etl_geonames import normalize_city_name, resolve_city
+from etl.etl_normalize import normalize_series
 import pandas as pd
 from unidecode import unidecode
 import geonamescache
@@ -11,7 +13,6 @@ gc = geonamescache.GeonamesCache()
 df = pd.read_csv('./data/WorldCupMatches2014.csv', sep=";", encoding='iso-8859-1') 
 logger = logging.getLogger("ETL")
 
-cities =  gc.get_cities()
 countries = gc.get_countries()
 
 STAGE_MAP = {
@@ -57,14 +58,9 @@ def city_to_english(city):
         logger.warning("Ville manquante")
         return "unknown"
 
-    city_clean = unidecode(str(city)).lower().strip()
+    city_clean = normalize_city_name(city)
 
-    for c in cities.values():
-        c_name = unidecode(c["name"]).lower().strip()
-        if c_name == city_clean:
-            return c_name
-
-    return city_clean 
+    return resolve_city(city_clean) or city_clean
 
 def normalize_stage(stage):
     if pd.isna(stage):
@@ -143,12 +139,12 @@ df.loc[draw & (df["Score away"] > df["Score home"]),
 df = df.drop(columns=["Win conditions", "Score home", "Score away"])
 
 
-df["Stage"] = df["Stage"].apply(normalize_stage)
+df["Stage"] = normalize_series(df["Stage"], normalize_stage)
 
-df["City"] = df["City"].apply(city_to_english)
+df["City"] = normalize_series(df["City"], city_to_english)
 
-df["Home Team Name"] = df["Home Team Name"].apply(normalize_country)
-df["Away Team Name"] = df["Away Team Name"].apply(normalize_country)
+df["Home Team Name"] = normalize_series(df["Home Team Name"], normalize_country)
+df["Away Team Name"] = normalize_series(df["Away Team Name"], normalize_country)
 
 print(df)
 inserter.load_matches(df, db_path="./db/db.duckdb")
@@ -0,0 +1,72 @@
+import duckdb
+import pandas as pd
+import pytest
+import etl_query
+from etl_session import LoadSession
+
+# Colonnes du DataFrame fusionné (sortie de merge_data)
+MATCH_COLUMNS = [
+    "Datetime", "Stage", "City", "Home Team Name", "Home Team Goals",
+    "Away Team Goals", "Away Team Name", "Home Result", "Away Result",
+]
+
+
+def matches_frame(rows):
+    """DataFrame fusionné à partir de tuples dans l'ordre de MATCH_COLUMNS"""
+    df = pd.DataFrame(rows, columns=MATCH_COLUMNS)
+    df["Datetime"] = pd.to_datetime(df["Datetime"])
+    return df
+
+
+@pytest.fixture
+def match_rows():
+    """Lignes de make_matches() et de db_path ; un module peut redéfinir la fixture"""
+    return [
+        ("2022-12-18 18:00", "final", "lusail", "argentina", 3, 3, "france", "draw", "draw"),
+        ("1930-07-13 15:00", "group", "montevideo", "france", 4, 1, "mexico", "winner", "loser"),
+        ("2018-06-14 15:00", "group", "moscow", "russia", 5, 0, "saudi arabia", "winner", "loser"),
+    ]
+
+
+@pytest.fixture
+def make_matches(match_rows):
+    """make_matches() : DataFrame neuf de match_rows (modifiable par le test) ; make_matches(rows) : d'autres lignes"""
+    return lambda rows=None: matches_frame(match_rows if rows is None else rows)
+
+
+@pytest.fixture
+def key_type():
+    """Clés du schéma de db_path (à redéfinir ou paramétrer)"""
+    return "integer"
+
+
+@pytest.fixture
+def db_path(tmp_path, make_matches, key_type):
+    """Base chargée avec make_matches() : schéma, chargement et vue en une session"""
+    path = str(tmp_path / "db.duckdb")
+    with LoadSession(path) as session:
+        session.create_schema(key_type)
+        session.load(make_matches())
+        session.create_view()
+    yield path
+    etl_query.invalidate()
+
+
+@pytest.fixture
+def read(db_path):
+    """read(sql, path=db_path) : lignes d'une requête, sur une connexion en lecture seule fermée aussitôt"""
+    def read(sql, path=db_path):
+        con = duckdb.connect(str(path), read_only=True)
+        try:
+            return con.execute(sql).fetchall()
+        finally:
+            con.close()
+    return read
+
+
+@pytest.fixture
+def count(read, db_path):
+    """count(relation, path=db_path) : nombre de lignes d'une table ou d'une vue"""
+    def count(relation, path=db_path):
+        return read(f"SELECT COUNT(*) FROM {relation}", path)[0][0]
+    return count
@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+from etl_1930_2010 import build_datetime, create_datetime
+
+
+def make_frame():
+    return pd.DataFrame({
+        "Match Date": ["7/13/1930", "06/19/1994", "25/06/1994", "1998-06-10", "6/7/1978",
+                       "7/13/1930", None, "None", "", "not a date", "July 13, 1930"],
+        "Match Time": ["15:00", "13:00:00", "16:30:00", "17:30:00", "16:45",
+                       np.nan, "15:00", "15:00", "15:00", "15:00", "15:00"],
+    })
+
+
+def test_build_datetime_same_as_row_wise():
+    """Vérifie que le parsing par colonne donne les mêmes valeurs que create_datetime."""
+    df = make_frame()
+
+    result, _ = build_datetime(df["Match Date"], df["Match Time"])
+
+    expected = df.apply(create_datetime, axis=1)
+    for got, exp in zip(result, expected):
+        if pd.isna(exp):
+            assert pd.isna(got)
+        else:
+            assert got == exp
+
+
+def test_build_datetime_reports_failures():
+    df = make_frame()
+
+    _, report = build_datetime(df["Match Date"], df["Match Time"])
+
+    # Seule la valeur non vide et non parsable est comptée comme échec
+    assert report["failed"] == 1
+    assert report["sample"] == ["not a date 15:00"]
+
+
+def test_build_datetime_keeps_index():
+    df = make_frame()
+    df.index = range(100, 100 + len(df))
+
+    result, _ = build_datetime(df["Match Date"], df["Match Time"])
+
+    assert list(result.index) == list(df.index)
+    assert result.loc[100] == pd.Timestamp("1930-07-13 15:00:00")
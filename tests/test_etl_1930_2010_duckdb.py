@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import pandas as pd
+from etl_1930_2010_duckdb import get_cleaned_1930_data
+from etl_clean_1930_2010 import get_cleaned_1930_data as get_cleaned_1930_data_pandas
+
+DATA_DIR = str(Path(__file__).resolve().parents[1] / "data")
+
+
+def test_duckdb_engine_matches_pandas_pipeline():
+    expected = get_cleaned_1930_data_pandas(DATA_DIR).reset_index(drop=True)
+    result = get_cleaned_1930_data(DATA_DIR, threads=2)
+
+    pd.testing.assert_frame_equal(result, expected)
+
@@ -0,0 +1,57 @@
+import pandas as pd
+from etl_1930_2010 import get_match_date, resolve_match_dates
+
+
+def make_frames():
+    df = pd.DataFrame({
+        "_year": ["1930", "1930", "1934", "1934", "1938", "1950", None],
+        "round": ["group stage", "group stage", "round of 16", "round of 16", "final", "final round", "final"],
+        "team1": ["France", "Mexico", "Italy", "Italy", "Italy", "Brazil", "Italy"],
+        "team2": ["Mexico", "France", "Spain", "Spain", "Hungary", "Sweden", "Hungary"],
+        "Replay": [0, 1, 0, 1, 0, 0, 0],
+    })
+    df_dt = pd.DataFrame({
+        "_year": ["1930", "1930", "1934", "1934", "1938", "1938", "1950"],
+        "round": ["group stage", "group stage", "round of 16", "round of 16", "semi-finals", "final", "group stage"],
+        "team1": ["Mexico", "France", "Spain", "Italy", "Italy", "Hungary", "Brazil"],
+        "team2": ["France", "Mexico", "Italy", "Spain", "Hungary", "Italy", "Sweden"],
+        "Replay": [0, 0, 1, 1, 0, 0, 0],
+        "Match Date": ["7/13/1930", "7/19/1930", "5/31/1934", "6/1/1934", "6/16/1938", "6/19/1938", "7/13/1950"],
+        "Match Time": ["15:00", "12:50", "16:30", "16:30", "18:00", "17:00", "15:00"],
+    })
+    return df, df_dt
+
+
+def test_resolve_match_dates_same_as_row_wise():
+    """Vérifie que la jointure vectorisée choisit les mêmes matchs que get_match_date."""
+    df, df_dt = make_frames()
+
+    result = resolve_match_dates(df, df_dt)
+
+    for idx, row in df.iterrows():
+        expected_date, expected_time = get_match_date(row, df_dt)
+        if expected_date is None:
+            assert pd.isna(result.loc[idx, "Match Date"])
+            assert pd.isna(result.loc[idx, "Match Time"])
+        else:
+            assert result.loc[idx, "Match Date"] == expected_date
+            assert result.loc[idx, "Match Time"] == expected_time
+
+
+def test_resolve_match_dates_no_match():
+    df, df_dt = make_frames()
+
+    result = resolve_match_dates(df, df_dt)
+
+    assert pd.isna(result.iloc[-1]["Match Date"])
+    assert pd.isna(result.iloc[-1]["Match Time"])
+
+
+def test_resolve_match_dates_keeps_index():
+    df, df_dt = make_frames()
+    df.index = [10, 11, 12, 13, 14, 15, 16]
+
+    result = resolve_match_dates(df, df_dt)
+
+    assert list(result.index) == list(df.index)
+    assert result.loc[10, "Match Date"] == "7/13/1930"
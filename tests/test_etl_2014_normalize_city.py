@@ -1,5 +1,5 @@
 import pandas as pd
-from etl.etl_2014 import city_to_english
+from etl_2014 import city_to_english
 
 def test_city_to_english_known_city():
     assert city_to_english("Rio de Janeiro") == "rio de janeiro"
@@ -1,5 +1,5 @@
 import pandas as pd
-from etl.etl_2014 import normalize_country
+from etl_2014 import normalize_country
 
 def test_normalize_country_standard():
     assert normalize_country("France") == "france"
@@ -1,8 +1,8 @@
 import pandas as pd
 from unittest.mock import patch
-from etl.etl_2014 import get_cleaned_2014_data
+from etl_2014 import get_cleaned_2014_data
 
-@patch("etl.etl_2014.pd.read_csv")
+@patch("etl_2014.pd.read_csv")
 def test_get_cleaned_2014_data_minimal(mock_read_csv):
     mock_read_csv.return_value = pd.DataFrame({
     "Year": [2014],
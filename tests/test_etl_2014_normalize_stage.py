@@ -1,5 +1,5 @@
 import pytest
-from etl.etl_2014 import normalize_stage
+from etl_2014 import normalize_stage
 
 @pytest.mark.parametrize(
     "input_stage,expected",
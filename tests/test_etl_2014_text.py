@@ -1,5 +1,5 @@
 import pandas as pd
-from etl.etl_2014 import clean_text
+from etl_2014 import clean_text
 
 def test_clean_text_normal_case():
     assert clean_text("São Paulo") == "sao paulo"
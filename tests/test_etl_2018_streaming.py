@@ -0,0 +1,80 @@
+import io
+import json
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from etl_2018 import extract_matches, extract_matches_streaming, get_cleaned_2018_data
+from etl_json_stream import JsonStream
+
+DATA_FILE = Path(__file__).resolve().parents[1] / "data" / "data_2018.json"
+
+
+def _tournament():
+    return {
+        "knockout": {"round_16": {"name": "Round of 16", "matches": [
+            {"date": "2018-06-30T17:00:00+03:00", "stadium": 2, "home_team": 1, "away_team": 2,
+             "home_result": 4, "away_result": 3},
+        ]}},
+        "tvchannels": [{"id": 1, "name": "TF1", "lang": ["fra"]}],
+        "groups": {"a": {"name": "Group A", "matches": [
+            {"date": "2018-06-14T18:00:00+03:00", "stadium": 1, "home_team": 1, "away_team": 3,
+             "home_result": None, "away_result": 1},
+        ]}},
+        "teams": [{"id": 1, "name": "France"}, {"id": 2, "name": "Argentina"}, {"id": 3, "name": "Peru"}],
+        "stadiums": [{"id": 1, "city": "Moscow"}, {"id": 2, "city": "Kazan"}],
+    }
+
+
+def test_json_stream_iterates_and_skips_with_tiny_chunks():
+    stream = JsonStream(io.StringIO('{"skip": {"a": [1, 2.5, "x"]}, "keep": [10, {"b": null}]}'), chunk_size=3)
+
+    values = []
+    for key in stream.iter_object():
+        if key == "keep":
+            values = [stream.read_value() for _ in stream.iter_array()]
+        else:
+            stream.skip_value()
+
+    assert values == [10, {"b": None}]
+
+
+def test_streaming_matches_json_load_on_real_file():
+    pd.testing.assert_frame_equal(extract_matches_streaming(DATA_FILE), extract_matches(DATA_FILE))
+    pd.testing.assert_frame_equal(
+        get_cleaned_2018_data(DATA_FILE, streaming=True),
+        get_cleaned_2018_data(DATA_FILE, streaming=False),
+    )
+
+
+def test_streaming_resolves_ids_declared_after_matches(tmp_path):
+    path = tmp_path / "tournament.json"
+    path.write_text(json.dumps(_tournament()))
+
+    df = extract_matches_streaming(path)
+
+    pd.testing.assert_frame_equal(df, extract_matches(path))
+    # groups avant knockout, même si le fichier les déclare dans l'autre ordre
+    assert df["raw_round"].tolist() == ["Group A", "Round of 16"]
+    assert df["raw_away_team"].tolist() == ["Peru", "Argentina"]
+    assert df["raw_city"].tolist() == ["Moscow", "Kazan"]
+
+
+def test_streaming_unknown_ids_become_missing(tmp_path):
+    data = _tournament()
+    data["groups"]["a"]["matches"][0]["away_team"] = 99
+    path = tmp_path / "tournament.json"
+    path.write_text(json.dumps(data))
+
+    df = extract_matches_streaming(path)
+
+    assert pd.isna(df["raw_away_team"].iloc[0])
+    pd.testing.assert_frame_equal(df, extract_matches(path))
+
+
+def test_streaming_rejects_truncated_file(tmp_path):
+    path = tmp_path / "tournament.json"
+    path.write_text(json.dumps(_tournament())[:-40])
+
+    with pytest.raises(ValueError):
+        extract_matches_streaming(path)
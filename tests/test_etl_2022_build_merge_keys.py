@@ -0,0 +1,49 @@
+import pandas as pd # type: ignore
+from etl_2022 import build_merge_keys, create_merge_key, report_unmatched
+
+
+def _frames():
+    left = pd.DataFrame({
+        'team1': ['france', 'argentina', 'peru', 'iran', 'wales'],
+        'team2': ['peru', 'france', 'france', 'wales', 'iran'],
+        'date_clean': pd.to_datetime(['2022-12-18', '2022-12-18', '2022-12-19', None, '2022-11-25']),
+    })
+    right = pd.DataFrame({
+        'home_team': ['peru', 'france', 'wales', 'england'],
+        'away_team': ['france', 'argentina', 'iran', 'usa'],
+        'date_clean': pd.to_datetime(['2022-12-18 16:00', '2022-12-18 18:00', None, '2022-11-25 22:00']),
+    })
+    return left, right
+
+
+def _string_keys(df, a, b):
+    return [create_merge_key(x, y, d) for x, y, d in zip(df[a], df[b], df['date_clean'])]
+
+
+def test_integer_keys_match_reference_keys():
+    """Deux lignes ont la même clé entière ssi create_merge_key donne la même chaîne."""
+    left, right = _frames()
+    int_left, int_right = build_merge_keys(
+        (left['team1'], left['team2'], left['date_clean']),
+        (right['home_team'], right['away_team'], right['date_clean']),
+    )
+    ints = list(int_left) + list(int_right)
+    strings = _string_keys(left, 'team1', 'team2') + _string_keys(right, 'home_team', 'away_team')
+
+    for i in range(len(ints)):
+        for j in range(len(ints)):
+            assert (ints[i] == ints[j]) == (strings[i] == strings[j])
+
+
+def test_report_unmatched_lists_both_sides(caplog):
+    left, right = _frames()
+    left['join_key'], right['join_key'] = build_merge_keys(
+        (left['team1'], left['team2'], left['date_clean']),
+        (right['home_team'], right['away_team'], right['date_clean']),
+    )
+
+    unmatched_left, unmatched_right = report_unmatched(left, right)
+
+    assert unmatched_left['team1'].tolist() == ['peru', 'wales']
+    assert unmatched_right['home_team'].tolist() == ['england']
+    assert "no counterpart" in caplog.text
@@ -1,6 +1,6 @@
 import pytest # type: ignore
 import numpy as np # type: ignore
-from etl.etl_2022 import clean_team_name
+from etl_2022 import clean_team_name
 
 # Configuration du chemin pour trouver etl_2022.py
 #sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
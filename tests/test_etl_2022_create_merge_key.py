@@ -1,7 +1,7 @@
 import pytest # type: ignore
 import pandas as pd # type: ignore
 from datetime import datetime
-from etl.etl_2022 import create_merge_key
+from etl_2022 import create_merge_key
 
 def test_merge_key_sorting():
     """
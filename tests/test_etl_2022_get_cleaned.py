@@ -2,7 +2,7 @@ import pytest # type: ignore
 import pandas as pd # type: ignore
 from unittest.mock import patch
 # Assure-toi que ton dossier racine est bien dans le PYTHONPATH ou que tu lances pytest depuis la racine
-from etl.etl_2022 import get_cleaned_2022_data
+from etl_2022 import get_cleaned_2022_data
 
 @pytest.fixture
 def mock_csv_data():
@@ -26,8 +26,8 @@ def mock_csv_data():
     
     return df_matches, df_venues, df_mapping
 
-@patch('etl.etl_2022.os.path.exists')
-@patch('etl.etl_2022.pd.read_csv')
+@patch('etl_2022.os.path.exists')
+@patch('etl_2022.pd.read_csv')
 def test_get_cleaned_2022_data(mock_read_csv, mock_exists, mock_csv_data):
     """Teste le pipeline complet sans toucher au disque dur."""
     # 1. Setup Mocks
@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+from etl_cache import cache_key, cached_edition, default_cache_root, invalidate
+
+
+@pytest.fixture
+def sources(tmp_path):
+    raw = tmp_path / "raw.csv"
+    raw.write_text("team,goals\nfrance,2\n")
+    code = tmp_path / "cleaner.py"
+    code.write_text("VERSION = 1\n")
+    return raw, code
+
+
+def run(sources, cache_dir, calls, **kwargs):
+    raw, code = sources
+
+    def clean():
+        calls.append(1)
+        return pd.read_csv(raw)
+
+    return cached_edition("2014", clean, inputs=[raw], code_files=[code], cache_dir=cache_dir, **kwargs)
+
+
+def test_cached_edition_warm_run_skips_cleaning(sources, tmp_path):
+    calls = []
+    first = run(sources, tmp_path / "cache", calls)
+    second = run(sources, tmp_path / "cache", calls)
+
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+@pytest.mark.parametrize("changed", [0, 1])
+def test_cached_edition_key_covers_inputs_and_code(sources, tmp_path, changed):
+    calls = []
+    run(sources, tmp_path / "cache", calls)
+    sources[changed].write_text(sources[changed].read_text() + "\n")
+    run(sources, tmp_path / "cache", calls)
+
+    assert len(calls) == 2
+    # L'ancienne génération est remplacée, pas accumulée
+    assert len(list((tmp_path / "cache").glob("2014-*.parquet"))) == 1
+
+
+def test_cached_edition_refresh_and_invalidate(sources, tmp_path):
+    calls = []
+    run(sources, tmp_path / "cache", calls)
+    run(sources, tmp_path / "cache", calls, refresh=True)
+    assert len(calls) == 2
+
+    assert invalidate("2014", cache_dir=tmp_path / "cache") == 1
+    run(sources, tmp_path / "cache", calls)
+    assert len(calls) == 3
+
+
+def test_same_basename_in_two_data_dirs_gets_two_keys(sources, tmp_path):
+    raw, code = sources
+    other = tmp_path / "other" / raw.name
+    other.parent.mkdir()
+    other.write_text(raw.read_text())
+
+    assert cache_key([raw], [code]) != cache_key([other], [code])
+    assert cache_key([raw], [code]) == cache_key([tmp_path / "other" / ".." / raw.name], [code])
+
+
+def test_default_cache_root_is_outside_the_package(tmp_path):
+    assert default_cache_root({"ETL_CACHE_DIR": str(tmp_path)}) == tmp_path
+    assert default_cache_root({"XDG_CACHE_HOME": str(tmp_path)}) == tmp_path / "worldcup-etl"
+    assert default_cache_root({}).parent.name == ".cache"
@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import duckdb
+import pandas as pd
+import pytest
+import db_creation as db_creator
+import etl_cli
+
+DATA_DIR = str(Path(__file__).resolve().parents[1] / "data")
+
+
+def _plan(*argv):
+    return etl_cli.make_plan(etl_cli.build_parser().parse_args(["--data-dir", DATA_DIR, "--no-cache", *argv]))
+
+
+def test_editions_and_stages_keep_canonical_order():
+    plan = _plan("--editions", "2022,2018", "--stages", "view,load")
+
+    assert [e["edition"] for e in plan["editions"]] == ["2018", "2022"]
+    assert plan["stages"] == ["extract", "load", "view"]  # load implique extract
+    assert plan["mode"] == "incremental"  # sous-ensemble : ne vide pas les autres éditions
+
+
+def test_cache_is_opt_in(monkeypatch):
+    monkeypatch.setattr(etl_cli.pipeline, "DEFAULT_USE_CACHE", False)
+    parse = lambda *argv: etl_cli.make_plan(etl_cli.build_parser().parse_args(["--data-dir", DATA_DIR, *argv]))
+
+    assert not parse()["use_cache"]
+    assert parse()["editions"][0]["cache"] == "désactivé"
+    assert parse("--cache")["use_cache"]
+
+
+def test_unknown_edition_is_rejected():
+    with pytest.raises(SystemExit):
+        etl_cli.build_parser().parse_args(["--editions", "2019"])
+
+
+def test_full_mode_on_a_subset_is_rejected():
+    with pytest.raises(ValueError, match="incremental"):
+        _plan("--editions", "2018", "--mode", "full")
+
+
+def test_dry_run_reports_plan_without_side_effects(tmp_path, capsys):
+    db_path = tmp_path / "db" / "db.duckdb"
+
+    assert etl_cli.main(["--data-dir", DATA_DIR, "--db-path", str(db_path), "--editions", "2014", "--dry-run"]) == 0
+
+    out = capsys.readouterr().out
+    assert "extract 2014" in out and "1930-2010" not in out
+    assert "schéma à créer" in out
+    assert not db_path.parent.exists()
+
+
+def test_single_edition_reload_leaves_other_editions(tmp_path):
+    db_path = str(tmp_path / "db" / "db.duckdb")
+    common = ["--data-dir", DATA_DIR, "--db-path", db_path, "--no-cache", "--log-level", "WARNING"]
+
+    assert etl_cli.main([*common, "--key-type", "integer", "--editions", "2018,2022", "--stages", "load"]) == 0
+    # Sans --key-type : les clés du schéma en place
+    assert etl_cli.main([*common, "--editions", "2022"]) == 0
+
+    con = duckdb.connect(db_path, read_only=True)
+    assert con.execute("SELECT COUNT(*) FROM Matches").fetchone()[0] == 128
+    con.close()
+
+
+def test_key_type_follows_existing_schema(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    db_creator.create_db_schema(db_path, key_type="hash")
+
+    assert _plan("--db-path", db_path)["key_type"] == "hash"
+    assert _plan("--db-path", db_path, "--key-type", "hash")["key_type"] == "hash"
+    with pytest.raises(ValueError, match="en clés hash"):
+        _plan("--db-path", db_path, "--key-type", "integer")
+    # Nouvelle base construite à vide : les clés peuvent changer
+    assert _plan("--db-path", db_path, "--key-type", "integer", "--swap", "--mode", "full")["key_type"] == "integer"
+    assert _plan("--db-path", str(tmp_path / "new.duckdb"))["key_type"] == "uuid"
+
+
+def test_extract_only_writes_output(tmp_path):
+    output = tmp_path / "2018.parquet"
+
+    assert etl_cli.main(["--data-dir", DATA_DIR, "--no-cache", "--editions", "2018", "--stages", "extract",
+                         "--output", str(output), "--log-level", "WARNING"]) == 0
+
+    assert len(pd.read_parquet(output)) == 64
+
+
+def test_export_is_opt_in():
+    assert "export" not in _plan()["stages"]
+    assert _plan("--stages", "all")["stages"] == ["extract", "load", "view", "export"]
+
+
+def test_swap_and_rollback(tmp_path):
+    db_path = str(tmp_path / "db" / "db.duckdb")
+    common = ["--data-dir", DATA_DIR, "--db-path", db_path, "--no-cache", "--key-type", "integer",
+              "--log-level", "WARNING"]
+
+    assert etl_cli.main([*common, "--editions", "2018", "--swap"]) == 0
+    assert etl_cli.main([*common, "--editions", "2022", "--swap"]) == 0  # incrémental : part de la base en service
+
+    def matches(path):
+        con = duckdb.connect(path, read_only=True)
+        n = con.execute("SELECT COUNT(*) FROM Matches").fetchone()[0]
+        con.close()
+        return n
+
+    assert matches(db_path) == 128
+    assert etl_cli.main(["--db-path", db_path, "--rollback", "--log-level", "WARNING"]) == 0
+    assert matches(db_path) == 64
+
+
+def test_validation_runs_before_load(tmp_path):
+    report = tmp_path / "validation.json"
+    db_path = str(tmp_path / "db" / "db.duckdb")
+
+    assert etl_cli.main(["--data-dir", DATA_DIR, "--db-path", db_path, "--no-cache", "--editions", "2018",
+                         "--validation", "fail", "--validation-report", str(report),
+                         "--log-level", "WARNING"]) == 0
+    assert '"rejected": 0' in report.read_text(encoding="utf-8")
+
+    with pytest.raises(SystemExit):
+        etl_cli.main(["--editions", "2018", "--validation", "quarantine", "--validation-sample", "100", "--dry-run"])
+
+
+def test_quarantined_rows_are_reported(tmp_path, monkeypatch, capsys):
+    # Règle de test : les matchs à 5 buts ou plus à domicile sont "invalides"
+    rule = etl_cli.etl_validation.Rule("big_win", "error", "Victoire large", lambda c: c.home_goals >= 5)
+    monkeypatch.setattr(etl_cli.etl_validation, "RULES", [rule])
+    db_path = str(tmp_path / "db.duckdb")
+    quarantine = tmp_path / "quarantine.parquet"
+
+    assert etl_cli.main(["--data-dir", DATA_DIR, "--db-path", db_path, "--no-cache", "--editions", "2018",
+                         "--validation", "quarantine", "--quarantine", str(quarantine),
+                         "--log-level", "WARNING"]) == 0
+
+    quarantined = len(pd.read_parquet(quarantine))
+    assert quarantined > 0
+    # Visible au niveau WARNING
+    assert f"{quarantined} ligne(s) en quarantaine" in capsys.readouterr().out
+    con = duckdb.connect(db_path, read_only=True)
+    assert con.execute("SELECT COUNT(*) FROM Matches").fetchone()[0] == 64 - quarantined
+    con.close()
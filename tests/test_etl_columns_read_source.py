@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from etl_columns import SOURCES, read_source
+
+DATA_DIR = str(Path(__file__).resolve().parents[1] / "data")
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setitem(SOURCES, "wide", {
+        "file": "wide.csv",
+        "read_options": {},
+        "columns": {"team": "str", "goals": "str", "stage": "str"},
+        "optional": {"stage"},
+    })
+
+
+def test_read_source_keeps_only_registered_columns(tmp_path, registry):
+    (tmp_path / "wide.csv").write_text("team,attendance,goals,referee\nFrance,80000,2,X\n")
+
+    df = read_source("wide", str(tmp_path))
+
+    assert list(df.columns) == ["team", "goals"]
+    assert df["goals"].tolist() == ["2"]  # pas d'inférence : converti plus tard par pd.to_numeric
+
+
+def test_read_source_reports_missing_required_columns(tmp_path, registry):
+    (tmp_path / "wide.csv").write_text("team,stage\nFrance,final\n")
+
+    with pytest.raises(ValueError, match="goals"):
+        read_source("wide", str(tmp_path))
+
+
+def test_registry_matches_bundled_files():
+    for name in ("2014", "2022_matches", "2022_venue", "2022_stadiums"):
+        df = read_source(name, DATA_DIR)
+        assert set(df.columns) == set(SOURCES[name]["columns"])
+        assert all(pd.api.types.is_string_dtype(df[c]) for c in df.columns)
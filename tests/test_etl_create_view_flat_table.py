@@ -0,0 +1,26 @@
+import pandas as pd
+from etl_inserter_2014 import load_matches
+
+
+def ordered(relation):
+    return f"SELECT * FROM {relation} ORDER BY match_id"
+
+
+def test_flat_table_matches_view_after_full_load(read):
+    assert read(ordered("matches_flat")) == read(ordered("v_matches_flat"))
+
+    years = [r[0] for r in read("SELECT year_ FROM matches_flat")]
+    # Table physiquement triée par année
+    assert years == sorted(years)
+
+
+def test_flat_table_refreshed_incrementally(db_path, make_matches, read):
+    df = make_matches()
+    df.loc[0, ["Home Team Goals", "Home Result", "Away Result"]] = [4, "winner", "loser"]
+    df.loc[3] = [pd.Timestamp("2014-07-13 16:00"), "final", "rio de janeiro", "germany", 1, 0,
+                 "argentina", "winner", "loser"]
+
+    stats = load_matches(df, db_path=db_path, mode="incremental")
+
+    assert read(ordered("matches_flat")) == read(ordered("v_matches_flat"))
+    assert len(stats["match_ids"]) == 2
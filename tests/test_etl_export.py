@@ -0,0 +1,79 @@
+import duckdb
+from etl_export import connect_external, export_warehouse
+from etl_session import LoadSession
+
+
+def test_export_partitions_by_year(db_path, tmp_path):
+    export_dir = tmp_path / "export"
+
+    manifest = export_warehouse(db_path, str(export_dir))
+
+    assert manifest["tables"]["Plays"] == {
+        "columns": ["match_id", "team_id", "position_", "goal_nb", "result_", "year_"],
+        "partition": "year_",
+        "rows": 6,
+        "skipped": 0,
+    }
+    assert manifest["tables"]["Teams"]["partition"] is None
+    assert sorted(p.name for p in (export_dir / "matches_flat").iterdir()) == ["year_=1930", "year_=2018", "year_=2022"]
+
+
+def test_external_catalog_matches_warehouse(db_path, tmp_path, read):
+    export_dir = str(tmp_path / "export")
+    export_warehouse(db_path, export_dir, external=True)
+
+    expected = read("SELECT * FROM v_matches_flat ORDER BY match_id")
+
+    catalog = tmp_path / "export" / "warehouse.duckdb"
+    assert read("SELECT * FROM v_matches_flat ORDER BY match_id", catalog) == expected
+
+    con = connect_external(export_dir)
+    assert con.execute("SELECT COUNT(*) FROM Plays WHERE year_ = 2018").fetchone()[0] == 2
+    assert con.execute("SELECT typeof(year_) FROM matches_flat LIMIT 1").fetchone()[0] == "INTEGER"
+
+
+def test_reexport_replaces_previous_files(db_path, tmp_path, make_matches):
+    export_dir = tmp_path / "export"
+    export_warehouse(db_path, str(export_dir))
+
+    with LoadSession(db_path) as session:
+        session.load(make_matches().iloc[:1])
+    export_warehouse(db_path, str(export_dir))
+    export_warehouse(db_path, str(export_dir))
+
+    assert export_dir.is_symlink()
+    assert [p.name for p in (export_dir / "matches_flat").iterdir()] == ["year_=2022"]
+    # Version courante et précédente seulement, aucun lien temporaire
+    assert len(list(tmp_path.glob("export.*"))) == 2
+    assert not list(tmp_path.glob("export.link-*"))
+
+
+def test_open_catalog_keeps_its_version_during_reexport(db_path, tmp_path, make_matches, read):
+    export_dir = tmp_path / "export"
+    export_warehouse(db_path, str(export_dir), external=True)
+    reader = duckdb.connect(str(export_dir / "warehouse.duckdb"), read_only=True)
+
+    with LoadSession(db_path) as session:
+        session.load(make_matches().iloc[:1])
+    export_warehouse(db_path, str(export_dir), external=True)
+
+    try:
+        assert reader.execute("SELECT COUNT(*) FROM v_matches_flat").fetchone()[0] == 3
+    finally:
+        reader.close()
+    assert read("SELECT COUNT(*) FROM v_matches_flat", export_dir / "warehouse.duckdb") == [(1,)]
+
+
+def test_rows_without_year_are_not_exported(db_path, tmp_path):
+    con = duckdb.connect(db_path)
+    con.execute("UPDATE MatchTime SET year_ = NULL WHERE year_ = 1930")
+    con.execute("UPDATE matches_flat SET year_ = NULL WHERE year_ = 1930")
+    con.close()
+    export_dir = tmp_path / "export"
+
+    manifest = export_warehouse(db_path, str(export_dir), external=True)
+
+    assert [manifest["tables"][t]["skipped"] for t in ("Matches", "Plays", "matches_flat")] == [1, 2, 1]
+    assert sorted(p.name for p in (export_dir / "matches_flat").iterdir()) == ["year_=2018", "year_=2022"]
+    con = connect_external(str(export_dir))
+    assert con.execute("SELECT COUNT(*), MIN(typeof(year_)) FROM matches_flat").fetchone() == (2, "INTEGER")
@@ -0,0 +1,28 @@
+import gzip
+import json
+import etl_geonames
+from etl_geonames import load_city_index, index_path, normalize_city_name
+
+
+def test_normalize_city_name():
+    assert normalize_city_name("  São Paulo ") == "sao paulo"
+
+
+def test_load_city_index_builds_and_persists(tmp_path):
+    index = load_city_index(cache_dir=tmp_path)
+
+    assert index["rio de janeiro"] == "rio de janeiro"
+    path = index_path(tmp_path)
+    assert path.exists()
+    assert etl_geonames._geonames_version() in path.name
+
+
+def test_load_city_index_reads_cache(tmp_path, monkeypatch):
+    path = index_path(tmp_path)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"sao paulo": "sao paulo"}, f)
+
+    # Le cache disque doit suffire : aucune reconstruction
+    monkeypatch.setattr(etl_geonames, "build_city_index", lambda: {})
+
+    assert load_city_index(cache_dir=tmp_path) == {"sao paulo": "sao paulo"}
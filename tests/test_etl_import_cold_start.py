@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import etl_2014
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from import_time import FORBIDDEN, parse_importtime  # noqa: E402
+
+
+def test_import_does_no_work():
+    """Importer les modules ne lance rien (pas de print) et ne charge aucun référentiel."""
+    code = "import sys, main, help, etl1, etl2; print([m for m in %r if m in sys.modules])" % (FORBIDDEN,)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT / "etl", capture_output=True, text=True, check=True)
+
+    assert proc.stdout == "[]\n"
+
+
+def test_countries_still_available_on_first_use():
+    assert etl_2014.countries["FR"]["name"] == "France"
+    # Une seule instance GeonamesCache pour tout le process
+    assert etl_2014.gc is etl_2014.gc
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   etl_columns\n"
+        "import time:      4000 |     500000 | main\n"
+    )
+
+    assert parse_importtime(stderr) == [("etl_columns", 1, 120, 120), ("main", 0, 4000, 500000)]
@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+from etl_inserter_2014 import load_matches
+
+FLAT = """
+    SELECT m.match_id, th.team_name, ph.goal_nb, pa.goal_nb, ph.result_
+    FROM Matches m
+    JOIN Plays ph ON ph.match_id = m.match_id AND ph.position_ = 'home'
+    JOIN Plays pa ON pa.match_id = m.match_id AND pa.position_ = 'away'
+    JOIN Teams th ON th.team_id = ph.team_id
+    ORDER BY m.match_id
+"""
+
+
+@pytest.fixture
+def match_rows():
+    return [
+        ("2018-06-14 15:00", "group", "moscow", "russia", 5, 0, "saudi arabia", "winner", "loser"),
+        ("2018-06-15 12:00", "group", "yekaterinburg", "egypt", 0, 1, "uruguay", "loser", "winner"),
+        ("2018-07-15 15:00", "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"),
+    ]
+
+
+@pytest.fixture
+def key_type():
+    # uuid : les identifiants existants ne se recalculent pas, ils doivent être gardés
+    return "uuid"
+
+
+@pytest.fixture
+def read_flat(read):
+    return lambda: (read(FLAT), dict(read("SELECT team_name, team_id FROM Teams")))
+
+
+def test_incremental_load_only_touches_changes(db_path, make_matches, read_flat):
+    before, teams_before = read_flat()
+
+    df = make_matches()
+    df.loc[2, ["Home Team Goals", "Home Result", "Away Result"]] = [1, "loser", "winner"]
+    df.loc[3] = [pd.Timestamp("2018-06-16 13:00"), "group", "kazan", "france", 2, 1,
+                 "australia", "winner", "loser"]
+
+    stats = load_matches(df, db_path=db_path, mode="incremental")
+
+    after, teams_after = read_flat()
+    assert (stats["inserted"], stats["updated"], stats["unchanged"], stats["deleted"]) == (1, 1, 2, 0)
+    # Les matchs et équipes existants gardent leurs identifiants
+    assert after[:2] == before[:2]
+    assert after[2][0] == before[2][0] and after[2][2] == 1 and after[2][4] == "loser"
+    assert after[3][0] == 4 and after[3][1] == "france"
+    assert stats["match_ids"] == [3, 4]
+    assert {k: teams_after[k] for k in teams_before} == teams_before
+    assert "australia" in teams_after
+
+
+def test_incremental_load_without_changes_is_noop(db_path, make_matches, read_flat):
+    before, _ = read_flat()
+
+    stats = load_matches(make_matches(), db_path=db_path, mode="incremental")
+
+    assert (stats["inserted"], stats["updated"], stats["unchanged"]) == (0, 0, 3)
+    assert read_flat()[0] == before
+
+
+def test_corrected_match_is_updated_in_place(db_path, make_matches, read, count):
+    ids = read("SELECT match_id FROM Matches ORDER BY 1")
+
+    df = make_matches()
+    df.loc[1, "City"] = "ekaterinburg"
+    df.loc[2, "Datetime"] = pd.Timestamp("2018-07-15 18:00")
+    # Côtés inversés : même match
+    df.loc[0, ["Home Team Name", "Away Team Name", "Home Team Goals", "Away Team Goals",
+               "Home Result", "Away Result"]] = ["saudi arabia", "russia", 0, 5, "loser", "winner"]
+
+    stats = load_matches(df, db_path=db_path, mode="incremental")
+
+    assert (stats["inserted"], stats["updated"], stats["deleted"]) == (0, 3, 0)
+    assert count("Matches") == 3 and count("Plays") == 6
+    assert read("SELECT match_id FROM Matches ORDER BY 1") == ids
+    assert read("SELECT city, home_team, home_goals, match_date FROM matches_flat ORDER BY match_id") == [
+        ("moscow", "saudi arabia", 0, pd.Timestamp("2018-06-14 15:00")),
+        ("ekaterinburg", "egypt", 0, pd.Timestamp("2018-06-15 12:00")),
+        ("moscow", "france", 4, pd.Timestamp("2018-07-15 18:00")),
+    ]
+
+
+def test_match_missing_from_reloaded_edition_is_deleted(db_path, match_rows, make_matches, read, count):
+    final_2022 = ("2022-12-18 18:00", "final", "lusail", "argentina", 3, 3, "france", "draw", "draw")
+    load_matches(make_matches([final_2022]), db_path=db_path, mode="incremental")
+
+    # 2018 rechargé sans russie - arabie saoudite ; 2022 absent du DataFrame : non lu
+    stats = load_matches(make_matches().iloc[1:], db_path=db_path, mode="incremental")
+
+    assert (stats["inserted"], stats["updated"], stats["deleted"]) == (0, 0, 1)
+    assert count("Matches") == 3 and count("Plays") == 6 and count("matches_flat") == 3
+    assert read("SELECT COUNT(*) FROM TeamAllTimeStats WHERE team_name = 'russia'") == [(0,)]
+
+    # Agrégats maintenus égaux à une reconstruction complète
+    stats_sql = "SELECT * EXCLUDE (team_id) FROM TeamEditionStats ORDER BY team_name, year_"
+    maintained = read(stats_sql)
+    load_matches(make_matches([*match_rows[1:], final_2022]), db_path=db_path)
+    assert read(stats_sql) == maintained
+
+
+def test_replays_on_the_same_day_are_distinct_matches(db_path, make_matches, count):
+    # Match rejoué daté du jour du premier (cas de 1954 à 1962 dans les sources)
+    df = make_matches()
+    df.loc[3] = [pd.Timestamp("2018-06-14 15:00"), "group", "moscow", "saudi arabia", 1, 1,
+                 "russia", "draw", "draw"]
+    assert load_matches(df, db_path=db_path, mode="incremental")["inserted"] == 1
+
+    stats = load_matches(df, db_path=db_path, mode="incremental")
+
+    assert (stats["inserted"], stats["updated"], stats["unchanged"], stats["deleted"]) == (0, 0, 4, 0)
+    assert count("Matches") == 4
+
+
+def test_load_matches_unknown_mode(db_path, make_matches):
+    with pytest.raises(ValueError):
+        load_matches(make_matches(), db_path=db_path, mode="upsert")
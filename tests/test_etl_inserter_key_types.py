@@ -0,0 +1,70 @@
+import pandas as pd
+import pytest
+from db_creation import create_db_schema, read_key_type
+from etl_inserter_2014 import load_matches
+
+
+@pytest.fixture
+def match_rows():
+    return [
+        ("2018-06-14 15:00", "group", "moscow", "russia", 5, 0, "saudi arabia", "winner", "loser"),
+        ("2018-07-15 15:00", "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"),
+    ]
+
+
+@pytest.fixture
+def with_extra(make_matches):
+    df = make_matches()
+    df.loc[2] = [pd.Timestamp("2018-06-16 13:00"), "group", "kazan", "france", 2, 1, "australia", "winner", "loser"]
+    return df
+
+
+@pytest.fixture
+def team_ids(read):
+    return lambda: dict(read("SELECT team_name, team_id FROM Teams"))
+
+
+@pytest.mark.parametrize("key_type", ["uuid", "integer", "hash"])
+def test_view_works_with_every_key_type(read):
+    rows = read("SELECT home_team, away_team, city FROM v_matches_flat ORDER BY match_id")
+    assert rows == [("russia", "saudi arabia", "moscow"), ("france", "croatia", "moscow")]
+
+
+def test_integer_keys_are_dense(db_path, with_extra, team_ids):
+    assert sorted(team_ids().values()) == [1, 2, 3, 4]
+
+    load_matches(with_extra, db_path=db_path, mode="incremental")
+    assert team_ids()["australia"] == 5
+
+
+@pytest.mark.parametrize("key_type", ["hash"])
+def test_hash_keys_are_stable_between_full_loads(db_path, with_extra, team_ids):
+    before = team_ids()
+
+    load_matches(with_extra, db_path=db_path)
+
+    after = team_ids()
+    assert {name: after[name] for name in before} == before
+
+
+@pytest.mark.parametrize("key_type", ["integer", "hash"])
+def test_schema_rerun_keeps_existing_key_type(db_path, key_type, team_ids):
+    # Sans key_type, ou avec le même : le schéma en place est gardé
+    assert create_db_schema(db_path=db_path) == key_type
+    assert create_db_schema(db_path=db_path, key_type=key_type) == key_type
+    assert read_key_type(db_path) == key_type
+    assert len(team_ids()) == 4
+
+    with pytest.raises(ValueError, match=f"Schéma existant en clés {key_type}"):
+        create_db_schema(db_path=db_path, key_type="uuid")
+
+
+def test_new_schema_defaults_to_uuid(tmp_path):
+    db_path = str(tmp_path / "db.duckdb")
+    assert read_key_type(db_path) is None
+    assert create_db_schema(db_path=db_path) == "uuid"
+
+
+def test_unknown_key_type(tmp_path):
+    with pytest.raises(ValueError):
+        create_db_schema(db_path=str(tmp_path / "db.duckdb"), key_type="string")
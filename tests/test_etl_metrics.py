@@ -0,0 +1,93 @@
+import json
+from collections import deque
+
+import pytest
+import etl_metrics
+from etl_metrics import prometheus_text, records, stage
+
+
+@pytest.fixture(autouse=True)
+def clean_records():
+    etl_metrics.reset()
+    yield
+    etl_metrics.reset()
+
+
+def test_stage_records_time_rows_and_memory():
+    with stage("read", edition="2014") as m:
+        m["rows_out"] = 80
+
+    (record,) = records()
+    assert record["stage"] == "read"
+    assert record["labels"] == {"edition": "2014"}
+    assert record["rows_out"] == 80
+    assert record["seconds"] >= 0
+    assert record["max_rss_bytes"] > 0
+
+
+def test_nested_stages_inherit_labels():
+    with stage("extract", edition="2022"):
+        with stage("join", rows_in=64) as m:
+            m["rows_out"] = 64
+
+    join, extract = records()
+    assert join["parent"] == "extract"
+    assert join["labels"] == {"edition": "2022"}
+    assert extract["parent"] is None
+
+
+def test_failed_stage_is_recorded():
+    with pytest.raises(ValueError):
+        with stage("load"):
+            raise ValueError("boom")
+
+    assert "boom" in records()[0]["error"]
+
+
+def test_python_peak_propagates_to_parent(monkeypatch):
+    monkeypatch.setattr(etl_metrics, "TRACE_PYTHON_MEMORY", True)
+    with stage("extract"):
+        with stage("read"):
+            data = bytearray(5_000_000)
+        del data
+
+    read, extract = records()
+    assert read["python_peak_bytes"] >= 5_000_000
+    assert extract["python_peak_bytes"] >= read["python_peak_bytes"]
+
+
+def test_prometheus_text_sums_repeated_stages():
+    for rows in (10, 5):
+        with stage("normalize", edition="1930-2010") as m:
+            m["rows_out"] = rows
+
+    text = prometheus_text()
+    assert "# TYPE etl_stage_rows_out gauge" in text
+    assert 'etl_stage_rows_out{stage="normalize",edition="1930-2010"} 15' in text
+
+
+def test_write_json(tmp_path):
+    with stage("merge", rows_in=3) as m:
+        m["rows_out"] = 3
+
+    path = tmp_path / "metrics.json"
+    etl_metrics.write_json(path)
+    assert json.loads(path.read_text())["stages"][0]["rows_out"] == 3
+
+
+def test_missing_resource_module_reports_no_peak(monkeypatch):
+    monkeypatch.setattr(etl_metrics, "resource", None)
+    with stage("read"):
+        pass
+
+    assert records()[0]["max_rss_bytes"] is None
+    assert "etl_stage_max_rss_bytes" not in prometheus_text()
+
+
+def test_records_are_capped(monkeypatch):
+    monkeypatch.setattr(etl_metrics, "_records", deque(maxlen=3))
+    for i in range(5):
+        with stage("load", run=str(i)):
+            pass
+
+    assert [r["labels"]["run"] for r in records()] == ["2", "3", "4"]
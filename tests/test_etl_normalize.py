@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+import etl_normalize
+from etl_normalize import normalize_series, cached_call, clear_caches, cache_info
+from etl_2014 import normalize_stage
+from etl_2022 import clean_team_name
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    clear_caches()
+    yield
+    clear_caches()
+
+
+@pytest.mark.parametrize("func, values", [
+    (normalize_stage, ["Group A", "ROUND16", None, "Group A", "Final"]),
+    (clean_team_name, ["IR Iran", np.nan, "  BRAZIL  ", "IR Iran", None]),
+])
+def test_normalize_series_same_as_apply(func, values):
+    series = pd.Series(values, index=[5, 3, 9, 1, 7], name="col")
+
+    result = normalize_series(series, func)
+
+    pd.testing.assert_series_equal(result, series.apply(func))
+
+
+def test_normalize_series_calls_helper_once_per_value():
+    calls = []
+
+    def helper(value, suffix):
+        calls.append(value)
+        return f"{value}{suffix}"
+
+    normalize_series(pd.Series(["a", "b", "a", "a"]), helper, "!")
+    result = normalize_series(pd.Series(["b", "c"]), helper, "!")
+
+    assert calls == ["a", "b", "c"]
+    assert result.tolist() == ["b!", "c!"]
+
+
+def test_cached_call_is_bounded():
+    def helper(value):
+        return value * 2
+
+    for value in range(5):
+        cached_call(helper, value, maxsize=3)
+
+    cache = etl_normalize._caches[(helper, ())]
+    assert list(cache) == [2, 3, 4]
+    assert list(cache_info().values()) == [3]
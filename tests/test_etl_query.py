@@ -0,0 +1,58 @@
+import pytest
+from etl_inserter_2014 import load_matches
+import etl_query
+
+
+@pytest.fixture
+def match_rows():
+    return [
+        ("2018-07-15 18:00", "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"),
+        ("2022-12-18 18:00", "final", "lusail", "argentina", 3, 3, "france", "draw", "draw"),
+        ("2022-11-26 22:00", "group", "lusail", "argentina", 2, 0, "mexico", "win", "loss"),
+    ]
+
+
+def test_typed_queries(db_path):
+    (match,) = etl_query.head_to_head("france", "argentina", db_path=db_path)
+    assert isinstance(match, etl_query.Match)
+    assert (match.home_team, match.away_team, match.year_) == ("argentina", "france", 2022)
+
+    assert [e.year_ for e in etl_query.team_history("france", db_path=db_path)] == [2018, 2022]
+    assert len(etl_query.matches_by_edition(2022, db_path=db_path)) == 2
+    assert [m.away_team for m in etl_query.matches_by_edition(2022, "group", db_path=db_path)] == ["mexico"]
+    assert etl_query.results_by_city("lusail", db_path=db_path) == (
+        etl_query.CityResults("lusail", matches=2, home_wins=1, draws=1, away_wins=0, goals=8),
+    )
+
+
+def test_repeated_queries_hit_the_cache(db_path):
+    first = etl_query.head_to_head("france", "croatia", db_path=db_path)
+    second = etl_query.head_to_head("croatia", "france", db_path=db_path)
+    again = etl_query.head_to_head("france", "croatia", db_path=db_path)
+
+    assert first == second and again is first
+    assert etl_query.cache_info(db_path) == {"hits": 1, "misses": 2, "size": 2}
+
+
+def test_load_invalidates_the_cache(db_path, make_matches):
+    assert etl_query.head_to_head("france", "croatia", db_path=db_path)[0].home_goals == 4
+
+    df = make_matches()
+    df.loc[0, "Home Team Goals"] = 5
+    load_matches(df, db_path=db_path, mode="incremental")
+
+    assert etl_query.head_to_head("france", "croatia", db_path=db_path)[0].home_goals == 5
+
+
+def test_external_writes_are_checked_at_most_every_interval(db_path, monkeypatch):
+    monkeypatch.setattr(etl_query, "CHECK_INTERVAL", 3600)
+    assert len(etl_query.matches_by_edition(2022, db_path=db_path)) == 2
+    stats = []
+    monkeypatch.setattr(etl_query, "_file_token", lambda path: stats.append(path))
+
+    etl_query.matches_by_edition(2022, db_path=db_path)
+    assert stats == []  # dans l'intervalle : pas de os.stat
+
+    monkeypatch.setattr(etl_query, "CHECK_INTERVAL", 0)
+    etl_query.matches_by_edition(2022, db_path=db_path)
+    assert stats  # signature relue (et différente : lecteur rouvert)
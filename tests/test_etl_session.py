@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from etl_session import LoadSession
+
+
+def test_session_runs_schema_load_and_view(count):
+    assert count("v_matches_flat") == 3
+    assert count("TeamAllTimeStats") == 5
+
+
+def test_failed_full_reload_keeps_previous_warehouse(db_path, make_matches, count):
+    with pytest.raises(RuntimeError):
+        with LoadSession(db_path) as session:
+            session.load(make_matches().iloc[:1])
+            assert session.table_counts()["Matches"] == 1
+            raise RuntimeError("crash après le chargement, avant le commit")
+
+    # Rollback : ni table vidée, ni chargement partiel
+    assert count("Matches") == 3
+    assert count("matches_flat") == 3
+
+
+def test_full_reload_replaces_rows_in_one_transaction(db_path, make_matches, count):
+    df = make_matches()
+    df.loc[3] = [pd.Timestamp("2018-07-15 18:00"), "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"]
+
+    with LoadSession(db_path) as session:
+        stats = session.load(df)
+        session.create_view()
+
+    assert stats["inserted"] == 4
+    assert count("v_matches_flat") == 4
+
+
+def test_resource_settings_are_applied(tmp_path):
+    spill = tmp_path / "spill"
+    with LoadSession(str(tmp_path / "db.duckdb"), threads=2, memory_limit="256MB",
+                     temp_directory=str(spill)) as session:
+        settings = session.settings()
+
+    assert settings["threads"] == "2"
+    assert settings["temp_directory"] == str(spill)
+    assert settings["memory_limit"].endswith("MiB") or settings["memory_limit"].endswith("MB")
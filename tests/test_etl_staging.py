@@ -0,0 +1,59 @@
+import duckdb
+import pandas as pd
+import pyarrow as pa
+import pytest
+from etl_staging import STAGING_SCHEMA, to_staging_table
+
+
+def merged_frame(**overrides):
+    data = {
+        "Datetime": pd.to_datetime(["2018-06-14 15:00", "2018-06-15 18:00"]),
+        "Stage": ["group", "group"],
+        "City": ["moscow", None],
+        "Home Team Name": ["russia", "egypt"],
+        "Home Team Goals": pd.array([5, 0], dtype="Int64"),
+        "Away Team Goals": pd.array([0, None], dtype="Int64"),
+        "Away Team Name": ["saudi arabia", "uruguay"],
+        "Home Result": ["winner", "loser"],
+        "Away Result": ["loser", "winner"],
+    }
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+def test_to_staging_table_follows_schema():
+    table = to_staging_table(merged_frame())
+
+    assert table.schema.equals(STAGING_SCHEMA)
+    assert pa.types.is_dictionary(table.schema.field("Home Team Name").type)
+    assert table.column("City").to_pylist() == ["moscow", None]
+    assert table.column("Away Team Goals").to_pylist() == [0, None]
+
+
+def test_to_staging_table_parses_string_datetimes():
+    table = to_staging_table(merged_frame(Datetime=["2018-06-14 15:00:00", "not a date"]))
+
+    assert table.column("Datetime").type == pa.timestamp("us")
+    assert table.column("Datetime").null_count == 1
+
+
+def test_to_staging_table_rejects_missing_columns():
+    with pytest.raises(ValueError, match="Stage"):
+        to_staging_table(merged_frame().drop(columns="Stage"))
+
+
+def test_to_staging_table_rejects_out_of_range_goals():
+    with pytest.raises(ValueError, match="Home Team Goals"):
+        to_staging_table(merged_frame(**{"Home Team Goals": [500, 1]}))
+
+
+def test_duckdb_scans_staging_table_as_typed_columns():
+    staging = to_staging_table(merged_frame())
+    con = duckdb.connect()
+    con.register("staging_matches", staging)
+
+    types = dict(con.execute("SELECT column_name, column_type FROM (DESCRIBE staging_matches)").fetchall())
+    assert types["Datetime"] == "TIMESTAMP"
+    assert types["Stage"] == "VARCHAR"
+    assert types["Home Team Goals"] == "TINYINT"
+    assert con.execute('SELECT COUNT(DISTINCT "Stage") FROM staging_matches').fetchone()[0] == 1
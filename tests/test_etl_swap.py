@@ -0,0 +1,107 @@
+import os
+
+import duckdb
+import pandas as pd
+import pytest
+
+import etl_query
+import etl_session
+
+
+@pytest.fixture
+def next_matches(make_matches):
+    """Génération suivante : la base en service plus la finale 2018"""
+    df = make_matches()
+    df.loc[3] = [pd.Timestamp("2018-07-15 18:00"), "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"]
+    return df
+
+
+def build(session, df):
+    session.create_schema("integer")
+    session.load(df)
+    session.create_view()
+
+
+def test_readers_see_old_generation_until_swap(db_path, next_matches, count):
+    reader = duckdb.connect(db_path, read_only=True)
+    with etl_session.SwapSession(db_path) as session:
+        build(session, next_matches)
+        # Construction dans db.duckdb.next : la base en service n'est ni verrouillée ni modifiée
+        assert session.db_path == db_path + ".next"
+        assert reader.execute("SELECT COUNT(*) FROM Matches").fetchone()[0] == 3
+    reader.close()
+
+    assert count("Matches") == 4
+    assert count("Matches", db_path + ".prev") == 3
+    assert not os.path.exists(db_path + ".next")
+
+
+def test_invalid_build_is_not_swapped_in(db_path, next_matches, count):
+    with pytest.raises(ValueError, match="invalide"):
+        with etl_session.SwapSession(db_path) as session:
+            build(session, next_matches)
+            session.con.execute("DELETE FROM Plays WHERE position_ = 'away'")
+
+    assert count("Matches") == 3
+    assert not os.path.exists(db_path + ".next")
+    assert not os.path.exists(db_path + ".prev")
+
+
+def test_failed_build_is_discarded(db_path, next_matches, count):
+    with pytest.raises(RuntimeError):
+        with etl_session.SwapSession(db_path) as session:
+            build(session, next_matches)
+            raise RuntimeError("crash pendant la construction")
+
+    assert count("Matches") == 3
+    assert not os.path.exists(db_path + ".next")
+
+
+def test_incremental_build_starts_from_live_copy(db_path, next_matches, count):
+    with etl_session.SwapSession(db_path, copy_live=True) as session:
+        # Édition 2018 complète : la phase de groupes en service et la finale
+        stats = session.load(next_matches.iloc[2:], mode="incremental")
+        session.create_view()
+
+    assert (stats["inserted"], stats["unchanged"], stats["deleted"]) == (1, 1, 0)
+    assert count("v_matches_flat") == 4
+
+
+def test_rollback_restores_previous_generation(db_path, next_matches, count):
+    # Commit resté dans le WAL de la base en service (pas de checkpoint à la fermeture)
+    con = duckdb.connect(db_path)
+    con.execute("PRAGMA disable_checkpoint_on_shutdown")
+    con.execute("DELETE FROM matches_flat WHERE year_ = 1930")
+    con.close()
+    assert os.path.exists(db_path + ".wal")
+
+    with etl_session.SwapSession(db_path) as session:
+        build(session, next_matches)
+    assert os.path.exists(db_path + ".prev.wal") and not os.path.exists(db_path + ".wal")
+
+    etl_session.rollback_swap(db_path)
+    assert count("Matches") == 3
+    assert count("matches_flat") == 2  # WAL de l'ancienne génération rejoué
+    assert count("Matches", db_path + ".prev") == 4
+
+    etl_session.rollback_swap(db_path)
+    assert count("Matches") == 4
+    assert count("matches_flat", db_path + ".prev") == 2
+
+
+def test_rollback_without_previous_generation(db_path):
+    with pytest.raises(FileNotFoundError):
+        etl_session.rollback_swap(db_path)
+
+
+def test_query_api_picks_up_swap(db_path, next_matches, monkeypatch):
+    monkeypatch.setattr(etl_query, "CHECK_INTERVAL", 0)
+    assert len(etl_query.matches_by_edition(2018, db_path=db_path)) == 1
+
+    with etl_session.SwapSession(db_path) as session:
+        build(session, next_matches)
+    assert len(etl_query.matches_by_edition(2018, db_path=db_path)) == 2
+
+    # Bascule faite par un autre process (pas d'invalidate ici) : détectée par l'inode
+    os.replace(db_path + ".prev", db_path)
+    assert len(etl_query.matches_by_edition(2018, db_path=db_path)) == 1
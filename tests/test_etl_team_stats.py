@@ -0,0 +1,42 @@
+import pytest
+from etl_inserter_2014 import load_matches
+from etl_query import get_team_stats, team_history
+
+
+@pytest.fixture
+def match_rows():
+    return [
+        ("2018-07-15 18:00", "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"),
+        ("2018-06-16 13:00", "group", "kazan", "france", 2, 1, "australia", "winner", "loser"),
+        ("2022-12-18 18:00", "final", "lusail", "argentina", 3, 3, "france", "draw", "draw"),
+    ]
+
+
+def test_edition_and_all_time_totals(db_path):
+    assert get_team_stats("france", 2018, db_path=db_path)._asdict() | {"team_id": None} == {
+        "team_id": None, "team_name": "france", "year_": 2018,
+        "matches": 2, "wins": 2, "draws": 0, "losses": 0, "goals_for": 6, "goals_against": 3,
+    }
+
+    all_time = get_team_stats("france", db_path=db_path)
+    assert (all_time.editions, all_time.first_year, all_time.last_year) == (2, 2018, 2022)
+    assert (all_time.matches, all_time.wins, all_time.draws) == (3, 2, 1)
+    assert get_team_stats("brazil", db_path=db_path) is None
+
+
+def test_incremental_load_recomputes_touched_teams(db_path, make_matches, read):
+    df = make_matches()
+    # 2022 : vocabulaire win / loss
+    df.loc[2, ["Home Team Goals", "Home Result", "Away Result"]] = [4, "win", "loss"]
+
+    load_matches(df, db_path=db_path, mode="incremental")
+
+    assert get_team_stats("france", 2022, db_path=db_path).losses == 1
+    assert get_team_stats("argentina", db_path=db_path).wins == 1
+    assert [row.year_ for row in team_history("france", db_path=db_path)] == [2018, 2022]
+
+    # Les agrégats maintenus restent égaux à une reconstruction complète
+    all_time = "SELECT * EXCLUDE (team_id) FROM TeamAllTimeStats ORDER BY team_name"
+    maintained = read(all_time)
+    load_matches(df, db_path=db_path)
+    assert read(all_time) == maintained
@@ -0,0 +1,69 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+from etl_teams import (
+    TEAMS, fifa_code, fix_edition_teams, fuzzy_match, resolve_team, resolve_teams, team_key,
+)
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("USA", "united states"),                                   # 1930-2010, 2014
+    ("FRG (BRD / Westdeutschland)", "west germany"),            # 1930-2010 : nom local entre parenthèses
+    ("Ireland (Éire)", "republic of ireland"),
+    ("Serbia-Montenegro (Србија и Црна Гора)", "serbia and montenegro"),
+    ("Ivory Coast (Côte d’Ivoire)", "ivory coast"),
+    ("Cï¿½te d'Ivoire", "ivory coast"),                         # 2014 : encodage cassé
+    ('rn">Bosnia and Herzegovina', "bosnia and herzegovina"),   # 2014 : reste de HTML
+    ("Korea Republic", "south korea"),                          # 2014, 2022
+    ("IR Iran", "iran"),
+    ("  BRAZIL  ", "brazil"),
+    ("KSA", "saudi arabia"),                                    # code FIFA
+])
+def test_aliases_resolve_to_canonical_name(raw, expected):
+    assert resolve_team(raw) == expected
+
+
+@pytest.mark.parametrize("missing", [None, np.nan, pd.NA, "", "  "])
+def test_missing_team_is_unknown(missing):
+    assert resolve_team(missing) == "unknown"
+
+
+def test_registry_keys_are_unique():
+    canonical = [name for name, _, _ in TEAMS]
+    codes = [code for _, code, _ in TEAMS]
+    assert len(set(canonical)) == len(canonical)
+    assert len(set(codes)) == len(codes)
+    assert all(team_key(name) == name for name in canonical)
+
+
+def test_fuzzy_fallback_on_unresolved_names():
+    assert resolve_team("Argentinia") == "argentina"
+    assert resolve_team("Korea South") == "south korea"    # ordre des mots indifférent
+    # Trop loin, ou numéro différent : gardé tel quel
+    assert fuzzy_match(team_key("niger"))[0] is None
+    assert resolve_team("France S2") == "france s2"
+
+
+def test_unknown_teams_are_reported_once_per_column(caplog):
+    series = pd.Series(["France", "Atlantis", "Atlantis", "Lemuria"], name="team1")
+    with caplog.at_level(logging.WARNING, logger="ETL"):
+        result = resolve_teams(series)
+        resolve_teams(series)  # déjà résolus : ni recalcul ni nouveau warning
+
+    assert result.tolist() == ["france", "atlantis", "atlantis", "lemuria"]
+    warnings = [r.getMessage() for r in caplog.records if "hors référentiel" in r.getMessage()]
+    assert warnings == ["⚠️  2 équipe(s) hors référentiel dans team1 : atlantis, lemuria"]
+
+
+def test_fifa_codes():
+    assert fifa_code("Germany FR") == "FRG"
+    assert fifa_code("south korea") == "KOR"
+    assert fifa_code("Atlantis") is None
+
+
+def test_edition_fixes():
+    teams = pd.Series(["slovakia", "slovakia", "france"])
+    years = pd.Series([2002, 2010, 2002], dtype="Int64")
+    assert fix_edition_teams(teams, years).tolist() == ["slovenia", "slovakia", "france"]
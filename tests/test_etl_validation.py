@@ -0,0 +1,119 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from etl_validation import RULES, Rule, ValidationError, check_rules, validate_matches, write_report
+
+
+@pytest.fixture
+def match_rows():
+    return [
+        # 2022 : win / loss ; tirs au but : vainqueur sur un score nul
+        ("2022-12-18 18:00", "final", "lusail", "argentina", 3, 3, "france", "win", "loss"),
+        ("2014-07-13 16:00", "final", "rio de janeiro", "germany", 1, 0, "argentina", "winner", "loser"),
+        ("1930-07-13 15:00", "group", "montevideo", "france", 4, 1, "mexico", "winner", "loser"),
+        ("2018-07-15 17:00", "final", "moscow", "france", 4, 2, "croatia", "winner", "loser"),
+        ("2022-11-26 22:00", "group", "lusail", "argentina", 2, 0, "mexico", "win", "loss"),
+    ]
+
+
+@pytest.fixture
+def make_matches(make_matches):
+    # Buts nullables, comme après merge_data : les lignes cassées y mettent des NA
+    return lambda: make_matches().astype({"Home Team Goals": "Int64", "Away Team Goals": "Int64"})
+
+
+@pytest.fixture
+def broken_matches(make_matches):
+    df = make_matches()
+    df.loc[0, "Home Team Goals"] = pd.NA
+    df.loc[1, "Away Team Goals"] = -1
+    df.loc[2, "Home Result"] = "loser"                           # perdant à 4-1
+    df.loc[3, "Datetime"] = pd.NaT
+    df.loc[4, "Away Team Name"] = "argentina"
+    return df
+
+
+def test_clean_frame_passes_every_rule(make_matches):
+    masks = check_rules(make_matches())
+    assert {name: int(mask.sum()) for name, mask in masks.items()} == {rule.name: 0 for rule in RULES}
+
+
+def test_each_broken_row_is_caught_by_its_rule(broken_matches):
+    masks = check_rules(broken_matches)
+    assert np.flatnonzero(masks["missing_goals"]).tolist() == [0]
+    assert np.flatnonzero(masks["negative_goals"]).tolist() == [1]
+    assert np.flatnonzero(masks["result_mismatch"]).tolist() == [2]
+    assert np.flatnonzero(masks["missing_datetime"]).tolist() == [3]
+    assert np.flatnonzero(masks["same_team"]).tolist() == [4]
+
+
+def test_result_vocabulary_and_draws(make_matches):
+    df = make_matches()
+    df.loc[0, ["Home Result", "Away Result"]] = ["draw", "draw"]
+    df.loc[1, ["Home Result", "Away Result"]] = ["draw", "draw"]   # 1-0 annoncé nul
+    df.loc[3, "Away Result"] = "lost"
+    masks = check_rules(df)
+    assert np.flatnonzero(masks["result_mismatch"]).tolist() == [1]
+    assert np.flatnonzero(masks["unknown_result"]).tolist() == [3]
+
+
+def test_duplicate_fixture_in_either_direction_is_a_warning(make_matches):
+    df = pd.concat([make_matches(), make_matches().iloc[[1]]], ignore_index=True)
+    df.loc[5, ["Home Team Name", "Away Team Name"]] = ["argentina", "germany"]
+
+    out, report = validate_matches(df, mode="fail")
+    duplicates = next(r for r in report["rules"] if r["rule"] == "duplicate_fixture")
+    assert duplicates["violations"] == 1 and duplicates["samples"][0]["index"] == 5
+    assert len(out) == 6  # règle "warning" : rien n'est retiré
+
+
+def test_fail_mode_raises_with_report(broken_matches):
+    with pytest.raises(ValidationError) as e:
+        validate_matches(broken_matches, mode="fail")
+    assert e.value.report["rejected"] == 5
+
+
+def test_quarantine_mode_sets_rows_aside(tmp_path, make_matches, broken_matches):
+    df = pd.concat([broken_matches, make_matches()], ignore_index=True)
+    path = tmp_path / "quarantine" / "matches.parquet"
+
+    out, report = validate_matches(df, mode="quarantine", quarantine_path=str(path))
+
+    assert out.index.tolist() == [5, 6, 7, 8, 9]
+    assert report["quarantined"] == 5
+    quarantined = pd.read_parquet(path)
+    assert quarantined["_rules"].tolist() == [
+        "missing_goals", "negative_goals", "result_mismatch", "missing_datetime", "same_team",
+    ]
+
+
+def test_quarantine_refuses_to_empty_the_load(tmp_path, broken_matches):
+    with pytest.raises(ValidationError, match="Toutes les lignes"):
+        validate_matches(broken_matches, mode="quarantine", quarantine_path=str(tmp_path / "q.parquet"))
+
+
+def test_warn_mode_keeps_every_row(tmp_path, broken_matches):
+    out, report = validate_matches(broken_matches, mode="warn")
+    assert len(out) == 5 and report["rejected"] == 5
+
+    write_report(report, tmp_path / "report.json")
+    assert json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))["rejected"] == 5
+
+
+def test_sampled_mode_extrapolates_counts(broken_matches):
+    df = pd.concat([broken_matches] * 200, ignore_index=True)
+
+    _, report = validate_matches(df, mode="warn", sample=100)
+
+    assert report["sampled"] and report["checked"] == 100
+    missing = next(r for r in report["rules"] if r["rule"] == "missing_goals")
+    assert missing["estimated"] == missing["violations"] * 10
+    with pytest.raises(ValueError, match="échantillonnage"):
+        validate_matches(df, mode="quarantine", sample=100)
+
+
+def test_custom_rules(make_matches):
+    rules = [Rule("final_only", "error", "Finales uniquement", lambda c: c.nat)]
+    assert validate_matches(make_matches(), mode="fail", rules=rules)[1]["rejected"] == 0
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+from main import merge_data
+
+
+def fake_edition(label, size):
+    return pd.DataFrame({
+        "Datetime": ["2018-06-14 15:00:00"] * size,
+        "Home Team Name": [label] * size,
+    })
+
+
+def failing_edition():
+    raise ValueError("fichier corrompu")
+
+
+EDITIONS = {
+    "a": (fake_edition, ("a", 2)),
+    "b": (fake_edition, ("b", 1)),
+    "c": (fake_edition, ("c", 3)),
+}
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merge_data_keeps_edition_order(workers):
+    df = merge_data(workers=workers, editions=EDITIONS)
+
+    assert df["Home Team Name"].tolist() == ["a", "a", "b", "c", "c", "c"]
+    assert list(df.index) == list(range(6))
+    assert pd.api.types.is_datetime64_any_dtype(df["Datetime"])
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merge_data_reports_failing_edition(workers):
+    editions = {**EDITIONS, "broken": (failing_edition, ())}
+
+    with pytest.raises(RuntimeError, match="broken.*fichier corrompu"):
+        merge_data(workers=workers, editions=editions)
+
+
+def test_merge_data_reads_data_dir(tmp_path):
+    from benchmarks.synthetic import generate
+
+    generate(tmp_path / "x1", 1)
+    generate(tmp_path / "x2", 2)
+    single = merge_data(use_cache=False, data_dir=str(tmp_path / "x1"))
+    double = merge_data(use_cache=False, data_dir=str(tmp_path / "x2"))
+
+    assert len(double) == 2 * len(single)
+    assert double["Datetime"].notna().all()
+    assert double["Home Team Name"].str.endswith(" s1").sum() == len(single)